@@ -16,11 +16,21 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.requirements import RequirementsNotFound
 from homeassistant.util.package import install_package, is_installed
 
-from .api import IdExchangeResponse
 from .bluetooth import HomewhizBluetoothUpdateCoordinator
 from .cloud import HomewhizCloudUpdateCoordinator
-from .config_flow import CloudConfig
-from .const import CONF_BT_RECONNECT_INTERVAL, DOMAIN, PLATFORMS
+from .command_tracker import CommandTracker, read_index_by_write_index
+from .config_flow import CONFIG_VERSION, CloudConfig
+from .const import (
+    CONF_BT_RECONNECT_INTERVAL,
+    CONF_BT_WRITE_WITHOUT_RESPONSE,
+    DOMAIN,
+    PLATFORMS,
+)
+from .contents_store import async_get_contents_store, async_store_contents
+from .control_registry import control_registry
+from .decode_plan import DecodePlan
+from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry, build_runtime_data
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -33,13 +43,41 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "Appliance config not fetched from the API. "
             "Please configure the integration again"
         )
-    if entry.data["cloud_config"] is not None:
-        return await setup_cloud(entry, hass)
-    return await setup_bluetooth(address, entry, hass)
+    contents = await async_get_contents_store(hass).async_load(
+        entry.data["contents_ref"]
+    )
+    if contents is None:
+        raise HomeAssistantError(
+            "Appliance contents missing from the storage. "
+            "Please configure the integration again"
+        )
+    # Parsed once here, the platforms read it from the entry
+    entry.runtime_data = build_runtime_data(entry, contents)
+    try:
+        if entry.data["cloud_config"] is not None:
+            set_up = await setup_cloud(entry, hass)
+        else:
+            set_up = await setup_bluetooth(address, entry, hass)
+    except BaseException:
+        control_registry.release(entry.entry_id)
+        raise
+    if not set_up:
+        control_registry.release(entry.entry_id)
+    return set_up
+
+
+def attach_controls(
+    coordinator: HomewhizCoordinator, entry: HomewhizConfigEntry
+) -> None:
+    controls = entry.runtime_data.controls
+    coordinator.decode_plan = DecodePlan(controls, entry.runtime_data.last_booleans)
+    coordinator.command_tracker = CommandTracker(
+        read_index_by_write_index(controls), coordinator.write_command
+    )
 
 
 async def setup_bluetooth(
-    address: str | None, entry: ConfigEntry, hass: HomeAssistant
+    address: str | None, entry: HomewhizConfigEntry, hass: HomeAssistant
 ) -> bool:
     _LOGGER.info("Setting up bluetooth connection")
 
@@ -49,15 +87,19 @@ async def setup_bluetooth(
 
     coordinator = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = (
         HomewhizBluetoothUpdateCoordinator(
-            hass, entry.unique_id, entry.options.get(CONF_BT_RECONNECT_INTERVAL)
+            hass,
+            entry.unique_id,
+            entry.options.get(CONF_BT_RECONNECT_INTERVAL),
+            entry.options.get(CONF_BT_WRITE_WITHOUT_RESPONSE, False),
         )
     )
+    attach_controls(coordinator, entry)
 
     async def connect_retrieving_errors() -> None:
         # Heals on the next advertisement, not via try_reconnect() (that
         # only runs after a disconnect from an established connection).
         try:
-            await coordinator.connect()
+            await coordinator.async_connect_attempt()
         except Exception:  # noqa: BLE001
             _LOGGER.debug(
                 "Connect from advertisement failed, waiting for the next advertisement"
@@ -68,7 +110,14 @@ async def setup_bluetooth(
         service_info: BluetoothServiceInfoBleak,
         change: BluetoothChange,
     ) -> None:
-        if not coordinator.is_connected and not coordinator.reconnecting_lock.locked():
+        # Wakes up a reconnect waiting for the device to come back
+        coordinator.async_advertisement_received()
+        if (
+            not coordinator.is_connected
+            and not coordinator.reconnecting_lock.locked()
+            # Failed attempts back off instead of retrying every advertisement
+            and coordinator.reconnect_policy.allow_attempt()
+        ):
             _LOGGER.debug("Called connect callback in setup_bluetooth")
             hass.async_create_task(connect_retrieving_errors())
 
@@ -100,18 +149,19 @@ def _lazy_install_awsiotsdk() -> None:
             raise RequirementsNotFound(DOMAIN, [pkg])
 
 
-async def setup_cloud(entry: ConfigEntry, hass: HomeAssistant) -> bool:
+async def setup_cloud(entry: HomewhizConfigEntry, hass: HomeAssistant) -> bool:
     _LOGGER.info("Setting up cloud connection")
 
     loop = asyncio.get_running_loop()
     lazy_install_awsiotsdk_task = loop.run_in_executor(None, _lazy_install_awsiotsdk)
     await lazy_install_awsiotsdk_task
 
-    ids = from_dict(IdExchangeResponse, entry.data["ids"])
+    ids = entry.runtime_data.data.ids
     cloud_config = from_dict(CloudConfig, entry.data["cloud_config"])
     coordinator = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = (
-        HomewhizCloudUpdateCoordinator(hass, ids.appId, cloud_config, entry)
+        HomewhizCloudUpdateCoordinator(hass, ids.appId, cloud_config)
     )
+    attach_controls(coordinator, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_create_task(hass, coordinator.connect())
     _LOGGER.info("Setup cloud connection successfully")
@@ -123,4 +173,31 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.data[DOMAIN][entry.entry_id].kill()
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        control_registry.release(entry.entry_id)
     return unload_ok
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    if entry.version > CONFIG_VERSION:
+        # Downgraded from a future version
+        return False
+    if entry.version == 1:
+        data = (
+            await async_store_contents(hass, entry.data)
+            if "contents" in entry.data
+            else dict(entry.data)
+        )
+        hass.config_entries.async_update_entry(entry, data=data, version=2)
+        _LOGGER.info("Moved the appliance contents of entry %s", entry.unique_id)
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    ref = entry.data.get("contents_ref")
+    if ref is None or any(
+        other.data.get("contents_ref") == ref
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        return
+    await async_get_contents_store(hass).async_remove(ref)
@@ -1,22 +1,39 @@
-import datetime
-import hashlib
-import hmac
+import asyncio
 import json
 import logging
+from collections.abc import Awaitable, Iterable
 from dataclasses import dataclass
 from functools import reduce
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import aiohttp
 from aiohttp import ContentTypeError
 from dacite import from_dict
 
 from .appliance_config import ApplianceConfiguration
+from .config_loader import load_dataclass
+from .sigv4 import SignedRequest, SigV4Signer
+
+if TYPE_CHECKING:
+    from .contents_cache import ContentsCache
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
-ALGORITHM = "AWS4-HMAC-SHA256"
-REGION = "eu-west-1"
-SERVICE = "execute-api"
+API_HOST = "api.arcelikiot.com"
+SMARTHOME_HOST = "smarthome.arcelikiot.com"
+ID_EXCHANGE_HOST = "idexchange.arcelikiot.com"
+CONTENTS_HOST = "s3-eu-west-1.amazonaws.com"
+
+# Connection pooling for sessions created outside Home Assistant
+CONNECTIONS_PER_HOST = 4
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+# Requests run in parallel at most this many at a time, each giving up after
+# the timeout
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+_T = TypeVar("_T")
 
 
 class RequestError(Exception):
@@ -91,163 +108,182 @@ class ApplianceContents:
     localization: dict[str, str]
 
 
-def sign(key: bytes, msg: str) -> bytes:
-    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+async def gather_bounded(awaitables: Iterable[Awaitable[_T]], limit: int) -> list[_T]:
+    """Await all awaitables with at most limit running at once.
+
+    Results are in the order of the awaitables, like asyncio.gather.
+    """
+    semaphore = asyncio.Semaphore(limit)
 
+    async def run(awaitable: Awaitable[_T]) -> _T:
+        async with semaphore:
+            return await awaitable
 
-def get_signature_key(
-    key: str, date_stamp: str, region_name: str, service_name: str
-) -> bytes:
-    kDate = sign(("AWS4" + key).encode("utf-8"), date_stamp)
-    kRegion = sign(kDate, region_name)
-    kService = sign(kRegion, service_name)
-    kSigning = sign(kService, "aws4_request")
-    return kSigning  # noqa: RET504
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
 
 
-async def login(username: str, password: str) -> LoginResponse:
-    request_parameters = {"password": password, "username": username}
+def create_session() -> aiohttp.ClientSession:
+    """Pooled session for use outside Home Assistant.
 
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "HomeWhiz/1.0",
-        "Accept": "application/json",
-    }
+    Within Home Assistant use the shared async_get_clientsession session
+    instead, which is pooled the same way.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=CONNECTIONS_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+class HomeWhizApi:
+    """Client for the HomeWhiz cloud API.
+
+    All requests go through the given session so connections to the API hosts
+    are kept alive and reused instead of paying a TCP and TLS handshake per
+    call. The session is owned by the caller.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        contents_cache: "ContentsCache | None" = None,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        signer: SigV4Signer | None = None,
+    ) -> None:
+        self._session = session
+        self._signer = signer if signer is not None else SigV4Signer()
+        self._contents_cache = contents_cache
+        self._max_concurrent_requests = max_concurrent_requests
+
+    async def login(self, username: str, password: str) -> LoginResponse:
+        request_parameters = {"password": password, "username": username}
+
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "HomeWhiz/1.0",
+            "Accept": "application/json",
+        }
 
-    async with (
-        aiohttp.ClientSession() as session,
-        session.post(
-            "https://api.arcelikiot.com/auth/login",
+        async with self._session.post(
+            f"https://{API_HOST}/auth/login",
             json=request_parameters,
             headers=headers,
-        ) as response,
-    ):
-        contents = await response.json()
-        if response.status != 200:
-            _LOGGER.error(
-                "Login failed with HTTP %d: %s",
-                response.status,
-                json.dumps(contents, indent=4),
-            )
-            raise LoginError(contents)
-        if "success" in contents and not contents["success"]:
-            _LOGGER.error(json.dumps(contents, indent=4))
-            raise LoginError(contents)
-        if "success" not in contents or "data" not in contents:
-            _LOGGER.error(
-                "Unexpected response format: %s",
-                json.dumps(contents, indent=4),
-            )
-            raise LoginError(contents)
-        data = contents["data"]
-        return from_dict(LoginResponse, data["credentials"])
-
-
-async def make_id_exchange_request(device_name: str) -> IdExchangeResponse:
-    hsmid = device_name[4:]
-    headers = {
-        "User-Agent": "HomeWhiz/1.0",
-        "Accept": "application/json",
-    }
-    _LOGGER.debug("hsmid: %s", hsmid)
-    async with (
-        aiohttp.ClientSession() as session,
-        session.get(
-            f"https://idexchange.arcelikiot.com/GetApplianceId?hsmid={hsmid}",
+            timeout=REQUEST_TIMEOUT,
+        ) as response:
+            contents = await response.json()
+            if response.status != 200:
+                _LOGGER.error(
+                    "Login failed with HTTP %d: %s",
+                    response.status,
+                    json.dumps(contents, indent=4),
+                )
+                raise LoginError(contents)
+            if "success" in contents and not contents["success"]:
+                _LOGGER.error(json.dumps(contents, indent=4))
+                raise LoginError(contents)
+            if "success" not in contents or "data" not in contents:
+                _LOGGER.error(
+                    "Unexpected response format: %s",
+                    json.dumps(contents, indent=4),
+                )
+                raise LoginError(contents)
+            data = contents["data"]
+            return from_dict(LoginResponse, data["credentials"])
+
+    async def make_id_exchange_request(self, device_name: str) -> IdExchangeResponse:
+        hsmid = device_name[4:]
+        headers = {
+            "User-Agent": "HomeWhiz/1.0",
+            "Accept": "application/json",
+        }
+        _LOGGER.debug("hsmid: %s", hsmid)
+        async with self._session.get(
+            f"https://{ID_EXCHANGE_HOST}/GetApplianceId?hsmid={hsmid}",
             headers=headers,
-        ) as response,
-    ):
-        if not response.ok:
-            _LOGGER.error("ID exchange request failed: %s", await response.text())
-            raise RequestError
-        contents = json.loads(await response.text())
-        return from_dict(IdExchangeResponse, contents)
-
-
-async def make_get_contents_request(contents: ContentsDescription) -> Any:
-    async with (
-        aiohttp.ClientSession() as session,
-        session.get(
-            f"https://s3-eu-west-1.amazonaws.com/procam-contents"
+            timeout=REQUEST_TIMEOUT,
+        ) as response:
+            if not response.ok:
+                _LOGGER.error("ID exchange request failed: %s", await response.text())
+                raise RequestError
+            contents = json.loads(await response.text())
+            return from_dict(IdExchangeResponse, contents)
+
+    async def make_get_contents_request(self, contents: ContentsDescription) -> Any:
+        cache = self._contents_cache
+        loop = asyncio.get_running_loop()
+        if cache is not None:
+            cached = await loop.run_in_executor(None, cache.get, contents)
+            if cached is not None:
+                return json.loads(cached)
+        async with self._session.get(
+            f"https://{CONTENTS_HOST}/procam-contents"
             f"/{contents.ctype}S/{contents.cid}"
             f"/v{contents.ver}"
             f"/{contents.cid}.{contents.lang}.json",
-        ) as response,
-    ):
-        if not response.ok:
-            _LOGGER.error("Contents request failed: %s", await response.text())
-            raise RequestError
-        return json.loads(await response.text())
-
-
-async def make_api_get_request(
-    host: str,
-    credentials: LoginResponse,
-    canonical_uri: str,
-    canonical_querystring: str = "",
-) -> Any:
-
-    def _handle_request_error(text: str, err: Exception) -> None:
-        raise RequestError(text) from err
-
-    t = datetime.datetime.now(tz=datetime.UTC)
-    amz_date = t.strftime("%Y%m%dT%H%M%SZ")
-    # Date w/o time, used in credential scope
-    date_stamp = t.strftime("%Y%m%d")
-    canonical_headers = (
-        f"host:{host}\n"
-        f"x-amz-date:{amz_date}\n"
-        f"x-amz-security-token:{credentials.sessionToken}\n"
-    )
-    signed_headers = "host;x-amz-date;x-amz-security-token"
-    payload_hash = hashlib.sha256(b"").hexdigest()
-
-    canonical_request = (
-        f"GET\n"
-        f"{canonical_uri}\n"
-        f"{canonical_querystring}\n"
-        f"{canonical_headers}\n"
-        f"{signed_headers}\n"
-        f"{payload_hash}"
-    )
+            timeout=REQUEST_TIMEOUT,
+        ) as response:
+            if not response.ok:
+                _LOGGER.error("Contents request failed: %s", await response.text())
+                raise RequestError
+            text = await response.text()
+        result = json.loads(text)
+        if cache is not None:
+            await loop.run_in_executor(None, cache.put, contents, text.encode())
+        return result
+
+    async def make_api_get_request(
+        self,
+        host: str,
+        credentials: LoginResponse,
+        canonical_uri: str,
+        canonical_querystring: str = "",
+    ) -> Any:
+        request = SignedRequest(host, canonical_uri, canonical_querystring)
+        headers = self._signer.sign(
+            request,
+            credentials.accessKey,
+            credentials.secretKey,
+            credentials.sessionToken,
+        )
+        return await self._send_signed(request, headers)
+
+    async def make_api_get_requests(
+        self, credentials: LoginResponse, requests: list[SignedRequest]
+    ) -> list[Any]:
+        """Send a burst of requests signed together, results in request order."""
+        signed_headers = self._signer.sign_many(
+            requests,
+            credentials.accessKey,
+            credentials.secretKey,
+            credentials.sessionToken,
+        )
+        return await gather_bounded(
+            (
+                self._send_signed(request, headers)
+                for request, headers in zip(requests, signed_headers, strict=True)
+            ),
+            self._max_concurrent_requests,
+        )
 
-    _LOGGER.debug(
-        "Actual canonical request: {}".format(canonical_request.replace("\n", "\\n"))  # noqa: G001
-    )
+    async def _send_signed(
+        self, request: SignedRequest, headers: dict[str, str]
+    ) -> Any:
 
-    credential_scope = f"{date_stamp}/{REGION}/{SERVICE}/aws4_request"
-    string_to_sign = (
-        f"{ALGORITHM}\n"
-        f"{amz_date}\n"
-        f"{credential_scope}\n"
-        f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
-    )
+        def _handle_request_error(text: str, err: Exception) -> None:
+            raise RequestError(text) from err
 
-    # Create the signing key using the function defined above.
-    signing_key = get_signature_key(credentials.secretKey, date_stamp, REGION, SERVICE)
-    signature = hmac.new(
-        signing_key, string_to_sign.encode("utf-8"), hashlib.sha256
-    ).hexdigest()
-    authorization_header = (
-        f"{ALGORITHM} "
-        f"Credential={credentials.accessKey}/{credential_scope}, "
-        f"SignedHeaders={signed_headers}, "
-        f"Signature={signature}"
-    )
+        headers = headers | {
+            "User-Agent": "HomeWhiz/1.0",
+            "Accept": "application/json",
+        }
 
-    headers = {
-        "x-amz-date": amz_date,
-        "x-amz-security-token": (credentials.sessionToken),
-        "Authorization": authorization_header,
-        "User-Agent": "HomeWhiz/1.0",
-        "Accept": "application/json",
-    }
-
-    async with aiohttp.ClientSession() as session:
-        url = f"https://{host}{canonical_uri}"
-        if canonical_querystring:
-            url = f"{url}?{canonical_querystring}"
-        async with session.get(url, headers=headers) as response:
+        url = f"https://{request.host}{request.canonical_uri}"
+        if request.canonical_querystring:
+            url = f"{url}?{request.canonical_querystring}"
+        async with self._session.get(
+            url, headers=headers, timeout=REQUEST_TIMEOUT
+        ) as response:
             try:
                 contents = await response.json()
                 if response.status != 200:
@@ -266,96 +302,110 @@ async def make_api_get_request(
                 _LOGGER.error("API request returned non-JSON response: %s", text)
                 return _handle_request_error(text, err)  # Add explicit return
 
+    async def fetch_contents_index(
+        self, credentials: LoginResponse, app_id: str, language: str = "en-GB"
+    ) -> ContentsIndexResponse:
+        response = await self.make_api_get_request(
+            host=API_HOST,
+            canonical_uri="/procam/contents",
+            canonical_querystring=(
+                f"applianceId={app_id}&"
+                f"ctype=CONFIGURATION%2CLOCALIZATION&"
+                f"lang={language}&"
+                f"testMode=true"
+            ),
+            credentials=credentials,
+        )
+        return from_dict(ContentsIndexResponse, response["data"])
+
+    async def fetch_base_contents_index(
+        self, credentials: LoginResponse, language: str
+    ) -> ContentsIndexResponse:
+        response = await self.make_api_get_request(
+            host=API_HOST,
+            canonical_uri="/procam/contents/subtype",
+            canonical_querystring=(
+                f"ctype=LOCALIZATION&lang={language}"
+                f"&subtype=NEW-HOMEWHIZ&testMode=false"
+            ),
+            credentials=credentials,
+        )
+        return from_dict(ContentsIndexResponse, response["data"])
+
+    async def fetch_localizations(
+        self, contents_index: ContentsIndexResponse
+    ) -> dict[str, str]:
+        localization_contents = [
+            content
+            for content in contents_index.results
+            if content.ctype == "LOCALIZATION"
+        ]
+        responses = await gather_bounded(
+            (
+                self.make_get_contents_request(localization)
+                for localization in localization_contents
+            ),
+            self._max_concurrent_requests,
+        )
+        # Merged in index order, later files override earlier ones
+        localizations = [
+            {key.lower(): value for key, value in response["localizations"].items()}
+            for response in responses
+        ]
+
+        return reduce(lambda a, b: a | b, localizations)
+
+    async def fetch_appliance_contents(
+        self, credentials: LoginResponse, app_id: str, language: str = "en-GB"
+    ) -> ApplianceContents:
+        contents_index = await self.fetch_contents_index(credentials, app_id, language)
+        return await self.fetch_contents(contents_index)
+
+    async def fetch_contents(
+        self, contents_index: ContentsIndexResponse
+    ) -> ApplianceContents:
+        config_contents = [
+            content
+            for content in contents_index.results
+            if content.ctype == "CONFIGURATION"
+        ]
+
+        config, localization = await asyncio.gather(
+            self.make_get_contents_request(config_contents[0]),
+            self.fetch_localizations(contents_index),
+        )
 
-async def fetch_contents_index(
-    credentials: LoginResponse, app_id: str, language: str = "en-GB"
-) -> ContentsIndexResponse:
-    response = await make_api_get_request(
-        host="api.arcelikiot.com",
-        canonical_uri="/procam/contents",
-        canonical_querystring=(
-            f"applianceId={app_id}&"
-            f"ctype=CONFIGURATION%2CLOCALIZATION&"
-            f"lang={language}&"
-            f"testMode=true"
-        ),
-        credentials=credentials,
-    )
-    return from_dict(ContentsIndexResponse, response["data"])
-
-
-async def fetch_base_contents_index(
-    credentials: LoginResponse, language: str
-) -> ContentsIndexResponse:
-    response = await make_api_get_request(
-        host="api.arcelikiot.com",
-        canonical_uri="/procam/contents/subtype",
-        canonical_querystring=(
-            f"ctype=LOCALIZATION&lang={language}&subtype=NEW-HOMEWHIZ&testMode=false"
-        ),
-        credentials=credentials,
-    )
-    return from_dict(ContentsIndexResponse, response["data"])
-
-
-async def fetch_localizations(contents_index: ContentsIndexResponse) -> dict[str, str]:
-    localization_contents = [
-        content for content in contents_index.results if content.ctype == "LOCALIZATION"
-    ]
-    localizations = [
-        {
-            key.lower(): value
-            for key, value in (await make_get_contents_request(localization))[
-                "localizations"
-            ].items()
-        }
-        for localization in localization_contents
-    ]
-
-    return reduce(lambda a, b: a | b, localizations)
-
-
-async def fetch_appliance_contents(
-    credentials: LoginResponse, app_id: str, language: str = "en-GB"
-) -> ApplianceContents:
-    contents_index = await fetch_contents_index(credentials, app_id, language)
-    config_contents = [
-        content
-        for content in contents_index.results
-        if content.ctype == "CONFIGURATION"
-    ]
-
-    config = await make_get_contents_request(config_contents[0])
-    localization = await fetch_localizations(contents_index)
-
-    return ApplianceContents(
-        config=from_dict(ApplianceConfiguration, config), localization=localization
-    )
-
+        return ApplianceContents(
+            config=load_dataclass(ApplianceConfiguration, config),
+            localization=localization,
+        )
 
-async def fetch_appliance_infos(credentials: LoginResponse) -> list[ApplianceInfo]:
-    resp = await make_api_get_request(
-        "smarthome.arcelikiot.com",
-        credentials,
-        canonical_uri="/my-homes",
-    )
-    homes = from_dict(MyHomesResponse, resp).data
-    appliances = []
-    for home in homes:
-        home_resp = await make_api_get_request(
-            "smarthome.arcelikiot.com",
+    async def fetch_appliance_infos(
+        self, credentials: LoginResponse
+    ) -> list[ApplianceInfo]:
+        resp = await self.make_api_get_request(
+            SMARTHOME_HOST,
             credentials,
-            canonical_uri=f"/my-homes/{home.id}",
+            canonical_uri="/my-homes",
         )
-        appliances.extend(from_dict(HomeResponseData, home_resp["data"]).appliances)
-    for appliance in appliances:
-        _LOGGER.debug(
-            "Appliance %s: name=%s type=%s model=%s connectivity=%s platform=%s",
-            appliance.applianceId,
-            appliance.name,
-            appliance.applianceType,
-            appliance.model,
-            appliance.connectivity,
-            appliance.platformType,
+        homes = from_dict(MyHomesResponse, resp).data
+        home_responses = await self.make_api_get_requests(
+            credentials,
+            [SignedRequest(SMARTHOME_HOST, f"/my-homes/{home.id}") for home in homes],
         )
-    return appliances
+        appliances = [
+            appliance
+            for home_resp in home_responses
+            for appliance in from_dict(HomeResponseData, home_resp["data"]).appliances
+        ]
+        for appliance in appliances:
+            _LOGGER.debug(
+                "Appliance %s: name=%s type=%s model=%s connectivity=%s platform=%s",
+                appliance.applianceId,
+                appliance.name,
+                appliance.applianceType,
+                appliance.model,
+                appliance.connectivity,
+                appliance.platformType,
+            )
+        return appliances
@@ -1,27 +1,34 @@
+"""Appliance configuration as the HomeWhiz contents describe it.
+
+The dataclasses are frozen and slotted: every appliance keeps its whole
+configuration alive, hundreds of objects, and they are never changed after
+loading.
+"""
+
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceSubprogramOverride:
     allowedValueIndices: list[int] | None
     isDisabled: int | None
     strKeyRef: str | None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgressFeatureOverride:
     hour: ApplianceSubprogramOverride
     minute: ApplianceSubprogramOverride | None
     strKeyRef: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceFeatureEnumOption:
     strKey: str
     wifiArrayValue: int | None = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, frozen=True, slots=True)
 class ApplianceProgramOption(ApplianceFeatureEnumOption):
     customSubProgramOverrides: list[ApplianceSubprogramOverride] | None
     isDownloadableCycle: bool | None
@@ -32,7 +39,7 @@ class ApplianceProgramOption(ApplianceFeatureEnumOption):
     isVisible: int = 1
 
 
-@dataclass()
+@dataclass(frozen=True, slots=True)
 class ApplianceProgram:
     strKey: str
     isSwitch: int | None
@@ -42,7 +49,7 @@ class ApplianceProgram:
     isVisible: int = 1
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceFeatureBoundedOption:
     factor: float
     lowerLimit: int
@@ -52,7 +59,7 @@ class ApplianceFeatureBoundedOption:
     upperLimit: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceFeature:
     boundedValues: list[ApplianceFeatureBoundedOption] | None
     enumValues: list[ApplianceFeatureEnumOption] | None
@@ -63,7 +70,7 @@ class ApplianceFeature:
     isVisible: int = 1
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgressFeature:
     hour: ApplianceFeature
     isExpandableBySwitch: int | None
@@ -75,7 +82,7 @@ class ApplianceProgressFeature:
     isVisible: int = 1
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgress:
     autoOff: ApplianceProgressFeature | None
     autoOn: ApplianceProgressFeature | None
@@ -87,20 +94,20 @@ class ApplianceProgress:
     remainingOrElapsed: ApplianceProgressFeature | None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceFeatureNotificationInfo:
     necessity: str | None
     priority: str
     strKey: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceStateOption(ApplianceFeatureEnumOption):
     notificationInfo: ApplianceFeatureNotificationInfo | None = None
     allowedTransitions: list[str] | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceState:
     states: list[ApplianceStateOption]
     wfaIndex: int | None
@@ -108,37 +115,37 @@ class ApplianceState:
     wifiArrayReadIndex: int | None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceSubState:
     subStates: list[ApplianceFeatureEnumOption]
     wifiArrayReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OvenMeatProbePlug:
     wifiArrayReadIndex: int
     wifiArrayValue: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceOvenMeatProbe:
     meatProbePrograms: list[str]
     meatProbeSubprograms: list[ApplianceFeature]
     meatProbePlug: OvenMeatProbePlug
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AutoController:
     hasAutoController: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ConsumableWarningSetting:
     bitIndex: int
     wifiArrayReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ConsumableForm:
     autoDosingAmountSetting: ApplianceFeature | None
     consumableForm: str
@@ -146,43 +153,43 @@ class ConsumableForm:
     warningSetting: ConsumableWarningSetting | None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Consumable:
     consumableType: str
     forms: list[ConsumableForm]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceConsumableSettings:
     consumables: list[Consumable]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgramDownloadSettings:
     strKey: str
     wifiArrayReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceClock:
     hourWifiArrayIndex: int
     minuteWifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HobZoneRecipeInfo:
     readyMealCurrentStepReadIndex: int
     readyMealIdHighReadIndex: int
     readyMealIdLowReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceWarningReason:
     values: list[ApplianceFeatureEnumOption]
     wifiArrayReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceWarningOption:
     bitIndex: int
     notificationInfo: ApplianceFeatureNotificationInfo
@@ -190,14 +197,14 @@ class ApplianceWarningOption:
     strKey: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceWarning:
     wifiArrayByteCount: int | None
     warnings: list[ApplianceWarningOption]
     wifiArrayReadIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HobDefaultZone:
     cookingStates: ApplianceState
     monitorings: list[ApplianceFeature]
@@ -209,7 +216,7 @@ class HobDefaultZone:
     deviceWarnings: ApplianceWarning
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceHobZones:
     defaultZone: HobDefaultZone
     eachZoneWifiArraySegmentLength: int
@@ -217,13 +224,13 @@ class ApplianceHobZones:
     numberOfZones: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AutoBakeDownloadedFood:
     downloadedAutobakeIdHighWifiArrayIndex: int
     downloadedAutobakeIdLowWifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceOvenRecipe:
     cookingTypeRecipeWifiArrayValue: int
     cookingTypeWifiArrayIndex: int
@@ -237,39 +244,39 @@ class ApplianceOvenRecipe:
     recipeIdLowWifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceFeatureReference:
     strKeyRef: str
     wifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgramReference:
     strKeyRef: str
     wifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgressFeatureReference:
     hour: ApplianceFeatureReference
     minute: ApplianceFeatureReference
     strKeyRef: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceProgressReference:
     delay: ApplianceProgressFeature
     duration: ApplianceProgressFeatureReference
     remaining: ApplianceProgressFeature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceSubprogramReference:
     strKeyRef: str
     wifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OvenCookingStep:
     program: ApplianceProgramReference
     progressVariables: ApplianceProgressReference
@@ -277,7 +284,7 @@ class OvenCookingStep:
     subPrograms: list[ApplianceSubprogramReference]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceOvenStepCooking:
     activeStepIndex: int
     cookingTypeManuelWifiArrayValue: int
@@ -289,19 +296,19 @@ class ApplianceOvenStepCooking:
     numberOfSteps: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OvenTemperatureInfo:
     ovenTemperatureNotVisiblePrograms: str
     ovenTemperatureSubprograms: ApplianceFeature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceRefrigeratorDayTime:
     hourWfaIndex: int
     minuteWfaIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceDefrostDuration:
     intervalCalculationFactor: int
     intervalWfaIndex: int
@@ -309,7 +316,7 @@ class ApplianceDefrostDuration:
     startMinuteWfaIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceRefrigeratorDefrost:
     dayTimeVariableIndices: ApplianceRefrigeratorDayTime
     defrostConfigWfaIndex: int
@@ -318,26 +325,26 @@ class ApplianceRefrigeratorDefrost:
     defrostSelectWfaIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceRemoteControl:
     wifiArrayReadIndex: int
     wifiArrayValue: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceScreenSaver:
     ovenScreenSaverTimer: ApplianceFeature
     ovenStandByMode: ApplianceFeature
     ovenStandByTimer: ApplianceFeature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceTeaMachineRecipe:
     recipeFormatVersion: str | None
     recipeIdWifiArrayIndex: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ApplianceConfiguration:
     # UPDATED: All fields are now optional with default None to prevent dacite errors
     program: ApplianceProgram | None = None
@@ -1,7 +1,9 @@
 import logging
 import re
+import sys
+import weakref
 from abc import ABC, abstractmethod
-from collections.abc import Iterable, Mapping, Sequence
+from collections.abc import Iterable, Mapping, MutableMapping, Sequence
 from dataclasses import dataclass, fields, replace
 from datetime import UTC, datetime, timedelta
 from typing import Any, Generic, TypeVar
@@ -36,6 +38,23 @@ from .homewhiz import Command
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+DEVICE_STATE_OFF = "device_state_off"
+# What the device states mean to the sensors and to polling. Appliances
+# announce a change with the _notification variant of the new state.
+OFF_DEVICE_STATES = frozenset({DEVICE_STATE_OFF, f"{DEVICE_STATE_OFF}_notification"})
+# A program is under way, the frame keeps changing
+ACTIVE_DEVICE_STATES = frozenset(
+    f"{state}{suffix}"
+    for state in (
+        "device_state_running",
+        "device_state_cancelling",
+        "device_state_cooking",
+        "device_state_anticrease",
+        "device_state_time_delay_active",
+    )
+    for suffix in ("", "_notification")
+)
+
 
 def clamp(value: int) -> int:
     return value if value < 128 else value - 128
@@ -50,17 +69,29 @@ def safe_get(data: bytearray, index: int) -> int:
     return clamp(data[index])
 
 
+# Option tables in use, never mutated once built
+_shared_options: weakref.WeakValueDictionary[
+    tuple[tuple[int, str], ...], bidict[int, str]
+] = weakref.WeakValueDictionary()
+
+
 def to_friendly_name(name: str) -> str:
     # Generates a translation friendly name based on the key
     # To filter out characters not supported by homeassistant
     name = name.replace("+", "plus")
     name = name.lower()
     name = re.sub("[^a-z0-9-_]", "", name)
-    return name.removesuffix("_")
+    # Interned, appliances of the same model share their option names
+    return sys.intern(name.removesuffix("_"))
 
 
 class Control(ABC):
-    """Parent control class"""
+    """Parent control class
+
+    Controls are slotted, an install keeps thousands of them alive.
+    """
+
+    __slots__ = ("key",)
 
     key: str
 
@@ -68,6 +99,11 @@ class Control(ABC):
     def get_value(self, data: bytearray) -> Any:
         pass
 
+    @property
+    @abstractmethod
+    def read_indices(self) -> frozenset[int]:
+        """Frame indices get_value depends on"""
+
     @property
     def friendly_name(self) -> str:
         return to_friendly_name(self.key)
@@ -89,6 +125,8 @@ class Option(ABC):
 
 
 class DebugControl(Control):
+    __slots__ = ("read_index",)
+
     def __init__(self, key: str, read_index: int):
         self.key = key
         self.read_index = read_index
@@ -96,6 +134,10 @@ class DebugControl(Control):
     def get_value(self, data: bytearray) -> Any:
         return data[self.read_index]
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset((self.read_index,))
+
 
 _Options = TypeVar("_Options", bound=Mapping[int, str])
 
@@ -103,6 +145,8 @@ _Options = TypeVar("_Options", bound=Mapping[int, str])
 class EnumControl(Control, Generic[_Options]):
     """Control class for enum sensors"""
 
+    __slots__ = ("options", "read_index")
+
     def __init__(self, key: str, read_index: int, options: _Options):
         self.key = key
         self.read_index = read_index
@@ -114,10 +158,16 @@ class EnumControl(Control, Generic[_Options]):
             return self.options[byte]
         return None
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset((self.read_index,))
+
 
 class WriteEnumControl(EnumControl[bidict[int, str]]):
     """Control class for enum selectors"""
 
+    __slots__ = ("write_index",)
+
     def __init__(
         self, key: str, read_index: int, write_index: int, options: bidict[int, str]
     ):
@@ -130,6 +180,8 @@ class WriteEnumControl(EnumControl[bidict[int, str]]):
 
 
 class NumericControl(Control):
+    __slots__ = ("bounds", "read_index")
+
     def __init__(
         self, key: str, read_index: int, bounds: ApplianceFeatureBoundedOption
     ):
@@ -141,8 +193,14 @@ class NumericControl(Control):
         byte = safe_get(data, self.read_index)
         return byte * self.bounds.factor
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset((self.read_index,))
+
 
 class WriteNumericControl(NumericControl):
+    __slots__ = ("write_index",)
+
     def __init__(
         self,
         key: str,
@@ -160,6 +218,8 @@ class WriteNumericControl(NumericControl):
 class HobZoneHeaterLevelControl(WriteNumericControl):
     """Hob zone heater level control that auto-switches to MANUAL mode."""
 
+    __slots__ = ("manual_mode_value", "program_write_index")
+
     def __init__(
         self,
         key: str,
@@ -184,6 +244,8 @@ class HobZoneHeaterLevelControl(WriteNumericControl):
 class HobZonePredefinedProgramControl(WriteEnumControl):
     """Hob zone predefined program control that auto-switches to PREDEFINED mode."""
 
+    __slots__ = ("predefined_mode_value", "program_write_index")
+
     def __init__(
         self,
         key: str,
@@ -207,6 +269,8 @@ class HobZonePredefinedProgramControl(WriteEnumControl):
 
 
 class TimeControl(Control):
+    __slots__ = ("hour_index", "minute_index")
+
     def __init__(self, key: str, hour_index: int, minute_index: int | None):
         self.key = key
         self.hour_index = hour_index
@@ -225,6 +289,12 @@ class TimeControl(Control):
         )
         return hours * 60 + minutes
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        if self.minute_index is None:
+            return frozenset((self.hour_index,))
+        return frozenset((self.hour_index, self.minute_index))
+
 
 class WriteTimeControl(Control):
     """Writable counterpart of :class:`TimeControl` for a delay/timer value.
@@ -235,6 +305,8 @@ class WriteTimeControl(Control):
     is surfaced as a writable ``number`` entity instead of a read-only ``sensor``.
     """
 
+    __slots__ = ("hour_index", "minute_index")
+
     def __init__(self, key: str, hour_index: int, minute_index: int | None):
         self.key = key
         self.hour_index = hour_index
@@ -247,6 +319,12 @@ class WriteTimeControl(Control):
         )
         return hours * 60 + minutes
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        if self.minute_index is None:
+            return frozenset((self.hour_index,))
+        return frozenset((self.hour_index, self.minute_index))
+
     def set_value(self, minutes: int) -> list[Command]:
         minutes = max(0, int(minutes))
         commands = [Command(self.hour_index, minutes // 60)]
@@ -258,6 +336,8 @@ class WriteTimeControl(Control):
 class StateAwareRemainingTimeControl(Control):
     """Wraps a remaining time control to return 0 when device is off."""
 
+    __slots__ = ("remaining_control", "state_control")
+
     def __init__(
         self, key: str, remaining_control: TimeControl, state_control: Control | None
     ):
@@ -277,7 +357,7 @@ class StateAwareRemainingTimeControl(Control):
             _LOGGER.debug(
                 "Current state for state aware remaining time %s: %s", self.key, state
             )
-            if state == "device_state_off":
+            if state in OFF_DEVICE_STATES:
                 _LOGGER.debug(
                     "Device is off, returning 0 for remaining time %s",
                     self.key,
@@ -289,10 +369,18 @@ class StateAwareRemainingTimeControl(Control):
         )
         return self.remaining_control.get_value(data)
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        if self.state_control is None:
+            return self.remaining_control.read_indices
+        return self.remaining_control.read_indices | self.state_control.read_indices
+
 
 class SummedTimestampControl(Control):
     """Uses different sensors to calculate a timestamp"""
 
+    __slots__ = ("sensors",)
+
     def __init__(self, key: str, sensors: list[Control]):
         self.key = key
         self.sensors = sensors
@@ -304,6 +392,10 @@ class SummedTimestampControl(Control):
             [sensor.key for sensor in self.sensors],
         )
         minute_delta = sum(sensor.get_value(data) for sensor in self.sensors)
+        return self.timestamp_in(minute_delta)
+
+    @staticmethod
+    def timestamp_in(minute_delta: int) -> datetime | None:
         if minute_delta < 1:
             _LOGGER.debug("Device Running or No Delay Active")
             return None
@@ -314,71 +406,83 @@ class SummedTimestampControl(Control):
         _LOGGER.debug("Calculated time of %s", time_est)
         return time_est
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset().union(*(sensor.read_indices for sensor in self.sensors))
+
 
 class BooleanControl(Control):
-    _last_known_value: bool | None = None
+    """Control class for booleans read from a single byte
+
+    Controls are shared by the appliances of a model and keep no state. A
+    frame too short for the read index falls back to the last known value
+    of the entry, kept by the caller in last_known, or to False.
+    """
+
+    __slots__ = ("read_index",)
+
+    def __init__(self, key: str, read_index: int):
+        self.key = key
+        self.read_index = read_index
 
     @abstractmethod
-    def get_value(self, data: bytearray) -> bool:
+    def from_byte(self, byte: int) -> bool:
         pass
 
-    def _get_cached_bool(self, current_bool: bool) -> bool:
-        self._last_known_value = current_bool
-        return current_bool
-
-    def _get_fallback_value(self) -> bool:
-        if self._last_known_value is not None:
-            _LOGGER.debug(
-                "Using cached value for boolean control %s",
-                getattr(self, "key", "unknown"),
-            )
-            return self._last_known_value
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> bool:
+        if self.read_index < len(data):
+            value = self.from_byte(data[self.read_index])
+            if last_known is not None:
+                last_known[self.key] = value
+            return value
+        if last_known is not None and self.key in last_known:
+            _LOGGER.debug("Using last known value for boolean control %s", self.key)
+            return last_known[self.key]
         return False
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset((self.read_index,))
+
 
 class BooleanCompareControl(BooleanControl):
+    __slots__ = ("compare_value",)
+
     def __init__(self, key: str, read_index: int, compare_value: int):
-        self.key = key
-        self.read_index = read_index
+        super().__init__(key, read_index)
         self.compare_value = compare_value
 
-    def get_value(self, data: bytearray) -> bool:
-        if self.read_index < len(data):
-            current_bool = data[self.read_index] == self.compare_value
-            return self._get_cached_bool(current_bool)
-        return self._get_fallback_value()
+    def from_byte(self, byte: int) -> bool:
+        return byte == self.compare_value
 
 
 class BooleanBitmaskControl(BooleanControl):
+    __slots__ = ("bit",)
+
     def __init__(self, key: str, read_index: int, bit: int):
-        self.key = key
-        self.read_index = read_index
+        super().__init__(key, read_index)
         self.bit = bit
 
-    def get_value(self, data: bytearray) -> bool:
-        if self.read_index < len(data):
-            current_bool = data[self.read_index] & (1 << self.bit) != 0
-            return self._get_cached_bool(current_bool)
-        return self._get_fallback_value()
+    def from_byte(self, byte: int) -> bool:
+        return byte & (1 << self.bit) != 0
 
 
 @dataclass
 class WriteBooleanControl(BooleanControl):
+    __slots__ = ("value_off", "value_on", "write_index")
+
     def __init__(
         self, key: str, read_index: int, write_index: int, value_on: int, value_off: int
     ):
-        self.key = key
-        self.read_index = read_index
+        super().__init__(key, read_index)
         self.write_index = write_index
         self.value_on = value_on
         self.value_off = value_off
 
-    def get_value(self, data: bytearray) -> bool:
-        if self.read_index < len(data):
-            byte = clamp(data[self.read_index])
-            current_bool = byte == self.value_on
-            return self._get_cached_bool(current_bool)
-        return self._get_fallback_value()
+    def from_byte(self, byte: int) -> bool:
+        return clamp(byte) == self.value_on
 
     def set_value(self, value: bool) -> Command:
         return Command(
@@ -390,9 +494,15 @@ class DisabledSwingAxisControl(Control):
     key = "disabled"
     enabled = False
 
-    def get_value(self, data: bytearray) -> bool:
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> bool:
         return False
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset()
+
     def set_value(self, _value: bool, current_data: bytearray) -> list[Command]:
         return []
 
@@ -404,13 +514,23 @@ class SwingAxisControl(Control):
         self.key = parent.key
         self.parent = parent
 
-    def get_value(self, data: bytearray) -> bool:
-        option = self.parent.get_value(data)
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> bool:
+        option = (
+            self.parent.get_value(data, last_known)
+            if isinstance(self.parent, BooleanControl)
+            else self.parent.get_value(data)
+        )
         _LOGGER.debug("Option - type: %s value: %s", type(option), option)
         if isinstance(option, bool):
             return option
         return option is not None and not option.endswith("_off")
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return self.parent.read_indices
+
     def _option_with_suffix(self, suffix: str) -> str | None:
         if isinstance(self.parent, WriteBooleanControl):
             return None
@@ -470,9 +590,11 @@ class SwingControl(Control):
             result.append(SWING_BOTH)
         return result
 
-    def get_value(self, data: bytearray) -> str | None:
-        horizontal = self.horizontal.get_value(data)
-        vertical = self.vertical.get_value(data)
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> str | None:
+        horizontal = self.horizontal.get_value(data, last_known)
+        vertical = self.vertical.get_value(data, last_known)
         if horizontal and vertical:
             return SWING_BOTH
         if horizontal:
@@ -481,6 +603,10 @@ class SwingControl(Control):
             return SWING_VERTICAL
         return SWING_OFF
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return self.horizontal.read_indices | self.vertical.read_indices
+
     def set_value(self, value: str, current_data: bytearray) -> list[Command]:
         commands: list[Command] = []
         if value == SWING_OFF:
@@ -527,11 +653,17 @@ class HvacControl(Control):
             return None
         return self._program_dict[option]
 
-    def get_value(self, data: bytearray) -> HVACMode | None:
-        if not self.state.get_value(data):
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> HVACMode | None:
+        if not self.state.get_value(data, last_known):
             return HVACMode.OFF
         return self._hvac_mode_raw(data)
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return self.program.read_indices | self.state.read_indices
+
     def set_value(self, hvac_mode: HVACMode, current_data: bytearray) -> list[Command]:
         if hvac_mode == HVACMode.OFF:
             return [self.state.set_value(False)]
@@ -565,13 +697,21 @@ class PresetControl(Control):
             return [PRESET_NONE]
         return [PRESET_NONE, PRESET_BOOST]
 
-    def get_value(self, data: bytearray) -> str | None:
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> str | None:
         if self.enabled:
             assert self.jet_mode is not None
-            if self.jet_mode.get_value(data):
+            if self.jet_mode.get_value(data, last_known):
                 return PRESET_BOOST
         return PRESET_NONE
 
+    @property
+    def read_indices(self) -> frozenset[int]:
+        if self.jet_mode is None:
+            return frozenset()
+        return self.jet_mode.read_indices
+
     def set_value(self, value: str) -> list[Command]:
         if not self.enabled:
             return []
@@ -610,8 +750,22 @@ class ClimateControl(Control):
             preset_mode,
         ]
 
-    def get_value(self, data: bytearray) -> dict[str, Any]:
-        return {c.key: c.get_value(data) for c in self._controls}
+    def get_value(
+        self, data: bytearray, last_known: MutableMapping[str, bool] | None = None
+    ) -> dict[str, Any]:
+        """Values of the sub-controls, booleans fall back to last_known."""
+        return {
+            self.hvac_mode.key: self.hvac_mode.get_value(data, last_known),
+            self.target_temperature.key: self.target_temperature.get_value(data),
+            self.current_temperature.key: self.current_temperature.get_value(data),
+            self.fan_mode.key: self.fan_mode.get_value(data),
+            self.swing.key: self.swing.get_value(data, last_known),
+            self.preset_mode.key: self.preset_mode.get_value(data, last_known),
+        }
+
+    @property
+    def read_indices(self) -> frozenset[int]:
+        return frozenset().union(*(c.read_indices for c in self._controls))
 
 
 def get_bounded_values_options(
@@ -653,7 +807,15 @@ def get_options_from_feature(key: str, feature: ApplianceFeature) -> bidict[int,
                 get_bounded_values_options(to_friendly_name(key), boundedValues)
                 | options
             )
-    return bidict(sorted(options.items()))
+    return shared_options(dict(sorted(options.items())))
+
+
+def shared_options(options: Mapping[int, str]) -> bidict[int, str]:
+    """Returns one table for all the controls with the same options"""
+    items = tuple(options.items())
+    if (shared := _shared_options.get(items)) is None:
+        shared = _shared_options[items] = bidict(items)
+    return shared
 
 
 def get_options_from_enum_options(
@@ -733,7 +895,7 @@ def build_control_from_program(program: ApplianceProgram | None) -> Control | No
             if program.wfaWriteIndex is not None
             else program.wifiArrayIndex
         ),
-        options=bidict(get_options_from_enum_options(program.values)),
+        options=shared_options(get_options_from_enum_options(program.values)),
     )
 
 
@@ -745,7 +907,7 @@ def build_control_from_substate(
     return EnumControl(
         key="sub_state",
         read_index=sub_states.wifiArrayReadIndex,
-        options=get_options_from_enum_options(sub_states.subStates),
+        options=shared_options(get_options_from_enum_options(sub_states.subStates)),
     )
 
 
@@ -772,7 +934,7 @@ def build_control_from_state(state: ApplianceState | None) -> Control | None:
         key="state",
         read_index=read_index,
         write_index=write_index,
-        options=bidict(get_options_from_enum_options(state.states)),
+        options=shared_options(get_options_from_enum_options(state.states)),
     )
 
 
@@ -959,7 +1121,7 @@ def build_controls_from_hob_zones(  # noqa: C901
                     key=f"{zone_prefix}_program",
                     read_index=program_read_idx,
                     write_index=program_write_idx,
-                    options=bidict(
+                    options=shared_options(
                         get_options_from_enum_options(default_zone.program.values)
                     ),
                 )
@@ -1013,7 +1175,7 @@ def build_controls_from_hob_zones(  # noqa: C901
                             key=f"{zone_prefix}_{sub_key}",
                             read_index=read_idx,
                             write_index=write_idx,
-                            options=bidict(
+                            options=shared_options(
                                 get_options_from_enum_options(sub_program.enumValues)
                             ),
                             program_write_index=program_write_idx,
@@ -1027,7 +1189,7 @@ def build_controls_from_hob_zones(  # noqa: C901
                             key=f"{zone_prefix}_{sub_key}",
                             read_index=read_idx,
                             write_index=write_idx,
-                            options=bidict(
+                            options=shared_options(
                                 get_options_from_enum_options(sub_program.enumValues)
                             ),
                         )
@@ -1045,7 +1207,9 @@ def build_controls_from_hob_zones(  # noqa: C901
                     EnumControl(
                         key=f"{zone_prefix}_{mon_key}",
                         read_index=read_idx,
-                        options=get_options_from_enum_options(monitoring.enumValues),
+                        options=shared_options(
+                            get_options_from_enum_options(monitoring.enumValues)
+                        ),
                     )
                 )
 
@@ -1058,8 +1222,10 @@ def build_controls_from_hob_zones(  # noqa: C901
                     EnumControl(
                         key=f"{zone_prefix}_cooking_state",
                         read_index=cook_read_idx,
-                        options=get_options_from_enum_options(
-                            default_zone.cookingStates.states
+                        options=shared_options(
+                            get_options_from_enum_options(
+                                default_zone.cookingStates.states
+                            )
                         ),
                     )
                 )
@@ -1201,86 +1367,73 @@ def extract_ac_control(control_list: list[Control]) -> list[Control]:
     return control_list
 
 
-# Only generate controls once to allow basic inter-Control communication
-# Use entry id as key to avoid issues when multiple homewhiz devices are used
-controls: dict[str, list[Control]] = {}
-
-
 def generate_controls_from_config(
     key: str,
     config: ApplianceConfiguration,
 ) -> list[Control]:
-    if key not in controls:
-        state_control = build_control_from_state(getattr(config, "deviceStates", None))
+    """Builds new controls, entries get theirs from the control registry"""
+    state_control = build_control_from_state(getattr(config, "deviceStates", None))
 
-        program_control = build_control_from_program(getattr(config, "program", None))
-
-        sub_program_controls = list(
-            build_controls_from_features(getattr(config, "subPrograms", None) or [])
-        )
-        custom_sub_program_controls = list(
-            build_controls_from_features(
-                getattr(config, "customSubPrograms", None) or []
-            )
-        )
-        monitorings_controls = list(
-            build_controls_from_monitorings(getattr(config, "monitorings", None) or [])
-        )
+    program_control = build_control_from_program(getattr(config, "program", None))
 
-        progress_controls = (
-            build_controls_from_progress_variables(
-                getattr(config, "progressVariables", None), state_control
-            )
-            if getattr(config, "progressVariables", None) is not None
-            else []
-        )
+    sub_program_controls = list(
+        build_controls_from_features(getattr(config, "subPrograms", None) or [])
+    )
+    custom_sub_program_controls = list(
+        build_controls_from_features(getattr(config, "customSubPrograms", None) or [])
+    )
+    monitorings_controls = list(
+        build_controls_from_monitorings(getattr(config, "monitorings", None) or [])
+    )
 
-        remote_control = build_control_from_remote_control(
-            getattr(config, "remoteControl", None)
+    progress_controls = (
+        build_controls_from_progress_variables(
+            getattr(config, "progressVariables", None), state_control
         )
+        if getattr(config, "progressVariables", None) is not None
+        else []
+    )
 
-        warnings_controls: list[Control] = []
-        if getattr(config, "deviceWarnings", None) is not None:
-            warnings_controls.extend(
-                build_controls_from_warnings(config.deviceWarnings)
-            )
-        if getattr(config, "warnings", None) is not None:
-            warnings_controls.extend(build_controls_from_warnings(config.warnings))
-
-        settings_controls = list(
-            build_controls_from_features(getattr(config, "settings", None) or [])
-        )
+    remote_control = build_control_from_remote_control(
+        getattr(config, "remoteControl", None)
+    )
 
-        # Hob zones support
-        hob_zones_controls = build_controls_from_hob_zones(
-            getattr(config, "zones", None)
-        )
+    warnings_controls: list[Control] = []
+    if getattr(config, "deviceWarnings", None) is not None:
+        warnings_controls.extend(build_controls_from_warnings(config.deviceWarnings))
+    if getattr(config, "warnings", None) is not None:
+        warnings_controls.extend(build_controls_from_warnings(config.warnings))
 
-        possible_controls: list[Control | None] = [
-            state_control,
-            program_control,
-            build_control_from_substate(getattr(config, "deviceSubStates", None)),
-            *sub_program_controls,
-            *custom_sub_program_controls,
-            *monitorings_controls,
-            *progress_controls,
-            remote_control,
-            *warnings_controls,
-            *settings_controls,
-            *hob_zones_controls,
-        ]
+    settings_controls = list(
+        build_controls_from_features(getattr(config, "settings", None) or [])
+    )
 
-        tmp_controls = [
-            convert_to_bool_control_if_possible(control)
-            for control in possible_controls
-            if control is not None
-        ]
+    # Hob zones support
+    hob_zones_controls = build_controls_from_hob_zones(getattr(config, "zones", None))
+
+    possible_controls: list[Control | None] = [
+        state_control,
+        program_control,
+        build_control_from_substate(getattr(config, "deviceSubStates", None)),
+        *sub_program_controls,
+        *custom_sub_program_controls,
+        *monitorings_controls,
+        *progress_controls,
+        remote_control,
+        *warnings_controls,
+        *settings_controls,
+        *hob_zones_controls,
+    ]
 
-        _LOGGER.debug(
-            "generate_controls_from_config: key=%s -> %d controls",
-            key,
-            len(tmp_controls),
-        )
-        controls[key] = extract_ac_control(tmp_controls)
+    tmp_controls = [
+        convert_to_bool_control_if_possible(control)
+        for control in possible_controls
+        if control is not None
+    ]
 
-    return controls[key]
+    _LOGGER.debug(
+        "generate_controls_from_config: key=%s -> %d controls",
+        key,
+        len(tmp_controls),
+    )
+    return extract_ac_control(tmp_controls)
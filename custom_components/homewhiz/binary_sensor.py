@@ -1,7 +1,6 @@
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -9,12 +8,11 @@ from custom_components.homewhiz import DOMAIN
 from custom_components.homewhiz.appliance_controls import (
     BooleanControl,
     WriteBooleanControl,
-    generate_controls_from_config,
 )
 from custom_components.homewhiz.config_flow import EntryData
 from custom_components.homewhiz.entity import HomeWhizEntity
-from custom_components.homewhiz.helper import build_entry_data
 from custom_components.homewhiz.homewhiz import HomewhizCoordinator
+from custom_components.homewhiz.runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -27,22 +25,26 @@ class HomeWhizBinarySensorEntity(HomeWhizEntity, BinarySensorEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._control = control
 
     @property
     def is_on(self) -> bool | None:  # type: ignore[override]
         if self.coordinator.data is None:
             return None
-        return self._control.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control)
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     boolean_controls = [
         c
         for c in controls
@@ -0,0 +1,182 @@
+"""Queues the GATT writes of a Bluetooth appliance.
+
+Writes used to hold the connection lock, the one connect and disconnect
+take, for every GATT write, so a burst of commands queued up behind a
+reconnect. The queue has its own single writer instead:
+
+- writes to an index that is still queued replace its value (last write
+  wins), the appliance only needs the final one. The write moves to the end
+  of the queue, so a batch still goes out in the order it was sent,
+- at most MAX_QUEUE_DEPTH indices wait at a time, more are rejected instead
+  of piling up behind a slow or lost connection,
+- writes without response (the bt_write_without_response option) send
+  the next write without waiting for the appliance to acknowledge the
+  previous one. The command tracker confirms them by the value the
+  appliance reports and resends lost ones,
+- a failed write doesn't hold back the rest of its batch, only the
+  commands that failed roll back.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .homewhiz import Command
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+MAX_QUEUE_DEPTH = 16
+
+
+@dataclass
+class _QueuedWrite:
+    value: int
+    queued_at: float = field(default_factory=time.monotonic)
+    # Shared by every caller whose write got merged into this one
+    done: asyncio.Future[None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+@dataclass
+class WriteQueueStats:
+    writes: int = 0
+    failed: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    max_depth: int = 0
+    # Seconds from queueing a write until it was written
+    last_latency: float | None = None
+    total_latency: float = 0.0
+
+    def as_dict(self, depth: int) -> dict[str, Any]:
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "writes": self.writes,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "last_latency_ms": (
+                None if self.last_latency is None else self.last_latency * 1000
+            ),
+            "mean_latency_ms": (
+                self.total_latency / self.writes * 1000 if self.writes else None
+            ),
+        }
+
+
+class BleWriteQueue:
+    def __init__(
+        self,
+        write: Callable[[Command], Awaitable[None]],
+        max_depth: int = MAX_QUEUE_DEPTH,
+    ) -> None:
+        self._write = write
+        self._max_depth = max_depth
+        # Write index -> value waiting to be written, in queueing order
+        self._queued: dict[int, _QueuedWrite] = {}
+        self._in_flight = 0
+        self._writer: asyncio.Task[None] | None = None
+        self.stats = WriteQueueStats()
+
+    @property
+    def depth(self) -> int:
+        """Writes queued or being written."""
+        return len(self._queued) + self._in_flight
+
+    async def async_write(self, commands: Sequence[Command]) -> list[Command]:
+        """Write the commands in order, return the ones that were written.
+
+        A failed write doesn't stop the others of the batch, they are
+        queued already. Raises only if none of them was written.
+        """
+        done = self.async_enqueue(commands)
+        # A cancelled caller must not cancel writes merged with other callers
+        results = await asyncio.gather(
+            *(asyncio.shield(future) for future in done), return_exceptions=True
+        )
+        written: list[Command] = []
+        errors: list[BaseException] = []
+        for command, result in zip(commands, results, strict=True):
+            if isinstance(result, BaseException):
+                errors.append(result)
+            else:
+                written.append(command)
+        if errors and not written:
+            raise errors[0]
+        return written
+
+    @callback
+    def async_enqueue(self, commands: Sequence[Command]) -> list[asyncio.Future[None]]:
+        """Queue the commands, all of them or none if the queue is full."""
+        queued = self._queued
+        new_indices = {c.index for c in commands if c.index not in queued}
+        if len(queued) + len(new_indices) > self._max_depth:
+            self.stats.rejected += len(commands)
+            _LOGGER.warning("Write queue full, rejecting %d commands", len(commands))
+            raise HomeAssistantError("Too many commands waiting for the device")
+        done = []
+        for command in commands:
+            if (write := queued.pop(command.index, None)) is not None:
+                _LOGGER.debug(
+                    "Replacing queued write %s:%s with %s",
+                    command.index,
+                    write.value,
+                    command.value,
+                )
+                write.value = command.value
+                self.stats.coalesced += 1
+            else:
+                write = _QueuedWrite(command.value)
+            queued[command.index] = write
+            done.append(write.done)
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._async_drain())
+        return done
+
+    async def _async_drain(self) -> None:
+        try:
+            while self._queued:
+                index = next(iter(self._queued))
+                write = self._queued.pop(index)
+                self._in_flight = 1
+                try:
+                    await self._write(Command(index, write.value))
+                except asyncio.CancelledError:
+                    write.done.set_exception(HomeAssistantError("Write cancelled"))
+                    raise
+                except Exception as e:  # noqa: BLE001
+                    self.stats.failed += 1
+                    if not write.done.done():
+                        write.done.set_exception(e)
+                    continue
+                finally:
+                    self._in_flight = 0
+                latency = time.monotonic() - write.queued_at
+                self.stats.writes += 1
+                self.stats.last_latency = latency
+                self.stats.total_latency += latency
+                if not write.done.done():
+                    write.done.set_result(None)
+        finally:
+            if self._writer is asyncio.current_task():
+                self._writer = None
+
+    @callback
+    def async_close(self) -> None:
+        """Stop writing, fail the writes that are still queued."""
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        for write in self._queued.values():
+            if not write.done.done():
+                write.done.set_exception(HomeAssistantError("Device disconnected"))
+        self._queued.clear()
@@ -1,46 +1,103 @@
 import asyncio
 import contextlib
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 
 from bleak import BleakClient, BLEDevice
-from bleak_retry_connector import establish_connection
+from bleak.backends.service import BleakGATTServiceCollection
+from bleak.exc import BleakError
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
 from homeassistant.components import bluetooth
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.event import async_track_point_in_time
 
+from .ble_write_queue import BleWriteQueue
 from .const import DOMAIN
 from .homewhiz import Command, HomewhizCoordinator
+from .reconnect_policy import ReconnectPolicy
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
+# Notifications start with a header, byte 4 is the index of the segment
+HEADER_LENGTH = 7
+SEGMENT_INDEX = 4
+SEGMENTS_PER_FRAME = 2
+
+NOTIFY_CHARACTERISTIC = "0000ac02-0000-1000-8000-00805f9b34fb"
+# Subscribing right after connecting can fail while the device settles, it
+# is retried with a doubling delay for up to NOTIFY_READY_TIMEOUT seconds
+NOTIFY_RETRY_DELAY = 0.05
+NOTIFY_READY_TIMEOUT = 2.0
+# Longest wait for an advertisement while the device is out of range
+ADVERTISEMENT_TIMEOUT = 60
+
+
 class MessageAccumulator:
-    def __init__(self) -> None:
+    """Joins the segments of a frame into a reused buffer.
+
+    Two buffers take turns: the frame returned last stays untouched while the
+    next one is assembled, so the coordinator can still compare against it.
+    Once the buffers have the size of a frame, assembling one allocates
+    nothing but the payload slices.
+    """
+
+    def __init__(self, segments: int = SEGMENTS_PER_FRAME) -> None:
+        self._last_index = segments - 1
         self._expected_index = 0
-        self._accumulated: bytearray = bytearray()
+        self._buffers = [bytearray(), bytearray()]
+        self._buffer = self._buffers[0]
 
     def accumulate_message(self, message: bytearray) -> bytearray | None:
-        message_index = message[4]
-        _LOGGER.debug("Message index: %d", message_index)
+        # handle_notify logs the whole message, header included
+        message_index = message[SEGMENT_INDEX]
+        buffer = self._buffer
         if message_index == 0:
-            self._accumulated = message[7:]
-            self._expected_index = 1
-        elif message_index == 1 and self._expected_index == 1:
-            full_message = self._accumulated + message[7:]
-            self._expected_index = 0
-            return full_message
+            buffer[:] = message[HEADER_LENGTH:]
+        elif message_index == self._expected_index:
+            buffer += message[HEADER_LENGTH:]
         else:
             # Unexpected sequence: reset to avoid getting permanently stuck
             _LOGGER.warning(
                 "Unexpected message index %d, resetting accumulator", message_index
             )
             self._expected_index = 0
-            self._accumulated = bytearray()
-        return None
+            return None
+        if message_index < self._last_index:
+            self._expected_index = message_index + 1
+            return None
+
+        self._expected_index = 0
+        buffers = self._buffers
+        self._buffer = buffers[0] = buffers[1]
+        buffers[1] = buffer
+        return buffer
+
+
+@dataclass
+class ConnectionStats:
+    connects: int = 0
+    # Seconds, measured from the start of connect()
+    last_connect_duration: float | None = None
+    last_notify_ready: float | None = None
+    last_time_to_first_frame: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "connects": self.connects,
+            "last_connect_duration_ms": _milliseconds(self.last_connect_duration),
+            "last_notify_ready_ms": _milliseconds(self.last_notify_ready),
+            "last_time_to_first_frame_ms": _milliseconds(self.last_time_to_first_frame),
+        }
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return None if seconds is None else seconds * 1000
 
 
 class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
@@ -49,20 +106,35 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
         hass: HomeAssistant,
         address: str,
         reconnect_interval: int | None = None,
+        write_without_response: bool = False,
     ) -> None:
         self.address = address
         self._accumulator = MessageAccumulator()
+        # Latest complete frame, waiting to be published
+        self._pending_frame: bytearray | None = None
         self._hass = hass
         self._device: BLEDevice | None = None
         self._device_lock = asyncio.Lock()
-        self._connection: BleakClient | None = None
+        self._connection: BleakClientWithServiceCache | None = None
+        # GATT services of the last connection, reconnects skip discovery
+        self._cached_services: BleakGATTServiceCollection | None = None
         self._connection_lock = asyncio.Lock()
         self.alive = True
         # To ensure that only one reconnect is performed at a time
         self.reconnecting_lock = asyncio.Lock()
+        self.reconnect_policy = ReconnectPolicy(address)
+        # Set by advertisements of the device, wakes up try_reconnect
+        self._advertised = asyncio.Event()
+        self.connection_stats = ConnectionStats()
+        # time.monotonic() of the connect still waiting for its first frame
+        self._connect_started: float | None = None
         # Allow users to configure regular Bluetooth reconnections
         self._reconnect_interval: int | None = reconnect_interval
         self._reconnect_interval_task: None | Callable = None
+        # Writes don't wait for an acknowledgement, confirmation is left to
+        # the command tracker
+        self._write_response: bool | None = False if write_without_response else None
+        self._write_queue = BleWriteQueue(self._async_write_gatt)
         super().__init__(hass, _LOGGER, name=DOMAIN)
 
     async def connect(self) -> bool:
@@ -74,6 +146,7 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                 _LOGGER.debug("Already connected, skipping connect()")
                 return True
             _LOGGER.info("Connecting to %s", self.address)
+            connect_started = time.monotonic()
             async with self._device_lock:
                 self._device = bluetooth.async_ble_device_from_address(
                     self._hass, self.address, connectable=True
@@ -89,10 +162,12 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                 # How to clear disconnected_callback?
                 _LOGGER.debug("Establishing connection")
                 self._connection = await establish_connection(
-                    client_class=BleakClient,
+                    client_class=BleakClientWithServiceCache,
                     device=self._device,
                     disconnected_callback=self.disconnected_callback,
                     name=self.address,
+                    cached_services=self._cached_services,
+                    ble_device_callback=self._latest_device,
                 )
 
             def _raise_cant_connect() -> None:
@@ -103,17 +178,9 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                 if not self._connection.is_connected:
                     _raise_cant_connect()
 
-                # Brief settle time before subscribing. The 0.5s is not
-                # backed by a measurement, do not drop it untested.
-                await asyncio.sleep(0.5)
-
                 _LOGGER.debug("Starting notify")
-                await self._connection.start_notify(
-                    "0000ac02-0000-1000-8000-00805f9b34fb",
-                    lambda sender, message: self.hass.create_task(
-                        self.handle_notify(message)
-                    ),
-                )
+                notify_ready = await self._async_start_notify(self._connection)
+                self._cached_services = self._connection.services
                 _LOGGER.debug("Sending initial command")
                 await self._connection.write_gatt_char(
                     "0000ac01-0000-1000-8000-00805f9b34fb",
@@ -129,9 +196,19 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                 )
                 with contextlib.suppress(Exception):
                     await self._connection.disconnect()
+                # The services may have changed, discover them next time
+                self._cached_services = None
+                with contextlib.suppress(Exception):
+                    await self._connection.clear_cache()
                 self._connection = None  # ensure clean state for next attempt
                 raise
 
+            stats = self.connection_stats
+            stats.connects += 1
+            stats.last_notify_ready = notify_ready
+            stats.last_connect_duration = time.monotonic() - connect_started
+            self._connect_started = connect_started
+
         # To retrieve RSSI value
         # https://developers.home-assistant.io/docs/core/bluetooth/api/#fetching-the-latest-bluetoothserviceinfobleak-for-a-device
         _LOGGER.debug("Fetching service info")
@@ -151,6 +228,37 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
 
         return True
 
+    def _latest_device(self) -> BLEDevice:
+        # Retries of establish_connection use the latest advertised device
+        device = bluetooth.async_ble_device_from_address(
+            self._hass, self.address, connectable=True
+        )
+        if device is None:
+            assert self._device is not None
+            return self._device
+        return device
+
+    async def _async_start_notify(self, connection: BleakClient) -> float:
+        """Subscribe once the device accepts it, return how long that took."""
+        started = time.monotonic()
+        delay = NOTIFY_RETRY_DELAY
+        while True:
+            try:
+                await connection.start_notify(
+                    NOTIFY_CHARACTERISTIC,
+                    lambda _sender, message: self.handle_notify(message),
+                )
+                break
+            except BleakError:
+                if time.monotonic() - started + delay > NOTIFY_READY_TIMEOUT:
+                    raise
+                _LOGGER.debug("Device not ready to notify, retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+        ready = time.monotonic() - started
+        _LOGGER.debug("Notify started after %.0f ms", ready * 1000)
+        return ready
+
     def create_reconnect_interval_task(self) -> None:
         # Cancel any existing task
         if self._reconnect_interval_task:
@@ -189,6 +297,16 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
             if connection is not None:
                 self.hass.create_task(connection.disconnect())
 
+    @callback
+    def async_advertisement_received(self) -> None:
+        self._advertised.set()
+
+    async def _async_wait_for_advertisement(self, timeout: float) -> None:
+        self._advertised.clear()
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(timeout):
+                await self._advertised.wait()
+
     async def try_reconnect(self) -> None:
         async with self.reconnecting_lock:
             _LOGGER.debug("[%s] Trying to reconnect", self.address)
@@ -200,21 +318,36 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                         "Device not found. "
                         "Will reconnect automatically when the device becomes available"
                     )
-                    await asyncio.sleep(60)
+                    # Connect as soon as the device advertises again
+                    await self._async_wait_for_advertisement(ADVERTISEMENT_TIMEOUT)
                     continue  # keep waiting instead of giving up
+                policy = self.reconnect_policy
+                if not policy.allow_attempt():
+                    await asyncio.sleep(policy.delay)
+                    continue
                 try:
                     _LOGGER.debug(
                         "[%s] Establish connection from reconnect",
                         self.address,
                     )
-                    await self.connect()
+                    await policy.async_attempt(self.connect)
                     # Reconnect was successful!
                     _LOGGER.debug("Reconnecting was successful!")
                 except Exception:
-                    _LOGGER.exception(
-                        "Can't reconnect. Waiting 30 seconds to try again"
+                    # The policy warns once the circuit opens, no need to
+                    # repeat the stack trace every attempt after that
+                    _LOGGER.log(
+                        logging.DEBUG if policy.is_open else logging.ERROR,
+                        "Can't reconnect. Waiting %.0f seconds to try again",
+                        policy.delay,
+                        exc_info=True,
                     )
-                    await asyncio.sleep(30)
+
+    async def async_connect_attempt(self) -> bool:
+        """Connect unless the reconnect policy holds attempts back."""
+        if not self.reconnect_policy.allow_attempt():
+            return False
+        return await self.reconnect_policy.async_attempt(self.connect)
 
     async def handle_disconnect(
         self, client: BleakClient | None = None, *args: Any
@@ -238,42 +371,86 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
                 _LOGGER.info("Triggering disconnect")
                 with contextlib.suppress(Exception):
                     await self._connection.disconnect()
+            # A frame of the old connection must not be published after None
+            self._pending_frame = None
             self.hass.add_job(self.async_set_updated_data, None)
             self._connection = None
         # Spawn the task AFTER releasing the lock
         _LOGGER.info("[%s] Disconnected", self.address)
         self.hass.create_task(self.try_reconnect())
 
-    # @callback removed – the function is invoked via create_task, not called directly
-    async def handle_notify(self, message: bytearray) -> None:
+    @callback
+    def handle_notify(self, message: bytearray) -> None:
+        """Reassemble a notification, publish complete frames.
+
+        Bleak calls this on the event loop for every notification. Only a
+        complete frame schedules a publish, and frames completing within the
+        same loop iteration are published once, as the latest of them.
+        """
         _LOGGER.debug("Message received: %s", message)
         if len(message) < 10:
             _LOGGER.debug("Ignoring short message")
             return
         full_message = self._accumulator.accumulate_message(message)
-        if full_message is not None:
-            _LOGGER.debug(
-                "Full message: %s",
-                full_message,
-            )
-            self.async_set_updated_data(full_message)
+        if full_message is None:
+            return
+        if self._pending_frame is None:
+            self.hass.loop.call_soon(self._async_publish_frame)
+        else:
+            _LOGGER.debug("Replacing a frame that was not published yet")
+        self._pending_frame = full_message
 
-    async def send_command(self, command: Command) -> None:
+    @callback
+    def _async_publish_frame(self) -> None:
+        frame = self._pending_frame
+        if frame is None:
+            return
+        self._pending_frame = None
+        _LOGGER.debug("Full message: %s", frame)
+        if self._connect_started is not None:
+            first_frame = time.monotonic() - self._connect_started
+            self._connect_started = None
+            self.connection_stats.last_time_to_first_frame = first_frame
+            _LOGGER.debug("First frame %.0f ms after connecting", first_frame * 1000)
+        if frame is self._reported:
+            # Skipping a frame let the accumulator reuse the buffer of the
+            # published one, there is nothing left to compare against
+            self.async_set_updated_frame(frame, None)
+        else:
+            self.async_set_updated_data(frame)
+
+    async def write_command(self, command: Command) -> bool:
+        return bool(await self.write_commands([command]))
+
+    async def write_commands(self, commands: Sequence[Command]) -> list[Command]:
+        """Write the commands through the write queue, in order."""
+        written = await self._write_queue.async_write(commands)
+        _LOGGER.debug("%d of %d commands sent", len(written), len(commands))
+        return written
+
+    async def _async_write_gatt(self, command: Command) -> None:
+        # No connection lock, a reconnect in progress fails the write instead
+        # of holding it up
+        connection = self._connection
+        if connection is None or not connection.is_connected:
+            _LOGGER.warning("Cannot send command: not connected")
+            raise HomeAssistantError("Device not connected")
         _LOGGER.debug("Sending command %s:%s", command.index, command.value)
-        async with self._connection_lock:
-            if self._connection is None or not self._connection.is_connected:
-                _LOGGER.warning("Cannot send command: not connected")
-                raise HomeAssistantError("Device not connected")
-            payload = bytearray([2, 4, 0, 4, 0, command.index, 1, command.value])
-            try:
-                await self._connection.write_gatt_char(
-                    "0000ac01-0000-1000-8000-00805F9B34FB",
-                    payload,
-                )
-            except Exception as e:
-                _LOGGER.error("Failed to send command: %s", e)
-                raise
-            _LOGGER.debug("Command sent")
+        # One index/value pair per write, the protocol has no batches
+        payload = bytearray([2, 4, 0, 4, 0, command.index, 1, command.value])
+        try:
+            await connection.write_gatt_char(
+                "0000ac01-0000-1000-8000-00805F9B34FB",
+                payload,
+                response=self._write_response,
+            )
+        except Exception as e:
+            _LOGGER.error("Failed to send command: %s", e)
+            raise
+
+    @property
+    def write_queue_stats(self) -> dict[str, Any]:
+        return self._write_queue.stats.as_dict(self._write_queue.depth)
 
     @property
     def is_connected(self) -> bool:
@@ -282,6 +459,8 @@ class HomewhizBluetoothUpdateCoordinator(HomewhizCoordinator):
     async def kill(self) -> None:
         _LOGGER.debug("[%s] Killing connection", self.address)
         self.alive = False  # set FIRST, before calling disconnect()
+        self._write_queue.async_close()
+        self.async_cancel_confirmations()
         async with self._connection_lock:
             if self._connection is not None:
                 with contextlib.suppress(Exception):
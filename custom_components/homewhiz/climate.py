@@ -6,17 +6,16 @@ from homeassistant.components.climate import (  # type: ignore[import]
     ClimateEntityFeature,
     HVACMode,
 )
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .appliance_controls import ClimateControl, generate_controls_from_config
+from .appliance_controls import ClimateControl
 from .config_flow import EntryData
 from .const import DOMAIN
 from .entity import HomeWhizEntity
-from .helper import build_entry_data
 from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -33,7 +32,9 @@ class HomeWhizClimateEntity(HomeWhizEntity, ClimateEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._control = control
         self._previous_hvac_mode: HVACMode | None = None
 
@@ -59,13 +60,13 @@ class HomeWhizClimateEntity(HomeWhizEntity, ClimateEntity):
     def preset_mode(self) -> str | None:
         if self.coordinator.data is None:
             return None
-        return self._control.preset_mode.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control.preset_mode)
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         _LOGGER.debug("Changing preset mode %s", preset_mode)
-        commands = self._control.preset_mode.set_value(preset_mode)
-        for command in commands:
-            await self.coordinator.send_command(command)
+        await self.coordinator.send_commands(
+            self._control.preset_mode.set_value(preset_mode)
+        )
 
     @property
     def hvac_modes(self) -> list[HVACMode]:  # type: ignore[override]
@@ -76,16 +77,16 @@ class HomeWhizClimateEntity(HomeWhizEntity, ClimateEntity):
         data = self.coordinator.data
         if data is None:
             return None
-        return self._control.hvac_mode.get_value(data)
+        return self.coordinator.read(self._control.hvac_mode)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         _LOGGER.debug("Changing HVAC mode %s", hvac_mode)
         data = self.coordinator.data
         if data is None:
             return
-        commands = self._control.hvac_mode.set_value(hvac_mode, data)
-        for command in commands:
-            await self.coordinator.send_command(command)
+        await self.coordinator.send_commands(
+            self._control.hvac_mode.set_value(hvac_mode, data)
+        )
 
     async def async_turn_off(self) -> None:
         self._previous_hvac_mode = self.hvac_mode
@@ -142,23 +143,25 @@ class HomeWhizClimateEntity(HomeWhizEntity, ClimateEntity):
     def swing_mode(self) -> str | None:  # type: ignore[override]
         if self.coordinator.data is None:
             return None
-        return self._control.swing.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control.swing)
 
     async def async_set_swing_mode(self, swing_mode: str) -> None:
         _LOGGER.debug("Changing swing mode %s", swing_mode)
         if self.coordinator.data is None:
             return
-        commands = self._control.swing.set_value(swing_mode, self.coordinator.data)
-        for command in commands:
-            await self.coordinator.send_command(command)
+        await self.coordinator.send_commands(
+            self._control.swing.set_value(swing_mode, self.coordinator.data)
+        )
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     climate_controls = [c for c in controls if isinstance(c, ClimateControl)]
     _LOGGER.debug("ACs: %s", [c.key for c in climate_controls])
     async_add_entities(
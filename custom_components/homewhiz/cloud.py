@@ -1,305 +1,83 @@
 import asyncio
-import functools
 import json
 import logging
-import uuid
-from collections.abc import Callable
-from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
+from collections.abc import Sequence
 from typing import Any
 
-import aiohttp
-from dacite import from_dict
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import (
-    async_track_point_in_time,
-    async_track_point_in_utc_time,
-    async_track_time_interval,
-)
 
-from .api import login
 from .config_flow import CloudConfig
 from .const import DOMAIN
 from .homewhiz import Command, HomewhizCoordinator
+from .mqtt_hub import async_get_mqtt_hub, async_wait_crt
+from .poll_scheduler import PollScheduler
+from .shadow_state import ShadowState, ShadowUpdate, parse_shadow_update
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
-@dataclass
-class Reported:
-    connected: bool | str | None = None
-    brand: str | int | None = None
-    applianceType: str | int | None = None
-    model: str | None = None
-    applianceId: str | None = None
-    macAddr: str | None = None
-    wfa: list[int] | None = None
-    modifiedTime: int | None = None
-    wfaSizeModifiedTime: int | None = None
-    wfaSize: str | int | None = None
-    wfaStartOffset: str | int = 26
-
-
-@dataclass
-class Metadata:
-    reported: Reported | None = None
-
-
-@dataclass
-class State:
-    reported: Reported | None = None
-
-
-@dataclass
-class MqttPayload:
-    state: State | None = None
-
-
-def shadow_payload_to_data(payload: str) -> bytearray | None:
-    """Decode an AWS shadow payload into the raw device byte array.
-
-    Returns None when the payload carries no reported state, or when the
-    reported state is metadata-only (e.g. a connected/modifiedTime update)
-    and has no wfa array yet.
-    """
-    message = from_dict(MqttPayload, json.loads(payload))
-    if message.state and message.state.reported:
-        reported = message.state.reported
-        if reported.wfa is None:
-            return None
-        offset = int(reported.wfaStartOffset or 26)
-        wfa = reported.wfa
-        padding = [0 for _ in range(offset)]
-        return bytearray(padding + wfa)
-    return None
-
-
 class HomewhizCloudUpdateCoordinator(HomewhizCoordinator):
     def __init__(
         self,
         hass: HomeAssistant,
         appliance_id: str,
         cloud_config: CloudConfig,
-        entry: ConfigEntry,
     ) -> None:
         from awscrt import mqtt  # noqa: PLC0415
 
         self._appliance_id = appliance_id
         self._hass = hass
-        self._cloud_config = cloud_config
         self.alive = True
         self._mqtt = mqtt
-        self._connection: mqtt.Connection | None = None
-        self._is_connected = False
-        self._entry = entry
+        self._hub = async_get_mqtt_hub(hass, cloud_config)
         self._is_tuya = self._appliance_id.startswith("T")
-        self._update_timer_task: Callable | None = None
+        self._shadow = ShadowState()
+        self._poll_scheduler = PollScheduler(
+            hass, self.force_read, self._device_state, self._commands_pending
+        )
 
         super().__init__(hass, _LOGGER, name=DOMAIN)
 
-    async def connect(self) -> bool:
-        from awscrt.auth import AwsCredentialsProvider  # noqa: PLC0415
-        from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
-        from awsiot import (  # noqa: PLC0415
-            mqtt_connection_builder,
-        )
+    @property
+    def _connection(self) -> Any:
+        return self._hub.connection
 
+    async def connect(self) -> bool:
         _LOGGER.info("Connecting to %s", self._appliance_id)
-        try:
-            credentials = await login(
-                self._cloud_config.username, self._cloud_config.password
-            )
-        except (TimeoutError, aiohttp.ClientError):
-            # Transient login failure (e.g. HA boots before DNS is ready after an
-            # outage): schedule a retry like the AwsCrtError path, don't die.
-            _LOGGER.exception(
-                "Login to the cloud failed (transient). Will retry in one minute."
-            )
-            self._entry.async_on_unload(
-                async_track_point_in_time(
-                    hass=self.hass,
-                    action=self.refresh_connection,  # type: ignore[arg-type]
-                    point_in_time=datetime.today() + timedelta(minutes=1),
-                )
-            )
-            return False
-
-        expiration = datetime.fromtimestamp(credentials.expiration / 1000, tz=UTC)
-        _LOGGER.debug("Credentials expire at: %s", expiration)
-
-        credentials_provider = AwsCredentialsProvider.new_static(
-            access_key_id=credentials.accessKey,
-            session_token=credentials.sessionToken,
-            secret_access_key=credentials.secretKey,
-        )
-
-        loop = asyncio.get_running_loop()
-        mqtt_connection_builder_task = loop.run_in_executor(
-            None,
-            functools.partial(
-                mqtt_connection_builder.websockets_with_default_aws_signing,
-                client_id=uuid.uuid1().hex,
-                endpoint="ajf7v9dcoe69w-ats.iot.eu-west-1.amazonaws.com",
-                region="eu-west-1",
-                credentials_provider=credentials_provider,
-                on_connection_interrupted=self.on_connection_interrupted,
-                on_connection_resumed=self.on_connection_resumed,
-                clean_session=False,
-                keep_alive_secs=1200,
-            ),
+        # The account hub keeps retrying and calls _async_on_subscribed once
+        # the appliance is subscribed
+        return await self._hub.async_add_appliance(
+            self._appliance_id, self.handle_notify, self._async_on_subscribed
         )
 
-        connection = await mqtt_connection_builder_task
-        self._connection = connection
-        try:
-            connection_future = connection.connect()
-            await loop.run_in_executor(None, connection_future.result)
-            _LOGGER.debug("MQTT connection successful")
-        except AwsCrtError:
-            _LOGGER.exception(
-                "Exception during connection to AWS occurred. Will retry in one minute."
-            )
-            self._entry.async_on_unload(
-                async_track_point_in_time(
-                    hass=self.hass,
-                    action=self.refresh_connection,  # type: ignore[arg-type]
-                    point_in_time=datetime.today() + timedelta(minutes=1),
-                )
-            )
-            return False
-
-        self._is_connected = True
-        await self._subscribe_to_topics()
-
+    async def _async_on_subscribed(self) -> None:
         # Brief settle time before the first read. The 0.5s is not backed
         # by a measurement, do not drop it untested.
         await asyncio.sleep(0.5)
+        self._shadow.restart_ordering()
         await self.force_read()
-
-        # Cancelled when the entry unloads, so a reload does not leave the
-        # timer behind. Within one load each refresh adds another canceller.
-        self._entry.async_on_unload(
-            async_track_point_in_utc_time(
-                hass=self.hass,
-                action=self.refresh_connection,  # type: ignore[arg-type]
-                point_in_time=expiration - timedelta(minutes=1),
-            )
-        )
-
-        if not self._update_timer_task:
-            self._update_timer_task = async_track_time_interval(
-                hass=self.hass,
-                action=lambda _: self.hass.add_job(self.force_read()),
-                interval=timedelta(minutes=1),
-            )
-            _LOGGER.debug("Set hass time interval update")
-
+        self._poll_scheduler.async_start()
         await self.get_shadow()
 
-        return True
+    def _device_state(self) -> Any:
+        plan = self.decode_plan
+        state = plan.control("state") if plan is not None else None
+        return None if state is None else self.read(state)
 
-    async def _subscribe_to_topics(self) -> None:
-        if self._connection is None:
-            _LOGGER.warning("Cannot subscribe: connection is None")
-            return
-
-        loop = asyncio.get_running_loop()
-
-        [subscribe_update, _] = self._connection.subscribe(
-            f"$aws/things/{self._appliance_id}/shadow/update/accepted",
-            self._mqtt.QoS.AT_LEAST_ONCE,
-            lambda topic, payload, dup, qos, retain, **kwargs: self.handle_notify(
-                payload
-            ),
-        )
-
-        [subscribe_get, _] = self._connection.subscribe(
-            f"$aws/things/{self._appliance_id}/shadow/get/accepted",
-            self._mqtt.QoS.AT_LEAST_ONCE,
-            lambda topic, payload, dup, qos, retain, **kwargs: self.handle_notify(
-                payload
-            ),
-        )
-
-        subscribe_update_result = await loop.run_in_executor(
-            None, subscribe_update.result
-        )
-        subscribe_get_result = await loop.run_in_executor(None, subscribe_get.result)
-        _LOGGER.debug("Subscribe to update result: %s", subscribe_update_result)
-        _LOGGER.debug("Subscribe to get result: %s", subscribe_get_result)
-
-    @callback
-    def on_connection_interrupted(self, error: str, **kwargs: Any) -> None:
-        _LOGGER.warning("Connection interrupted: %s", error)
-        self._is_connected = False
-
-    @callback
-    def on_connection_resumed(
-        self, return_code: int, session_present: bool, **kwargs: Any
-    ) -> None:
-        _LOGGER.info(
-            "Connection resumed - return_code: %s, session_present: %s",
-            return_code,
-            session_present,
-        )
-        self._is_connected = True
-
-        if not session_present:
-            _LOGGER.info("Session not present, resubscribing to topics")
-            # FIX: Use self.hass.async_create_task to be thread-safe from MQTT callback
-            self.hass.async_create_task(self._resubscribe_after_resume())
-
-    async def _resubscribe_after_resume(self) -> None:
-        await self._subscribe_to_topics()
-        # Same settle time as in connect().
-        await asyncio.sleep(0.5)
-        await self.force_read()
-
-    @callback
-    def refresh_connection(self, *args: Any) -> None:
-        """Sync wrapper to trigger async refresh safely."""
-        self.hass.async_create_task(self._async_refresh_connection())
-
-    async def _async_refresh_connection(self) -> None:
-        """Actual async logic for refreshing connection."""
-        _LOGGER.debug("Refreshing connection")
-        self._is_connected = (
-            False  # avoids a spurious WARNING in the planned reconnect window
-        )
-        if self._connection is not None:
-            try:
-                loop = asyncio.get_running_loop()
-                disconnect_future = self._connection.disconnect()
-                await loop.run_in_executor(None, disconnect_future.result)
-            except Exception as e:  # noqa: BLE001 # broad catch: AwsCrtError subclasses not always predictable
-                _LOGGER.debug(
-                    "Disconnect during refresh failed (already disconnected): %s",
-                    e,
-                )
-
-        # connect() runs as its own task instead of being awaited. The wrapper
-        # keeps it from ending as an unretrieved exception. The original reason
-        # for detaching it is not recorded.
-        async def _safe_connect() -> None:
-            try:
-                await self.connect()
-            except Exception as e:  # noqa: BLE001
-                _LOGGER.error("Reconnect after refresh failed: %s", e)
-
-        self.hass.async_create_task(_safe_connect())
+    def _commands_pending(self) -> bool:
+        return self.command_tracker is not None and self.command_tracker.pending
 
     def _handle_mqtt_disconnect_error(self, e: Exception, action: str) -> None:
-        if self._is_connected:
+        if self._hub.is_connected:
             _LOGGER.warning("%s failed: MQTT connection lost: %s", action, e)
         else:
             _LOGGER.debug("%s attempted while MQTT disconnected: %s", action, e)
-        self._is_connected = False
+        self._hub.connection_lost()
 
     async def force_read(self, *args: Any) -> None:
         from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
 
-        if self._connection is None or not self._is_connected:
+        if self._connection is None or not self._hub.is_connected:
             _LOGGER.debug("Cannot force read: MQTT connection not available")
             return
 
@@ -319,10 +97,7 @@ class HomewhizCloudUpdateCoordinator(HomewhizCoordinator):
                 qos=self._mqtt.QoS.AT_MOST_ONCE,
             )
 
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, functools.partial(publish.result, timeout=5.0)
-            )
+            result = await async_wait_crt(publish, timeout=5.0)
 
             _LOGGER.debug("Force read result: %s", result)
         except (RuntimeError, AwsCrtError) as e:
@@ -338,7 +113,7 @@ class HomewhizCloudUpdateCoordinator(HomewhizCoordinator):
         """Get shadow non-blocking."""
         from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
 
-        if self._connection is None or not self._is_connected:
+        if self._connection is None or not self._hub.is_connected:
             _LOGGER.debug("Cannot get shadow: MQTT connection not available")
             return
 
@@ -349,10 +124,7 @@ class HomewhizCloudUpdateCoordinator(HomewhizCoordinator):
                 qos=self._mqtt.QoS.AT_MOST_ONCE,
             )
 
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, functools.partial(publish.result, timeout=5.0)
-            )
+            result = await async_wait_crt(publish, timeout=5.0)
 
             _LOGGER.debug("Get shadow result: %s", result)
         except (RuntimeError, AwsCrtError) as e:
@@ -364,78 +136,81 @@ class HomewhizCloudUpdateCoordinator(HomewhizCoordinator):
         except Exception as e:  # noqa: BLE001
             _LOGGER.error("Get shadow failed: %s", e)
 
-    async def send_command(self, command: Command) -> None:
+    async def write_command(self, command: Command) -> bool:
+        return bool(await self.write_commands([command]))
+
+    async def write_commands(self, commands: Sequence[Command]) -> list[Command]:
+        """Publish all commands at once and read them back once."""
         from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
 
-        if self._connection is None or not self._is_connected:
+        if self._connection is None or not self._hub.is_connected:
             _LOGGER.debug("Cannot send command: MQTT connection not available")
-            return
+            return []
 
         suffix = "/tuyacommand" if self._is_tuya else "/command"
-        obj = {
-            "type": "write",
-            "prm": f"[{command.index},{command.value}]",
-        }
-
-        if self._is_tuya:
-            obj["applianceId"] = self._appliance_id
-        message = json.dumps(obj)
-
         try:
-            [publish, _] = self._connection.publish(
-                self._appliance_id + suffix,
-                message,
-                qos=self._mqtt.QoS.AT_LEAST_ONCE,
-            )
-
-            _LOGGER.debug("Sending command %s:%s", command.index, command.value)
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                None, functools.partial(publish.result, timeout=5.0)
-            )
-
-            _LOGGER.debug("Command sent successfully")
-            # Let the device apply the command before reading it back.
-            await asyncio.sleep(0.5)
-            await self.force_read()
+            # Publishes to one topic arrive in order, no need to wait for
+            # each acknowledgement before sending the next command
+            publishes = []
+            for command in commands:
+                obj = {
+                    "type": "write",
+                    "prm": f"[{command.index},{command.value}]",
+                }
+                if self._is_tuya:
+                    obj["applianceId"] = self._appliance_id
+                [publish, _] = self._connection.publish(
+                    self._appliance_id + suffix,
+                    json.dumps(obj),
+                    qos=self._mqtt.QoS.AT_LEAST_ONCE,
+                )
+                _LOGGER.debug("Sending command %s:%s", command.index, command.value)
+                publishes.append(async_wait_crt(publish, timeout=5.0))
+            await asyncio.gather(*publishes)
 
         except (RuntimeError, AwsCrtError) as e:
             if "AWS_ERROR_MQTT_NOT_CONNECTED" in str(e):
                 self._handle_mqtt_disconnect_error(e, "Send command")
-            else:
-                _LOGGER.exception("Send command failed with unexpected error")
-                raise
+                return []
+            _LOGGER.exception("Send command failed with unexpected error")
+            raise
         except Exception as e:  # noqa: BLE001
             _LOGGER.error("Failed to send command: %s", e)
+            return []
 
-    @callback
-    def handle_notify(self, payload: str) -> None:
+        _LOGGER.debug("%d commands sent successfully", len(commands))
+        self._poll_scheduler.async_command_sent()
+        return list(commands)
+
+    def handle_notify(self, payload: str | bytes) -> None:
+        # Called from an MQTT thread, the frame is only touched on the loop
         _LOGGER.debug("Handling notify")
         try:
-            data = shadow_payload_to_data(payload)
-            if data is not None:
-                _LOGGER.debug("Message received: %s", data)
-                self.hass.loop.call_soon_threadsafe(self.async_set_updated_data, data)
+            update = parse_shadow_update(payload)
+            if update is not None:
+                self.hass.loop.call_soon_threadsafe(
+                    self._async_apply_shadow_update, update
+                )
         except Exception as e:  # noqa: BLE001
             _LOGGER.error("Error handling notify: %s", e)
 
+    @callback
+    def _async_apply_shadow_update(self, update: ShadowUpdate) -> None:
+        changed = self._shadow.apply(update)
+        if changed is not None and not changed:
+            _LOGGER.debug("Shadow update changed nothing")
+        else:
+            _LOGGER.debug("Message received: %s", self._shadow.frame)
+            self.async_set_updated_frame(self._shadow.frame, changed)
+        # After publishing, the scheduler reads the new device state
+        self._poll_scheduler.async_message_received()
+
     @property
     def is_connected(self) -> bool:
-        return self._is_connected
+        return self._hub.is_connected
 
     async def kill(self) -> None:
-        self._is_connected = False
         self.alive = False
-        if self._connection is not None:
-            try:
-                loop = asyncio.get_running_loop()
-                disconnect_future = self._connection.disconnect()
-                await loop.run_in_executor(None, disconnect_future.result)
-            except Exception as e:  # noqa: BLE001 # broad catch: AwsCrtError subclasses not always predictable
-                _LOGGER.debug(
-                    "Disconnect during kill failed (already disconnected): %s",
-                    e,
-                )
-        if self._update_timer_task:
-            self._update_timer_task()
-            self._update_timer_task = None
+        self.async_cancel_confirmations()
+        await self._hub.async_remove_appliance(self._appliance_id)
+        self._poll_scheduler.async_stop()
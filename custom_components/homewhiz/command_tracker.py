@@ -0,0 +1,277 @@
+"""Waits for the appliance to report the value a command wrote.
+
+A command writes a value to a write index of the appliance; the appliance
+reports the value back at the read index of the same control. The tracker
+keeps every command whose confirmation is awaited and checks each new frame
+for it, so a command completes as soon as the appliance echoes it.
+
+A command is sent again when no frame at all arrived within
+CONFIRM_TIMEOUT, it was most likely lost on the way. If frames arrived
+without the value, the appliance got the command and ignored it (remote
+control off, value not allowed in the current program), and if it reports
+a different value, it reacted to the command. Either way it is not bothered
+again.
+
+Until then the coordinator shows the frame with the values of the pending
+commands written in, so entities reflect a change right away and roll back
+if the appliance does not take it.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import callback
+
+from .appliance_controls import (
+    ClimateControl,
+    Control,
+    SwingAxisControl,
+    WriteBooleanControl,
+    WriteEnumControl,
+    WriteNumericControl,
+    WriteTimeControl,
+    clamp,
+)
+from .homewhiz import Command
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+CONFIRM_TIMEOUT = 5.0
+MAX_ATTEMPTS = 2
+
+
+def read_index_by_write_index(controls: Iterable[Control]) -> dict[int, int]:
+    """Frame index each write index reports its value at."""
+    result: dict[int, int] = {}
+    stack = list(controls)
+    while stack:
+        control = stack.pop()
+        if isinstance(
+            control, (WriteEnumControl, WriteNumericControl, WriteBooleanControl)
+        ):
+            result[control.write_index] = control.read_index
+        elif isinstance(control, WriteTimeControl):
+            result[control.hour_index] = control.hour_index
+            if control.minute_index is not None:
+                result[control.minute_index] = control.minute_index
+        elif isinstance(control, ClimateControl):
+            stack.extend(
+                (
+                    control.hvac_mode.program,
+                    control.hvac_mode.state,
+                    control.target_temperature,
+                    control.fan_mode,
+                )
+            )
+            if control.preset_mode.jet_mode is not None:
+                stack.append(control.preset_mode.jet_mode)
+            stack.extend(
+                axis.parent
+                for axis in (control.swing.horizontal, control.swing.vertical)
+                if isinstance(axis, SwingAxisControl)
+            )
+    return result
+
+
+@dataclass
+class PendingCommand:
+    command: Command
+    read_index: int
+    # Byte at the read index when the command was sent
+    initial: int | None
+    # True once confirmed, False if the appliance reported something else
+    result: asyncio.Future[bool] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    tracked_at: float = field(default_factory=time.monotonic)
+    # Frames received while waiting for the confirmation
+    frames: int = 0
+
+
+@dataclass
+class ConfirmationStats:
+    confirmed: int = 0
+    # Not confirmed, the appliance kept or changed to another value
+    ignored: int = 0
+    # Not confirmed, no frame came back even after sending again
+    timeouts: int = 0
+    # Seconds from tracking a command until the appliance reported it
+    last_latency: float | None = None
+    total_latency: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "confirmed": self.confirmed,
+            "ignored": self.ignored,
+            "timeouts": self.timeouts,
+            "last_latency_ms": (
+                None if self.last_latency is None else self.last_latency * 1000
+            ),
+            "mean_latency_ms": (
+                self.total_latency / self.confirmed * 1000 if self.confirmed else None
+            ),
+        }
+
+
+class CommandTracker:
+    def __init__(
+        self,
+        read_indices: dict[int, int],
+        resend: Callable[[Command], Awaitable[bool]],
+    ) -> None:
+        self._read_indices = read_indices
+        self._resend = resend
+        # Write index -> command waiting for confirmation
+        self._pending: dict[int, PendingCommand] = {}
+        self.stats = ConfirmationStats()
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    async def async_confirm(
+        self, command: Command, frame: bytearray | None
+    ) -> float | None:
+        """Wait until the appliance reports a command that was just sent."""
+        pending = self.async_track(command, frame)
+        if pending is None:
+            return None
+        return await self.async_wait(pending)
+
+    @callback
+    def async_track(
+        self, command: Command, frame: bytearray | None
+    ) -> PendingCommand | None:
+        """Start watching the frames for a command about to be sent.
+
+        frame is the frame the command is sent on. Tracking before sending
+        makes sure a quick echo is not missed. Returns None if the command
+        can't be confirmed.
+        """
+        read_index = self._read_indices.get(command.index)
+        if read_index is None:
+            _LOGGER.debug(
+                "Command %s:%s can't be confirmed", command.index, command.value
+            )
+            return None
+        initial = (
+            clamp(frame[read_index])
+            if frame is not None and read_index < len(frame)
+            else None
+        )
+        if (superseded := self._pending.get(command.index)) is not None:
+            superseded.result.cancel()
+        pending = self._pending[command.index] = PendingCommand(
+            command, read_index, initial
+        )
+        return pending
+
+    @callback
+    def async_forget(self, pending: PendingCommand) -> None:
+        """Stop watching for a command that could not be sent."""
+        if self._pending.get(pending.command.index) is pending:
+            del self._pending[pending.command.index]
+        pending.result.cancel()
+
+    async def async_wait(self, pending: PendingCommand) -> float | None:
+        """Wait for a tracked command, sending it again if it got lost.
+
+        Returns the round trip time in seconds, or None if the command could
+        not be confirmed.
+        """
+        command = pending.command
+        try:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                try:
+                    async with asyncio.timeout(CONFIRM_TIMEOUT):
+                        confirmed = await asyncio.shield(pending.result)
+                except TimeoutError:
+                    if pending.frames:
+                        self.stats.ignored += 1
+                        _LOGGER.info(
+                            "Command %s:%s was ignored by the appliance",
+                            command.index,
+                            command.value,
+                        )
+                        return None
+                    if attempt < MAX_ATTEMPTS:
+                        _LOGGER.debug(
+                            "Command %s:%s not confirmed, sending it again",
+                            command.index,
+                            command.value,
+                        )
+                        await self._resend(command)
+                    continue
+                except asyncio.CancelledError:
+                    if not pending.result.cancelled():
+                        raise
+                    _LOGGER.debug(
+                        "Command %s:%s superseded", command.index, command.value
+                    )
+                    return None
+                if not confirmed:
+                    self.stats.ignored += 1
+                    return None
+                latency = time.monotonic() - pending.tracked_at
+                self.stats.confirmed += 1
+                self.stats.last_latency = latency
+                self.stats.total_latency += latency
+                _LOGGER.debug(
+                    "Command %s:%s confirmed after %.0f ms",
+                    command.index,
+                    command.value,
+                    latency * 1000,
+                )
+                return latency
+            self.stats.timeouts += 1
+            _LOGGER.warning(
+                "Command %s:%s was not confirmed by the appliance",
+                command.index,
+                command.value,
+            )
+            return None
+        finally:
+            if self._pending.get(command.index) is pending:
+                del self._pending[command.index]
+
+    def overlay(self, frame: bytearray) -> tuple[bytearray, frozenset[int]]:
+        """The frame with the values of the pending commands written in.
+
+        Returns the frame itself if no command is pending, and the indices
+        that got overwritten.
+        """
+        values = {
+            pending.read_index: pending.command.value
+            for pending in self._pending.values()
+            if not pending.result.done() and pending.read_index < len(frame)
+        }
+        if not values:
+            return frame, frozenset()
+        shown = bytearray(frame)
+        for index, value in values.items():
+            shown[index] = value
+        return shown, frozenset(values)
+
+    @callback
+    def async_frame_received(self, frame: bytearray) -> None:
+        for pending in self._pending.values():
+            if pending.result.done():
+                continue
+            pending.frames += 1
+            if pending.read_index >= len(frame):
+                continue
+            byte = clamp(frame[pending.read_index])
+            if byte == clamp(pending.command.value):
+                pending.result.set_result(True)
+            elif pending.initial is not None and byte != pending.initial:
+                _LOGGER.debug(
+                    "Appliance reported %s instead of command %s:%s",
+                    byte,
+                    pending.command.index,
+                    pending.command.value,
+                )
+                pending.result.set_result(False)
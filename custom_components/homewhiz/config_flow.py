@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from collections.abc import Mapping
 from dataclasses import asdict, dataclass
 from typing import Any
 
@@ -8,6 +10,7 @@ from homeassistant.components.bluetooth import (
     async_discovered_service_info,
 )
 from homeassistant.config_entries import (
+    SOURCE_REAUTH,
     ConfigEntry,
     ConfigFlow,
     ConfigFlowResult,
@@ -16,6 +19,7 @@ from homeassistant.config_entries import (
 from homeassistant.const import CONF_ADDRESS, CONF_ID, CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     TextSelector,
     TextSelectorConfig,
@@ -25,18 +29,20 @@ from homeassistant.helpers.selector import (
 from .api import (
     ApplianceContents,
     ApplianceInfo,
+    HomeWhizApi,
     IdExchangeResponse,
     LoginError,
     LoginResponse,
-    fetch_appliance_contents,
-    fetch_appliance_infos,
-    login,
-    make_id_exchange_request,
 )
-from .const import CONF_BT_RECONNECT_INTERVAL, DOMAIN
+from .const import CONF_BT_RECONNECT_INTERVAL, CONF_BT_WRITE_WITHOUT_RESPONSE, DOMAIN
+from .contents_store import async_fetch_contents, contents_entry_data
+from .credentials import async_get_credential_manager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# 2: the contents are in the contents store, not in the entry data
+CONFIG_VERSION = 2
+
 
 @dataclass
 class CloudConfig:
@@ -52,10 +58,23 @@ class EntryData:
     cloud_config: CloudConfig | None
 
 
+def _entry_data(
+    ids: IdExchangeResponse,
+    appliance_info: ApplianceInfo | None,
+    cloud_config: CloudConfig | None,
+) -> dict[str, Any]:
+    """Stored fields of EntryData, the contents go to the contents store."""
+    return {
+        "ids": asdict(ids),
+        "appliance_info": None if appliance_info is None else asdict(appliance_info),
+        "cloud_config": None if cloud_config is None else asdict(cloud_config),
+    }
+
+
 class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     """Handle a config flow for HomeWhiz"""
 
-    VERSION = 1
+    VERSION = CONFIG_VERSION
 
     def __init__(self) -> None:
         """Initialize the config flow."""
@@ -66,6 +85,9 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
         self._cloud_credentials: LoginResponse | None = None
         self._cloud_appliances: list[ApplianceInfo] | None = None
 
+    def _api(self) -> HomeWhizApi:
+        return HomeWhizApi(async_get_clientsession(self.hass))
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> ConfigFlowResult:
@@ -129,12 +151,17 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
             username = user_input[CONF_USERNAME]
             password = user_input[CONF_PASSWORD]
             try:
-                credentials = await login(username, password)
-                id_response = await make_id_exchange_request(self._bt_name)
-                contents = await fetch_appliance_contents(
-                    credentials, id_response.appId
+                api = self._api()
+                credentials = await async_get_credential_manager(self.hass).async_get(
+                    username, password
+                )
+                id_response = await api.make_id_exchange_request(self._bt_name)
+                (ref, contents), appliance_infos = await asyncio.gather(
+                    async_fetch_contents(
+                        self.hass, api, credentials, id_response.appId
+                    ),
+                    api.fetch_appliance_infos(credentials),
                 )
-                appliance_infos = await fetch_appliance_infos(credentials)
                 appliance_info = next(
                     (
                         ai
@@ -143,17 +170,12 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
                     ),
                     None,
                 )
-                data = EntryData(
-                    ids=id_response,
-                    contents=contents,
-                    appliance_info=appliance_info,
-                    cloud_config=None,
-                )
+                data = _entry_data(id_response, appliance_info, None)
                 return self.async_create_entry(
                     title=appliance_info.name
                     if appliance_info is not None
                     else self._bt_name,
-                    data=asdict(data),
+                    data=contents_entry_data(data, ref, contents),
                 )
             except LoginError:
                 errors["base"] = "invalid_auth"
@@ -184,7 +206,9 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
             username = user_input[CONF_USERNAME]
             password = user_input[CONF_PASSWORD]
             try:
-                credentials = await login(username, password)
+                credentials = await async_get_credential_manager(self.hass).async_get(
+                    username, password
+                )
                 self._cloud_config = CloudConfig(username, password)
                 self._cloud_credentials = credentials
                 return await self.async_step_select_cloud_device()
@@ -209,6 +233,74 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
             errors=errors,
         )
 
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """The cloud rejected the password of the account."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        entry = self._get_reauth_entry()
+        username = entry.data["cloud_config"]["username"]
+        errors = {}
+        if user_input is not None:
+            password = user_input[CONF_PASSWORD]
+            try:
+                await async_get_credential_manager(self.hass).async_get(
+                    username, password
+                )
+                cloud_config = asdict(CloudConfig(username, password))
+                self._update_account_entries(entry, cloud_config)
+                return self.async_update_reload_and_abort(
+                    entry, data_updates={"cloud_config": cloud_config}
+                )
+            except LoginError:
+                errors["base"] = "invalid_auth"
+            except Exception:  # broad catch: without it the user gets no message at all
+                _LOGGER.exception("Cloud reauthentication failed unexpectedly")
+                errors["base"] = "unknown"
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_PASSWORD): TextSelector(
+                        TextSelectorConfig(  # type: ignore[typeddict-item]
+                            type=TextSelectorType.PASSWORD,
+                        )
+                    ),
+                },
+            ),
+            description_placeholders={CONF_USERNAME: username},
+            errors=errors,
+        )
+
+    @callback
+    def _update_account_entries(
+        self, entry: ConfigEntry, cloud_config: dict[str, Any]
+    ) -> None:
+        """Give the other entries of the account the new password.
+
+        Whichever entry sets up first brings its password to the shared hub,
+        none of them may keep the rejected one.
+        """
+        hass = self.hass
+        for other in hass.config_entries.async_entries(DOMAIN):
+            other_config = other.data.get("cloud_config")
+            if (
+                other.entry_id == entry.entry_id
+                or not other_config
+                or other_config["username"] != cloud_config["username"]
+            ):
+                continue
+            hass.config_entries.async_update_entry(
+                other, data={**other.data, "cloud_config": cloud_config}
+            )
+            for flow in other.async_get_active_flows(hass, {SOURCE_REAUTH}):
+                hass.config_entries.flow.async_abort(flow["flow_id"])
+
     async def async_step_select_cloud_device(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -221,22 +313,18 @@ class TiltConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
             appliance = next(
                 a for a in self._cloud_appliances if a.applianceId == appliance_id
             )
-            contents = await fetch_appliance_contents(
-                self._cloud_credentials, appliance_id
+            ref, contents = await async_fetch_contents(
+                self.hass, self._api(), self._cloud_credentials, appliance_id
             )
-            data = EntryData(
-                ids=IdExchangeResponse(appliance_id),
-                contents=contents,
-                appliance_info=appliance,
-                cloud_config=self._cloud_config,
+            data = _entry_data(
+                IdExchangeResponse(appliance_id), appliance, self._cloud_config
             )
             return self.async_create_entry(
-                title=appliance.name,
-                data=asdict(data),
+                title=appliance.name, data=contents_entry_data(data, ref, contents)
             )
 
         if self._cloud_appliances is None:
-            self._cloud_appliances = await fetch_appliance_infos(
+            self._cloud_appliances = await self._api().fetch_appliance_infos(
                 self._cloud_credentials
             )
         if len(self._cloud_appliances) == 0:
@@ -312,6 +400,12 @@ class BluetoothOptionsFlowHandler(OptionsFlow):
                             )
                         },
                     ): cv.positive_int,
+                    vol.Optional(
+                        CONF_BT_WRITE_WITHOUT_RESPONSE,
+                        default=self.config_entry.options.get(
+                            CONF_BT_WRITE_WITHOUT_RESPONSE, False
+                        ),
+                    ): cv.boolean,
                 }
             ),
         )
@@ -0,0 +1,218 @@
+"""Builds the appliance configuration dataclasses without dacite.
+
+dacite.from_dict resolves the type hints of a dataclass and inspects every
+field type again on each call, for each of the thousands of nested objects
+in an appliance configuration. load_dataclass compiles a loader per
+dataclass once instead, from its type hints into a table of per-field
+converters, and reuses it for every load.
+
+The semantics of dacite.from_dict with its default config are kept:
+
+- a missing field takes its default, None if it is optional, otherwise
+  MissingValueError is raised,
+- a value of the wrong type raises WrongTypeError with the path of the
+  field, ints are accepted for floats,
+- unknown keys are ignored.
+
+Strings are interned: keys and units repeat throughout a configuration, and
+appliances of the same model share the strings of their configurations.
+
+The errors are dacite's own, so callers catching DaciteError keep working.
+"""
+
+import dataclasses
+import sys
+import types
+import typing
+from collections.abc import Callable, Mapping
+from typing import Any, TypeVar
+
+from dacite import MissingValueError, WrongTypeError
+from dacite.exceptions import DaciteFieldError
+
+_T = TypeVar("_T")
+
+_Converter = Callable[[Any], Any]
+_Loader = Callable[[Mapping[str, Any]], Any]
+
+# Compiled loader of each dataclass
+_loaders: dict[type, _Loader] = {}
+
+
+class _Mismatch(Exception):
+    """A value did not match, reported as WrongTypeError for its field."""
+
+
+def load_dataclass(cls: type[_T], data: Mapping[str, Any]) -> _T:
+    if not isinstance(data, Mapping):
+        raise WrongTypeError(field_type=cls, value=data)
+    return _loader(cls)(data)  # type: ignore[no-any-return]
+
+
+def _check_instance(cls: type | tuple[type, ...]) -> _Converter:
+    def convert(value: Any) -> Any:
+        if isinstance(value, cls):
+            return value
+        raise _Mismatch
+
+    return convert
+
+
+def _intern(value: Any) -> str:
+    if isinstance(value, str):
+        return sys.intern(value)
+    raise _Mismatch
+
+
+def _converter(type_: Any) -> _Converter:
+    if type_ is Any:
+        return lambda value: value
+    if type_ is float:
+        # The numeric tower, like dacite
+        return _check_instance((int, float))
+    if type_ is str:
+        return _intern
+    if type_ in (int, bool):
+        return _check_instance(type_)
+    if isinstance(type_, type) and dataclasses.is_dataclass(type_):
+        return _dataclass_converter(type_)
+    origin = typing.get_origin(type_)
+    args = typing.get_args(type_)
+    if origin in (types.UnionType, typing.Union):
+        return _union_converter(args)
+    if origin is list:
+        return _list_converter(args[0])
+    if origin is dict:
+        return _dict_converter(*args)
+    msg = f"Unsupported field type {type_}"
+    raise TypeError(msg)
+
+
+def _dataclass_converter(cls: type) -> _Converter:
+    # Looked up on first use, so dataclasses may refer to themselves
+    load: _Loader | None = None
+
+    def convert(value: Any) -> Any:
+        nonlocal load
+        if not isinstance(value, Mapping):
+            raise _Mismatch
+        if load is None:
+            load = _loader(cls)
+        return load(value)
+
+    return convert
+
+
+def _union_converter(args: tuple[Any, ...]) -> _Converter:
+    types_ = [arg for arg in args if arg is not type(None)]
+    optional = len(types_) < len(args)
+    if len(types_) == 1:
+        inner = _converter(types_[0])
+        if not optional:
+            return inner
+
+        def convert_optional(value: Any) -> Any:
+            return None if value is None else inner(value)
+
+        return convert_optional
+
+    converters = [_converter(arg) for arg in types_]
+
+    def convert(value: Any) -> Any:
+        if value is None and optional:
+            return None
+        for inner in converters:
+            try:
+                return inner(value)
+            except (_Mismatch, DaciteFieldError):
+                continue
+        raise _Mismatch
+
+    return convert
+
+
+def _list_converter(item_type: Any) -> _Converter:
+    if item_type in (int, bool):
+
+        def convert_plain(value: Any) -> Any:
+            if not isinstance(value, list) or not all(
+                isinstance(item, item_type) for item in value
+            ):
+                raise _Mismatch
+            return list(value)
+
+        return convert_plain
+
+    inner = _converter(item_type)
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, list):
+            raise _Mismatch
+        return [inner(item) for item in value]
+
+    return convert
+
+
+def _dict_converter(key_type: Any, value_type: Any) -> _Converter:
+    convert_key = _converter(key_type)
+    convert_value = _converter(value_type)
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, Mapping):
+            raise _Mismatch
+        return {convert_key(k): convert_value(v) for k, v in value.items()}
+
+    return convert
+
+
+def _is_optional(type_: Any) -> bool:
+    return typing.get_origin(type_) in (types.UnionType, typing.Union) and type(
+        None
+    ) in typing.get_args(type_)
+
+
+def _loader(cls: type) -> _Loader:
+    if (load := _loaders.get(cls)) is None:
+        load = _loaders[cls] = _compile(cls)
+    return load
+
+
+def _compile(cls: type) -> _Loader:
+    hints = typing.get_type_hints(cls)
+    # Name, converter, declared type and whether a missing value is an error.
+    # Missing fields with a default are left to the constructor.
+    fields: list[tuple[str, _Converter, Any, bool]] = []
+    none_if_missing: list[str] = []
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        type_ = hints[field.name]
+        has_default = (
+            field.default is not dataclasses.MISSING
+            or field.default_factory is not dataclasses.MISSING
+        )
+        if not has_default and _is_optional(type_):
+            none_if_missing.append(field.name)
+        required = not has_default and not _is_optional(type_)
+        fields.append((field.name, _converter(type_), type_, required))
+
+    def load(data: Mapping[str, Any]) -> Any:
+        kwargs = dict.fromkeys(none_if_missing)
+        for name, convert, type_, required in fields:
+            if name not in data:
+                if required:
+                    raise MissingValueError(name)
+                continue
+            value = data[name]
+            try:
+                kwargs[name] = convert(value)
+            except _Mismatch:
+                raise WrongTypeError(
+                    field_path=name, field_type=type_, value=value
+                ) from None
+            except DaciteFieldError as e:
+                e.update_path(name)
+                raise
+        return cls(**kwargs)
+
+    return load
@@ -2,6 +2,12 @@
 from homeassistant.const import Platform
 
 DOMAIN = "homewhiz"
+# hass.data key of the account credentials shared by all entries
+DATA_CREDENTIALS = f"{DOMAIN}_credentials"
+# hass.data key of the MQTT hubs by account username
+DATA_MQTT_HUBS = f"{DOMAIN}_mqtt_hubs"
+# hass.data key of the appliance contents store
+DATA_CONTENTS_STORE = f"{DOMAIN}_contents_store"
 PLATFORMS = [
     Platform.SELECT,
     Platform.SENSOR,
@@ -13,3 +19,4 @@ PLATFORMS = [
 
 # Configuration
 CONF_BT_RECONNECT_INTERVAL = "bt_reconnect_interval"
+CONF_BT_WRITE_WITHOUT_RESPONSE = "bt_write_without_response"
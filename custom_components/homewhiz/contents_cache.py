@@ -0,0 +1,140 @@
+"""On-disk cache for appliance CONFIGURATION and LOCALIZATION contents.
+
+A contents file never changes for a given type, id, version and language, so
+once downloaded it never has to be fetched again. Files are stored under the
+sha256 of their bytes and verified against it when read. An index maps the
+contents descriptions to those digests in least recently used order, and the
+oldest entries are evicted once the cache grows over its size limit. Reads
+only reorder the index in memory, it is written when contents are added or
+dropped.
+
+Share one cache per directory: each instance keeps its own index and would
+overwrite the entries the others added.
+
+The cache does not depend on Home Assistant so the translations script can
+use it too. Its methods block on file I/O, run them in an executor from the
+event loop.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+from .api import ContentsDescription
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def contents_key(description: ContentsDescription) -> str:
+    return (
+        f"{description.ctype}/{description.cid}/v{description.ver}/{description.lang}"
+    )
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class ContentsCache:
+    def __init__(self, directory: Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self._directory = directory
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # key -> {"digest": sha256 hex, "size": bytes}, oldest first
+        self._index: dict[str, dict[str, Any]] | None = None
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        if self._index is not None:
+            return self._index
+        self._index = {}
+        try:
+            stored = json.loads((self._directory / INDEX_FILE).read_bytes())
+            if stored.get("version") == INDEX_VERSION:
+                self._index = dict(stored["entries"])
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError, AttributeError):
+            _LOGGER.warning("Contents cache index is corrupt, starting empty")
+        return self._index
+
+    def _save_index(self) -> None:
+        assert self._index is not None
+        self._directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(
+            self._directory / INDEX_FILE,
+            json.dumps({"version": INDEX_VERSION, "entries": self._index}).encode(),
+        )
+
+    def _size(self) -> int:
+        assert self._index is not None
+        # Identical contents share a file and count once
+        return sum({e["digest"]: e["size"] for e in self._index.values()}.values())
+
+    def _drop(self, key: str) -> None:
+        assert self._index is not None
+        entry = self._index.pop(key)
+        digest = entry["digest"]
+        # Identical contents share a file
+        if all(other["digest"] != digest for other in self._index.values()):
+            (self._directory / digest).unlink(missing_ok=True)
+
+    def get(self, description: ContentsDescription) -> bytes | None:
+        key = contents_key(description)
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+            try:
+                contents = (self._directory / entry["digest"]).read_bytes()
+            except OSError:
+                contents = None
+            if (
+                contents is None
+                or hashlib.sha256(contents).hexdigest() != entry["digest"]
+            ):
+                _LOGGER.warning("Dropping missing or corrupt cached contents %s", key)
+                self._drop(key)
+                self._save_index()
+                return None
+            # Move to the most recently used end, saved with the next change
+            index[key] = index.pop(key)
+            _LOGGER.debug("Contents %s loaded from cache", key)
+            return contents
+
+    def put(self, description: ContentsDescription, contents: bytes) -> None:
+        key = contents_key(description)
+        digest = hashlib.sha256(contents).hexdigest()
+        with self._lock:
+            index = self._load_index()
+            # Dropped before writing, the old entry may be the only one
+            # referencing the file the new one is about to use
+            if key in index:
+                self._drop(key)
+            self._directory.mkdir(parents=True, exist_ok=True)
+            path = self._directory / digest
+            if not path.exists():
+                _write_atomic(path, contents)
+            index[key] = {"digest": digest, "size": len(contents)}
+            # Never evict the entry that was just added
+            while len(index) > 1 and self._size() > self._max_size:
+                oldest = next(iter(index))
+                self._drop(oldest)
+                _LOGGER.debug("Evicted contents %s from cache", oldest)
+            self._save_index()
@@ -0,0 +1,141 @@
+"""Appliance contents, stored once per model outside of the config entries.
+
+The contents of an appliance are 30-50 KB of configuration and localization.
+Kept in the entry data, they made core.config_entries grow by that much per
+appliance, and Home Assistant rewrites and reloads that file as a whole on
+every entry update. Each contents document now lives in a Store of its own,
+named after its fingerprint, so appliances with the same contents (same
+contents id, version and language) share one file. Entries keep only the
+reference to their contents and the fingerprint of the configuration, the
+document is loaded when the entry is set up.
+
+Contents downloaded by the config flow are stored under a reference built
+from the contents files they were made of (id, type, version and language).
+Setting up another appliance of a model finds them there and skips the
+download.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import Mapping
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import ContentsIndexResponse, HomeWhizApi, LoginResponse
+from .const import DATA_CONTENTS_STORE, DOMAIN
+from .contents_cache import contents_key
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+STORAGE_VERSION = 1
+
+
+def fingerprint(document: Any) -> str:
+    """Fingerprint of a JSON document, independent of its key order."""
+    serialized = json.dumps(document, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def contents_ref(contents_index: ContentsIndexResponse) -> str:
+    """Reference of the contents made of the files of the index."""
+    return fingerprint(sorted(contents_key(c) for c in contents_index.results))
+
+
+class ContentsStore:
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._loads: dict[str, asyncio.Task[dict[str, Any] | None]] = {}
+
+    def _store(self, ref: str) -> Store[dict[str, Any]]:
+        return Store(self._hass, STORAGE_VERSION, f"{DOMAIN}.contents.{ref}")
+
+    async def async_save(
+        self, contents: Mapping[str, Any], ref: str | None = None
+    ) -> str:
+        """Stores the contents unless stored already, returns their reference.
+
+        The reference defaults to the fingerprint of the contents.
+        """
+        if ref is None:
+            ref = fingerprint(contents)
+        store = self._store(ref)
+        if await self._hass.async_add_executor_job(Path(store.path).exists):
+            _LOGGER.debug("Contents %s are stored already", ref)
+        else:
+            await store.async_save(dict(contents))
+        return ref
+
+    async def async_load(self, ref: str) -> dict[str, Any] | None:
+        """Stored contents, None if missing.
+
+        Entries of the same model set up together wait for a single load.
+        """
+        load = self._loads.get(ref)
+        if load is None:
+            load = self._loads[ref] = asyncio.get_running_loop().create_task(
+                self._load(ref)
+            )
+        # A cancelled caller must not cancel the load the others wait for
+        return await asyncio.shield(load)
+
+    async def _load(self, ref: str) -> dict[str, Any] | None:
+        try:
+            return await self._store(ref).async_load()
+        finally:
+            del self._loads[ref]
+
+    async def async_remove(self, ref: str) -> None:
+        await self._store(ref).async_remove()
+
+
+@callback
+def async_get_contents_store(hass: HomeAssistant) -> ContentsStore:
+    store: ContentsStore | None = hass.data.get(DATA_CONTENTS_STORE)
+    if store is None:
+        store = hass.data[DATA_CONTENTS_STORE] = ContentsStore(hass)
+    return store
+
+
+async def async_fetch_contents(
+    hass: HomeAssistant, api: HomeWhizApi, credentials: LoginResponse, app_id: str
+) -> tuple[str, dict[str, Any]]:
+    """Reference and document of the contents of an appliance.
+
+    Only the contents index is requested if the contents are stored already.
+    """
+    contents_index = await api.fetch_contents_index(credentials, app_id)
+    ref = contents_ref(contents_index)
+    store = async_get_contents_store(hass)
+    contents = await store.async_load(ref)
+    if contents is not None:
+        _LOGGER.debug("Contents of %s are stored already as %s", app_id, ref)
+        return ref, contents
+    contents = asdict(await api.fetch_contents(contents_index))
+    await store.async_save(contents, ref)
+    return ref, contents
+
+
+def contents_entry_data(
+    entry_data: Mapping[str, Any], ref: str, contents: Mapping[str, Any]
+) -> dict[str, Any]:
+    """Entry data referencing stored contents instead of holding them."""
+    data = dict(entry_data)
+    data.pop("contents", None)
+    data["contents_ref"] = ref
+    data["config_fingerprint"] = fingerprint(contents["config"])
+    return data
+
+
+async def async_store_contents(
+    hass: HomeAssistant, entry_data: Mapping[str, Any]
+) -> dict[str, Any]:
+    """Entry data with its contents moved to the contents store."""
+    contents = entry_data["contents"]
+    ref = await async_get_contents_store(hass).async_save(contents)
+    return contents_entry_data(entry_data, ref, contents)
@@ -0,0 +1,78 @@
+"""Control graphs of the loaded entries, shared between identical appliances.
+
+Controls used to be cached forever in a module dict keyed by entry id, so
+every reload leaked the previous graph and every appliance had its own,
+even when six washers of the same model were set up. The registry keys
+graphs by a fingerprint of the appliance configuration instead: entries
+with the same configuration share one graph, built once. Graphs keep no
+state (the last known booleans live in the DecodePlan of each entry), so
+sharing them is safe.
+
+An entry acquires its graph on setup and releases it on unload, the graph
+is dropped with its last entry. A weak registry keeps graphs only as long
+as something else references them, releasing is then optional.
+"""
+
+import logging
+import weakref
+from collections.abc import MutableMapping
+
+from .appliance_config import ApplianceConfiguration
+from .appliance_controls import Control, generate_controls_from_config
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+class ControlGraph:
+    """Controls of an appliance model, never mutated once built"""
+
+    __slots__ = ("__weakref__", "controls", "fingerprint")
+
+    def __init__(self, fingerprint: str, controls: list[Control]):
+        self.fingerprint = fingerprint
+        self.controls = tuple(controls)
+
+
+class ControlRegistry:
+    def __init__(self, *, weak: bool = False):
+        self._graphs: MutableMapping[str, ControlGraph] = (
+            weakref.WeakValueDictionary() if weak else {}
+        )
+        # Fingerprint of the graph each entry holds
+        self._entries: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def acquire(
+        self, entry_id: str, fingerprint: str, config: ApplianceConfiguration
+    ) -> ControlGraph:
+        if entry_id in self._entries:
+            # A setup without unload in between, drop what the entry held
+            self.release(entry_id)
+        graph = self._graphs.get(fingerprint)
+        if graph is None:
+            graph = self._graphs[fingerprint] = ControlGraph(
+                fingerprint, generate_controls_from_config(entry_id, config)
+            )
+        else:
+            _LOGGER.debug(
+                "Entry %s shares the controls of configuration %s",
+                entry_id,
+                fingerprint,
+            )
+        self._entries[entry_id] = fingerprint
+        return graph
+
+    def release(self, entry_id: str) -> None:
+        fingerprint = self._entries.pop(entry_id, None)
+        if fingerprint is None or fingerprint in self._entries.values():
+            return
+        self._graphs.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        self._graphs.clear()
+        self._entries.clear()
+
+
+control_registry = ControlRegistry()
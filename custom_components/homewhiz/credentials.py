@@ -0,0 +1,82 @@
+"""Account credentials shared by every cloud entry and the config flow.
+
+All appliances of one HomeWhiz account can use the same temporary AWS
+credentials, so they are kept per username instead of logging in again for
+every appliance and on every connection refresh. Concurrent requests for the
+same account wait for a single login. Credentials are renewed once they get
+within REFRESH_AHEAD of their expiration, so a connection refresh scheduled
+shortly before expiry already receives new ones.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import HomeWhizApi, LoginResponse
+from .const import DATA_CREDENTIALS
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+REFRESH_AHEAD = timedelta(minutes=5)
+
+
+class CredentialManager:
+    def __init__(self, api: HomeWhizApi) -> None:
+        self._api = api
+        # username -> (password, credentials)
+        self._credentials: dict[str, tuple[str, LoginResponse]] = {}
+        # username -> login in progress, resolving to (password, credentials)
+        self._logins: dict[str, asyncio.Task[tuple[str, LoginResponse]]] = {}
+
+    def _is_fresh(self, credentials: LoginResponse) -> bool:
+        refresh_at = credentials.expiration / 1000 - REFRESH_AHEAD.total_seconds()
+        return time.time() < refresh_at
+
+    async def async_get(self, username: str, password: str) -> LoginResponse:
+        """Credentials of the account, logging in only if needed."""
+        cached = self._credentials.get(username)
+        if cached is not None:
+            cached_password, credentials = cached
+            if cached_password == password and self._is_fresh(credentials):
+                return credentials
+
+        login = self._logins.get(username)
+        if login is None:
+            login = self._logins[username] = asyncio.get_running_loop().create_task(
+                self._login(username, password)
+            )
+        # A cancelled caller must not cancel the login the others wait for
+        # Compared with the password of the login itself, the cached entry
+        # may be gone again if invalidate ran in the meantime
+        login_password, credentials = await asyncio.shield(login)
+        if login_password != password:
+            # Joined a login made with another password, make our own
+            return await self.async_get(username, password)
+        return credentials
+
+    async def _login(self, username: str, password: str) -> tuple[str, LoginResponse]:
+        try:
+            _LOGGER.debug("Logging in to the HomeWhiz cloud")
+            credentials = await self._api.login(username, password)
+            self._credentials[username] = (password, credentials)
+            return password, credentials
+        finally:
+            del self._logins[username]
+
+    def invalidate(self, username: str) -> None:
+        """Forget the credentials of the account, e.g. when they got rejected."""
+        self._credentials.pop(username, None)
+
+
+@callback
+def async_get_credential_manager(hass: HomeAssistant) -> CredentialManager:
+    manager: CredentialManager | None = hass.data.get(DATA_CREDENTIALS)
+    if manager is None:
+        manager = hass.data[DATA_CREDENTIALS] = CredentialManager(
+            HomeWhizApi(async_get_clientsession(hass))
+        )
+    return manager
@@ -0,0 +1,213 @@
+"""Decode all controls of an entry from a frame in a single pass.
+
+Reading a value through Control.get_value goes through several method calls
+per control (safe_get, clamp, bidict lookups). The plan compiles the
+controls once into flat tables instead:
+
+- controls reading a single byte (enums, numerics, booleans) become a
+  256-entry lookup table indexed by the raw byte, with clamp, factor,
+  option lookup, bitmask or comparison already applied,
+- time controls become hour/minute index pairs, gated by the decoded state
+  for remaining times that read 0 while the device is off,
+- summed timestamps add up the already decoded values of their sensors,
+- everything else (climate, debug) keeps using get_value, composite
+  controls reading booleans with the last known values of the entry.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from .appliance_controls import (
+    OFF_DEVICE_STATES,
+    BooleanControl,
+    ClimateControl,
+    Control,
+    EnumControl,
+    HvacControl,
+    NumericControl,
+    PresetControl,
+    StateAwareRemainingTimeControl,
+    SummedTimestampControl,
+    SwingControl,
+    TimeControl,
+    WriteTimeControl,
+    clamp,
+)
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+_BYTES = range(256)
+
+# Controls reading booleans, out of range they fall back to the last known
+# value of the entry
+_LAST_KNOWN_CONTROLS = (
+    BooleanControl,
+    ClimateControl,
+    HvacControl,
+    PresetControl,
+    SwingControl,
+)
+
+
+def _lookup_table(control: Control) -> tuple[Any, ...] | None:
+    """Value of the control for every possible byte, None if not tabulable."""
+    # Subclasses overriding get_value decode differently, keep them as they are
+    get_value = type(control).get_value
+    if isinstance(control, EnumControl) and get_value is EnumControl.get_value:
+        return tuple(control.options.get(clamp(byte)) for byte in _BYTES)
+    if isinstance(control, NumericControl) and get_value is NumericControl.get_value:
+        return tuple(clamp(byte) * control.bounds.factor for byte in _BYTES)
+    return None
+
+
+def _boolean_table(control: Control) -> tuple[bool, ...] | None:
+    if (
+        isinstance(control, BooleanControl)
+        and type(control).get_value is BooleanControl.get_value
+    ):
+        return tuple(control.from_byte(byte) for byte in _BYTES)
+    return None
+
+
+class DecodePlan:
+    """Decodes the controls of one entry.
+
+    The controls may be shared with other entries, the state of the entry
+    (the last known booleans) lives in the plan.
+    """
+
+    def __init__(
+        self,
+        controls: Sequence[Control],
+        last_booleans: dict[str, bool] | None = None,
+    ):
+        self._lookups: list[tuple[str, int, tuple[Any, ...]]] = []
+        self._booleans: list[tuple[str, int, tuple[bool, ...]]] = []
+        self._times: list[tuple[str, int, int | None, str | None]] = []
+        self._sums: list[tuple[str, list[str]]] = []
+        self._others: list[Control] = []
+        # Out of range booleans fall back to their last known value
+        self._last_booleans = {} if last_booleans is None else last_booleans
+        self._controls: dict[str, Control] = {}
+
+        for control in controls:
+            if control.key in self._controls:
+                # Snapshot values are keyed by control key, duplicates keep
+                # using get_value
+                _LOGGER.debug("Duplicate control key %s in decode plan", control.key)
+                continue
+            self._controls[control.key] = control
+            if (table := _lookup_table(control)) is not None:
+                assert isinstance(control, (EnumControl, NumericControl))
+                self._lookups.append((control.key, control.read_index, table))
+            elif (bool_table := _boolean_table(control)) is not None:
+                assert isinstance(control, BooleanControl)
+                self._booleans.append((control.key, control.read_index, bool_table))
+            elif type(control).get_value in (
+                TimeControl.get_value,
+                WriteTimeControl.get_value,
+            ):
+                assert isinstance(control, (TimeControl, WriteTimeControl))
+                self._times.append(
+                    (control.key, control.hour_index, control.minute_index, None)
+                )
+            elif self._is_gated_time(control):
+                assert isinstance(control, StateAwareRemainingTimeControl)
+                remaining = control.remaining_control
+                self._times.append(
+                    (
+                        control.key,
+                        remaining.hour_index,
+                        remaining.minute_index,
+                        control.state_control.key if control.state_control else None,
+                    )
+                )
+            else:
+                self._others.append(control)
+        # Sums read the snapshot values of their sensors, so they can only be
+        # resolved once every control is known
+        for control in list(self._others):
+            if (
+                type(control).get_value is SummedTimestampControl.get_value
+                and isinstance(control, SummedTimestampControl)
+                and all(
+                    self.covers(sensor) and sensor not in self._others
+                    for sensor in control.sensors
+                )
+            ):
+                self._others.remove(control)
+                self._sums.append(
+                    (control.key, [sensor.key for sensor in control.sensors])
+                )
+        _LOGGER.debug(
+            "Compiled decode plan: %d lookups, %d booleans, %d times, %d sums, "
+            "%d others",
+            len(self._lookups),
+            len(self._booleans),
+            len(self._times),
+            len(self._sums),
+            len(self._others),
+        )
+
+    def _is_gated_time(self, control: Control) -> bool:
+        return (
+            type(control).get_value is StateAwareRemainingTimeControl.get_value
+            and isinstance(control, StateAwareRemainingTimeControl)
+            and type(control.remaining_control).get_value is TimeControl.get_value
+            # The state is decoded before the times
+            and (
+                control.state_control is None
+                or (
+                    self.covers(control.state_control)
+                    and _lookup_table(control.state_control) is not None
+                )
+            )
+        )
+
+    def control(self, key: str) -> Control | None:
+        return self._controls.get(key)
+
+    def read(self, control: Control, data: bytearray) -> Any:
+        """Value of a control the snapshot does not hold."""
+        if isinstance(control, _LAST_KNOWN_CONTROLS):
+            return control.get_value(data, self._last_booleans)
+        return control.get_value(data)
+
+    def covers(self, control: Control) -> bool:
+        """Whether the snapshot holds the value of this exact control."""
+        return self._controls.get(control.key) is control
+
+    def decode(self, data: bytearray) -> dict[str, Any]:
+        size = len(data)
+        snapshot: dict[str, Any] = {}
+        for key, index, table in self._lookups:
+            # Out of range reads as 0, like safe_get
+            snapshot[key] = table[data[index]] if index < size else table[0]
+        last_booleans = self._last_booleans
+        for key, index, bool_table in self._booleans:
+            if index < size:
+                last_booleans[key] = snapshot[key] = bool_table[data[index]]
+            else:
+                snapshot[key] = last_booleans.get(key, False)
+        for key, hour_index, minute_index, state_key in self._times:
+            if state_key is not None and snapshot[state_key] in OFF_DEVICE_STATES:
+                snapshot[key] = 0
+                continue
+            # & 0x7F is clamp() for a single byte
+            hours = data[hour_index] & 0x7F if hour_index < size else 0
+            minutes = (
+                data[minute_index] & 0x7F
+                if minute_index is not None and minute_index < size
+                else 0
+            )
+            snapshot[key] = hours * 60 + minutes
+        for key, sensor_keys in self._sums:
+            snapshot[key] = SummedTimestampControl.timestamp_in(
+                sum(snapshot[sensor_key] for sensor_key in sensor_keys)
+            )
+        for control in self._others:
+            snapshot[control.key] = self.read(control, data)
+        return snapshot
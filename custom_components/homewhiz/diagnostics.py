@@ -12,6 +12,7 @@ from homeassistant.helpers import entity_registry as er
 
 from .bluetooth import HomewhizBluetoothUpdateCoordinator
 from .const import DOMAIN
+from .contents_store import async_get_contents_store
 
 REDACT_KEYS = {"applianceSerialNumber"}
 
@@ -50,17 +51,24 @@ async def async_get_config_entry_diagnostics(
     redacted_appliance_info = async_redact_data(appliance_info, REDACT_KEYS)
 
     result: dict[str, Any] = {
-        "data": entry.data["contents"],
+        "data": await async_get_contents_store(hass).async_load(
+            entry.data["contents_ref"]
+        ),
         "appliance_info": redacted_appliance_info,
         "entities": entities_data,
     }
 
-    # Include BLE RSSI for Bluetooth appliances.
     coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is not None and coordinator.command_tracker is not None:
+        result["command_confirmations"] = coordinator.command_tracker.stats.as_dict()
+
+    # Include BLE RSSI for Bluetooth appliances.
     if isinstance(coordinator, HomewhizBluetoothUpdateCoordinator):
         service_info = bluetooth.async_last_service_info(
             hass, coordinator.address, connectable=True
         )
         result["bt_rssi"] = service_info.rssi if service_info else None
+        result["bt_connection"] = coordinator.connection_stats.as_dict()
+        result["bt_write_queue"] = coordinator.write_queue_stats
 
     return result
@@ -37,8 +37,11 @@ class HomeWhizEntity(CoordinatorEntity[HomewhizCoordinator]):  # type: ignore[ty
         device_name: str,
         entity_key: str,
         data: EntryData,
+        read_indices: frozenset[int] | None = None,
     ):
-        super().__init__(coordinator)
+        # The read indices act as listener context: the coordinator only
+        # updates this entity when one of them changes. None means always.
+        super().__init__(coordinator, read_indices)
         self.entity_key = entity_key
         self._attr_unique_id = f"{device_name}_{entity_key}"
         self._attr_device_info = build_device_info(device_name, data)
@@ -1,21 +1,27 @@
 from __future__ import annotations
 
-from dacite import from_dict
+from collections.abc import Mapping
+from typing import Any
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import REVOLUTIONS_PER_MINUTE, UnitOfTemperature
 
-from custom_components.homewhiz import IdExchangeResponse
-from custom_components.homewhiz.api import ApplianceContents, ApplianceInfo
+from custom_components.homewhiz.api import (
+    ApplianceContents,
+    ApplianceInfo,
+    IdExchangeResponse,
+)
 from custom_components.homewhiz.config_flow import EntryData
+from custom_components.homewhiz.config_loader import load_dataclass
 
 
-def build_entry_data(entry: ConfigEntry) -> EntryData:
+def build_entry_data(entry: ConfigEntry, contents: Mapping[str, Any]) -> EntryData:
     return EntryData(
-        contents=from_dict(ApplianceContents, entry.data["contents"]),
-        appliance_info=from_dict(ApplianceInfo, entry.data["appliance_info"])
+        contents=load_dataclass(ApplianceContents, contents),
+        appliance_info=load_dataclass(ApplianceInfo, entry.data["appliance_info"])
         if entry.data["appliance_info"] is not None
         else None,
-        ids=from_dict(IdExchangeResponse, entry.data["ids"]),
+        ids=load_dataclass(IdExchangeResponse, entry.data["ids"]),
         cloud_config=None,
     )
 
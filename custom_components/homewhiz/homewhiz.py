@@ -1,11 +1,20 @@
 import abc
+import asyncio
 import logging
 from abc import ABC
 from collections import defaultdict
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+if TYPE_CHECKING:
+    from .appliance_controls import Control
+    from .command_tracker import CommandTracker, PendingCommand
+    from .decode_plan import DecodePlan
+
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
@@ -15,10 +24,150 @@ class Command:
     value: int
 
 
+def changed_indices(
+    previous: bytearray | None, current: bytearray | None
+) -> set[int] | None:
+    """Return the indices that differ between two frames.
+
+    None means the frames can't be compared (no data on either side or a
+    different length) and every listener has to be updated.
+    """
+    if previous is None or current is None or len(previous) != len(current):
+        return None
+    if previous == current:
+        return set()
+    return {
+        index
+        for index, (old, new) in enumerate(zip(previous, current, strict=True))
+        if old != new
+    }
+
+
 class HomewhizCoordinator(
     ABC,
     DataUpdateCoordinator[bytearray | None],  # type: ignore[type-arg]
 ):
+    # Listeners register the frame indices they read as their context, so a
+    # new frame only wakes the entities whose bytes actually moved. Listeners
+    # without indices read the whole frame and are kept under None.
+    _changed_indices: set[int] | None = None
+    _listeners_by_index: dict[int | None, list[CALLBACK_TYPE]] | None = None
+    # Set up with the entry's controls, the current frame is decoded at most
+    # once and entities read their value from the snapshot
+    decode_plan: "DecodePlan | None" = None
+    _snapshot: dict[str, Any] | None = None
+    # Set up with the entry's controls, the appliance confirms the written
+    # values in the background
+    command_tracker: "CommandTracker | None" = None
+    _confirmations: "set[asyncio.Task[None]] | None" = None
+    # Frame as the appliance reported it. data shows it with the values of
+    # pending commands written in, at the indices in _overlaid.
+    _reported: bytearray | None = None
+    _overlaid: frozenset[int] = frozenset()
+
+    @callback
+    def async_set_updated_data(self, data: bytearray | None) -> None:
+        self.async_set_updated_frame(data, changed_indices(self.data, data))
+
+    @callback
+    def async_set_updated_frame(
+        self, data: bytearray | None, changed: set[int] | None
+    ) -> None:
+        """Publish a frame whose changed indices are already known.
+
+        For frames updated in place, where comparing against the previous
+        frame is not possible. None for changed updates every listener.
+        """
+        tracker = self.command_tracker
+        if tracker is not None and data is not None:
+            tracker.async_frame_received(data)
+            if tracker.pending:
+                # The overlay is republished from this frame until the
+                # commands are confirmed, the connection may reuse the
+                # buffer for its next frame by then
+                data = bytearray(data)
+        self._reported = data
+        self._async_publish(changed)
+
+    @callback
+    def _async_update_overlay(self) -> None:
+        """Show the values of the pending commands, or roll them back."""
+        if self._reported is not None:
+            self._async_publish(set())
+
+    @callback
+    def _async_publish(self, changed: set[int] | None) -> None:
+        data = self._reported
+        overlaid: frozenset[int] = frozenset()
+        if self.command_tracker is not None and data is not None:
+            data, overlaid = self.command_tracker.overlay(data)
+        if changed is not None and (overlaid or self._overlaid):
+            changed = changed | overlaid | self._overlaid
+        self._overlaid = overlaid
+        self._changed_indices = changed
+        self._snapshot = None
+        super().async_set_updated_data(data)
+
+    def read(self, control: "Control") -> Any:
+        """Value of a control in the current frame."""
+        data = self.data
+        if data is None:
+            return None
+        plan = self.decode_plan
+        if plan is None:
+            return control.get_value(data)
+        if not plan.covers(control):
+            return plan.read(control, data)
+        if self._snapshot is None:
+            self._snapshot = plan.decode(data)
+        return self._snapshot[control.key]
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, of the indices a frozenset context holds."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        indices: frozenset[int] | tuple[None] = (
+            context if isinstance(context, frozenset) else (None,)
+        )
+        listeners_by_index = self._listeners_by_index
+        if listeners_by_index is None:
+            listeners_by_index = self._listeners_by_index = defaultdict(list)
+        for index in indices:
+            listeners_by_index[index].append(update_callback)
+
+        @callback
+        def remove_indexed_listener() -> None:
+            remove_listener()
+            for index in indices:
+                listeners = listeners_by_index[index]
+                listeners.remove(update_callback)
+                if not listeners:
+                    del listeners_by_index[index]
+
+        return remove_indexed_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        changed = self._changed_indices
+        # Any other update (failed refresh, reconnect) wakes everyone
+        self._changed_indices = None
+        if changed is None:
+            super().async_update_listeners()
+            return
+        listeners_by_index = self._listeners_by_index or {}
+        update_callbacks = dict.fromkeys(listeners_by_index.get(None, ()))
+        for index in changed:
+            update_callbacks.update(dict.fromkeys(listeners_by_index.get(index, ())))
+        _LOGGER.debug(
+            "%d changed indices, updating %d listeners",
+            len(changed),
+            len(update_callbacks),
+        )
+        for update_callback in update_callbacks:
+            update_callback()
+
     @abc.abstractmethod
     async def connect(self) -> bool:
         pass
@@ -28,9 +177,85 @@ class HomewhizCoordinator(
     def is_connected(self) -> bool:
         pass
 
-    @abc.abstractmethod
     async def send_command(self, command: Command) -> None:
-        pass
+        """Write a command, the appliance confirms it in the background."""
+        await self.send_commands([command])
+
+    async def send_commands(self, commands: Sequence[Command]) -> None:
+        """Write a group of commands, returning once they are written.
+
+        The commands are written in order without waiting for the appliance
+        in between. Entities show the new values until the appliance
+        confirms them in the background, or roll back.
+        """
+        tracker = self.command_tracker
+        if tracker is None:
+            await self.write_commands(commands)
+            return
+        frame = self._reported
+        if frame is not None:
+            # Snapshot for the overlay, see async_set_updated_frame
+            frame = self._reported = bytearray(frame)
+        pending = [tracker.async_track(command, frame) for command in commands]
+        # Entities show the new values right away
+        self._async_update_overlay()
+        sent: list[Command] = []
+        try:
+            sent = await self.write_commands(commands)
+        finally:
+            # Only the commands that were not sent roll back right away
+            tracked = []
+            unsent = []
+            for command, pending_command in zip(commands, pending, strict=True):
+                if pending_command is None:
+                    continue
+                if command in sent:
+                    tracked.append(pending_command)
+                else:
+                    unsent.append(pending_command)
+                    tracker.async_forget(pending_command)
+            if tracked:
+                if self._confirmations is None:
+                    self._confirmations = set()
+                task = asyncio.get_running_loop().create_task(
+                    self._async_confirm(tracker, tracked)
+                )
+                self._confirmations.add(task)
+                task.add_done_callback(self._confirmations.discard)
+            if unsent or not tracked:
+                self._async_update_overlay()
+
+    async def _async_confirm(
+        self, tracker: "CommandTracker", tracked: "list[PendingCommand]"
+    ) -> None:
+        try:
+            # The tracker keeps the latencies in its stats
+            await asyncio.gather(*(tracker.async_wait(pending) for pending in tracked))
+        finally:
+            # Confirmed values are in the frame by now, the others roll back
+            self._async_update_overlay()
+
+    @callback
+    def async_cancel_confirmations(self) -> None:
+        for task in self._confirmations or ():
+            task.cancel()
+
+    async def write_commands(self, commands: Sequence[Command]) -> list[Command]:
+        """Write commands in order, return the ones that were sent.
+
+        Stops at the first command that fails, a connection whose writes are
+        already queued returns every command that got through instead.
+        """
+        sent: list[Command] = []
+        for command in commands:
+            if not await self.write_command(command):
+                break
+            sent.append(command)
+        return sent
+
+    @abc.abstractmethod
+    async def write_command(self, command: Command) -> bool:
+        """Write a command, return whether it was sent."""
 
 
 brand_name_by_code = defaultdict(
@@ -0,0 +1,403 @@
+"""One MQTT connection per HomeWhiz account, shared by its cloud appliances.
+
+The hub connects with the account credentials, subscribes the shadow topics
+of every registered appliance and routes incoming messages to the appliance
+the topic belongs to. Credential refreshes, retries after failed connects and
+resubscribing after a resumed connection happen once for the whole account
+instead of once per appliance.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_point_in_utc_time,
+)
+
+from .api import LoginError
+from .config_flow import CloudConfig
+from .const import DATA_MQTT_HUBS, DOMAIN
+from .credentials import async_get_credential_manager
+from .reconnect_policy import ReconnectPolicy
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+ENDPOINT = "ajf7v9dcoe69w-ats.iot.eu-west-1.amazonaws.com"
+# Retries after a failed connect back off from one minute to 15 minutes
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(minutes=15)
+# Reconnect with new credentials this long before the current ones expire
+REFRESH_BEFORE_EXPIRATION = timedelta(minutes=1)
+# Seconds to wait for the broker to acknowledge an unsubscribe
+UNSUBSCRIBE_TIMEOUT = 5.0
+
+_T = TypeVar("_T")
+
+
+async def async_wait_crt(
+    future: concurrent.futures.Future[_T], timeout: float | None = None
+) -> _T:
+    """Await an awscrt future on the event loop.
+
+    The future is resolved from an awscrt thread through a done callback, so
+    unlike run_in_executor(None, future.result) no executor thread is held
+    while waiting. A timeout or a cancelled caller leaves the future alone,
+    awscrt still resolves it later.
+    """
+    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+
+@dataclass
+class _Appliance:
+    on_message: Callable[[bytes], None]
+    on_subscribed: Callable[[], Awaitable[None]]
+
+
+def shadow_topics(appliance_id: str) -> list[str]:
+    return [
+        f"$aws/things/{appliance_id}/shadow/update/accepted",
+        f"$aws/things/{appliance_id}/shadow/get/accepted",
+    ]
+
+
+class AccountMqttHub:
+    def __init__(self, hass: HomeAssistant, cloud_config: CloudConfig) -> None:
+        from awscrt import mqtt  # noqa: PLC0415
+
+        self._hass = hass
+        self._cloud_config = cloud_config
+        self._mqtt = mqtt
+        # Kept across reconnects so the broker can resume the session
+        self._client_id = uuid.uuid1().hex
+        self._appliances: dict[str, _Appliance] = {}
+        self._connection: mqtt.Connection | None = None
+        self._is_connected = False
+        self._connect_lock = asyncio.Lock()
+        self._cancel_timer: Callable[[], None] | None = None
+        self._reconnect_policy = ReconnectPolicy(
+            "HomeWhiz cloud",
+            base_delay=RETRY_BASE_DELAY.total_seconds(),
+            max_delay=RETRY_MAX_DELAY.total_seconds(),
+        )
+
+    @property
+    def connection(self) -> Any:
+        return self._connection
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    @callback
+    def update_cloud_config(self, cloud_config: CloudConfig) -> None:
+        """Log in with the given password from the next connect on."""
+        self._cloud_config = cloud_config
+
+    @callback
+    def connection_lost(self) -> None:
+        """Mark the connection as down after a publish found it disconnected."""
+        self._is_connected = False
+
+    async def async_add_appliance(
+        self,
+        appliance_id: str,
+        on_message: Callable[[bytes], None],
+        on_subscribed: Callable[[], Awaitable[None]],
+    ) -> bool:
+        """Route the shadow messages of the appliance to on_message.
+
+        on_message is called from an MQTT thread. on_subscribed runs on the
+        event loop every time the topics of the appliance got (re)subscribed.
+        Returns False if the hub is not connected yet; it keeps retrying and
+        subscribes the appliance once it is.
+        """
+        self._appliances[appliance_id] = _Appliance(on_message, on_subscribed)
+        was_connected = self._connection is not None
+        if not await self._async_connect():
+            return False
+        if was_connected:
+            # A new connection subscribed every appliance already
+            await self._async_subscribe(appliance_id)
+        return True
+
+    async def async_remove_appliance(self, appliance_id: str) -> None:
+        if self._appliances.pop(appliance_id, None) is None:
+            return
+        if self._appliances:
+            if self._connection is not None and self._is_connected:
+                for topic in shadow_topics(appliance_id):
+                    unsubscribe, _ = self._connection.unsubscribe(topic)
+                    try:
+                        await async_wait_crt(unsubscribe, UNSUBSCRIBE_TIMEOUT)
+                    except TimeoutError:
+                        _LOGGER.warning("Unsubscribing from %s timed out", topic)
+            return
+        # Last appliance of the account
+        hubs: dict[str, AccountMqttHub] = self._hass.data.get(DATA_MQTT_HUBS, {})
+        if hubs.get(self._cloud_config.username) is self:
+            del hubs[self._cloud_config.username]
+        self._set_timer(None)
+        await self._async_disconnect("close")
+
+    async def _async_connect(self, retry: bool = False) -> bool:
+        """Connect unless a retry is scheduled, retry connects right away.
+
+        A new connection subscribes every appliance, also those whose own
+        connect failed before (e.g. until the password got updated).
+        """
+        from awscrt.auth import AwsCredentialsProvider  # noqa: PLC0415
+        from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
+        from awsiot import mqtt_connection_builder  # noqa: PLC0415
+
+        async with self._connect_lock:
+            # An interrupted connection reconnects by itself
+            if self._connection is not None:
+                return True
+            # Appliances added while the connection is down wait for the
+            # retry instead of each trying again
+            if not retry and not self._reconnect_policy.allow_attempt():
+                _LOGGER.debug("Waiting for the scheduled connection retry")
+                return False
+            _LOGGER.info(
+                "Connecting to the HomeWhiz cloud for %d appliances",
+                len(self._appliances),
+            )
+            try:
+                credentials = await async_get_credential_manager(self._hass).async_get(
+                    self._cloud_config.username, self._cloud_config.password
+                )
+            except (TimeoutError, aiohttp.ClientError):
+                # Transient login failure (e.g. HA boots before DNS is ready
+                # after an outage): retry like the AwsCrtError path, don't die.
+                _LOGGER.exception(
+                    "Login to the cloud failed (transient). Will retry in %.0f seconds.",
+                    self._schedule_retry(),
+                )
+                return False
+            except LoginError:
+                # Retrying won't help with a rejected password, the user has
+                # to enter the new one
+                _LOGGER.warning(
+                    "The HomeWhiz cloud rejected the credentials of %s",
+                    self._cloud_config.username,
+                )
+                async_get_credential_manager(self._hass).invalidate(
+                    self._cloud_config.username
+                )
+                self._async_start_reauth()
+                return False
+
+            expiration = datetime.fromtimestamp(credentials.expiration / 1000, tz=UTC)
+            _LOGGER.debug("Credentials expire at: %s", expiration)
+
+            credentials_provider = AwsCredentialsProvider.new_static(
+                access_key_id=credentials.accessKey,
+                session_token=credentials.sessionToken,
+                secret_access_key=credentials.secretKey,
+            )
+
+            loop = asyncio.get_running_loop()
+            connection = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    mqtt_connection_builder.websockets_with_default_aws_signing,
+                    client_id=self._client_id,
+                    endpoint=ENDPOINT,
+                    region="eu-west-1",
+                    credentials_provider=credentials_provider,
+                    on_connection_interrupted=self._on_connection_interrupted,
+                    on_connection_resumed=self._on_connection_resumed,
+                    clean_session=False,
+                    keep_alive_secs=1200,
+                ),
+            )
+            self._connection = connection
+            try:
+                connection_future = connection.connect()
+                await async_wait_crt(connection_future)
+                _LOGGER.debug("MQTT connection successful")
+            except AwsCrtError:
+                self._connection = None
+                # The broker may have refused the credentials, the retry logs
+                # in again instead of reusing them
+                async_get_credential_manager(self._hass).invalidate(
+                    self._cloud_config.username
+                )
+                _LOGGER.exception(
+                    "Exception during connection to AWS occurred. "
+                    "Will retry in %.0f seconds.",
+                    self._schedule_retry(),
+                )
+                return False
+
+            self._reconnect_policy.record_success()
+            self._is_connected = True
+            self._set_timer(
+                async_track_point_in_utc_time(
+                    self._hass,
+                    self._async_refresh,
+                    expiration - REFRESH_BEFORE_EXPIRATION,
+                )
+            )
+        # Outside the lock, the appliances read their state after subscribing
+        await self._async_subscribe_all()
+        return True
+
+    @callback
+    def _async_start_reauth(self) -> None:
+        for entry in self._hass.config_entries.async_entries(DOMAIN):
+            cloud_config = entry.data.get("cloud_config")
+            if cloud_config and cloud_config["username"] == self._cloud_config.username:
+                entry.async_start_reauth(self._hass)
+
+    async def _async_subscribe(self, appliance_id: str) -> None:
+        if self._connection is None:
+            _LOGGER.warning("Cannot subscribe: connection is None")
+            return
+        from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
+
+        try:
+            subscriptions = [
+                self._connection.subscribe(
+                    topic, self._mqtt.QoS.AT_LEAST_ONCE, self._on_message
+                )[0]
+                for topic in shadow_topics(appliance_id)
+            ]
+            for subscription in subscriptions:
+                result = await async_wait_crt(subscription)
+                _LOGGER.debug("Subscribe result: %s", result)
+        except AwsCrtError:
+            _LOGGER.exception("Subscribing to %s failed", appliance_id)
+            return
+        await self._async_notify_subscribed(appliance_id)
+
+    async def _async_notify_subscribed(self, appliance_id: str) -> None:
+        appliance = self._appliances.get(appliance_id)
+        if appliance is None:
+            return
+        try:
+            await appliance.on_subscribed()
+        except Exception:
+            _LOGGER.exception("Reading %s after subscribing failed", appliance_id)
+
+    async def _async_subscribe_all(self) -> None:
+        await asyncio.gather(
+            *(self._async_subscribe(appliance_id) for appliance_id in self._appliances)
+        )
+
+    def _on_message(
+        self,
+        topic: str,
+        payload: bytes,
+        dup: bool,
+        qos: Any,
+        retain: bool,
+        **kwargs: Any,
+    ) -> None:
+        # $aws/things/{appliance_id}/shadow/...
+        appliance = self._appliances.get(topic.split("/", 3)[2])
+        if appliance is None:
+            _LOGGER.debug("Message for unknown appliance on %s", topic)
+            return
+        appliance.on_message(payload)
+
+    def _on_connection_interrupted(self, error: Any, **kwargs: Any) -> None:
+        _LOGGER.warning("Connection interrupted: %s", error)
+        self._is_connected = False
+
+    def _on_connection_resumed(
+        self, return_code: Any, session_present: bool, **kwargs: Any
+    ) -> None:
+        # Called from an MQTT thread
+        self._hass.loop.call_soon_threadsafe(
+            self._async_handle_resumed, return_code, session_present
+        )
+
+    @callback
+    def _async_handle_resumed(self, return_code: Any, session_present: bool) -> None:
+        _LOGGER.info(
+            "Connection resumed - return_code: %s, session_present: %s",
+            return_code,
+            session_present,
+        )
+        self._is_connected = True
+        if not session_present:
+            _LOGGER.info("Session not present, resubscribing to topics")
+            self._hass.async_create_task(self._async_resubscribe_after_resume())
+
+    async def _async_resubscribe_after_resume(self) -> None:
+        if self._connection is None:
+            return
+        # A single SUBSCRIBE for the topics of every appliance
+        resubscribe, _ = self._connection.resubscribe_existing_topics()
+        result = await async_wait_crt(resubscribe)
+        _LOGGER.debug("Resubscribe result: %s", result)
+        await asyncio.gather(
+            *(
+                self._async_notify_subscribed(appliance_id)
+                for appliance_id in self._appliances
+            )
+        )
+
+    async def _async_disconnect(self, reason: str) -> None:
+        self._is_connected = False
+        if self._connection is None:
+            return
+        try:
+            disconnect_future = self._connection.disconnect()
+            await async_wait_crt(disconnect_future)
+        except Exception as e:  # noqa: BLE001 # broad catch: AwsCrtError subclasses not always predictable
+            _LOGGER.debug(
+                "Disconnect during %s failed (already disconnected): %s", reason, e
+            )
+        self._connection = None
+
+    def _set_timer(self, cancel: Callable[[], None] | None) -> None:
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+        self._cancel_timer = cancel
+
+    def _schedule_retry(self) -> float:
+        """Schedule the next connect after a failed one, return its delay."""
+        delay = self._reconnect_policy.record_failure()
+        self._set_timer(
+            async_track_point_in_time(
+                self._hass,
+                self._async_refresh,
+                datetime.now(tz=UTC) + timedelta(seconds=delay),
+            )
+        )
+        return delay
+
+    async def _async_refresh(self, *args: Any) -> None:
+        """Reconnect with fresh credentials and subscribe every appliance again."""
+        self._cancel_timer = None
+        if not self._appliances:
+            return
+        _LOGGER.debug("Refreshing connection")
+        await self._async_disconnect("refresh")
+        await self._async_connect(retry=True)
+
+
+@callback
+def async_get_mqtt_hub(
+    hass: HomeAssistant, cloud_config: CloudConfig
+) -> AccountMqttHub:
+    hubs: dict[str, AccountMqttHub] = hass.data.setdefault(DATA_MQTT_HUBS, {})
+    hub = hubs.get(cloud_config.username)
+    if hub is None:
+        hub = hubs[cloud_config.username] = AccountMqttHub(hass, cloud_config)
+    else:
+        # An entry reloaded after reauthentication brings the new password
+        hub.update_cloud_config(cloud_config)
+    return hub
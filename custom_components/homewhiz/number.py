@@ -7,17 +7,16 @@ from homeassistant.components.number import (
     NumberEntity,
     NumberMode,
 )
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .appliance_controls import WriteTimeControl, generate_controls_from_config
+from .appliance_controls import WriteTimeControl
 from .config_flow import EntryData
 from .const import DOMAIN
 from .entity import HomeWhizEntity
-from .helper import build_entry_data
 from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -40,7 +39,9 @@ class HomeWhizNumberEntity(HomeWhizEntity, NumberEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._control = control
         # Override the per-entity translation device_class set by HomeWhizEntity with
         # the standard duration device class.
@@ -50,19 +51,20 @@ class HomeWhizNumberEntity(HomeWhizEntity, NumberEntity):
     def native_value(self) -> float | None:  # type: ignore[override]
         if self.coordinator.data is None:
             return None
-        return self._control.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control)
 
     async def async_set_native_value(self, value: float) -> None:
-        for command in self._control.set_value(int(value)):
-            await self.coordinator.send_command(command)
+        await self.coordinator.send_commands(self._control.set_value(int(value)))
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     number_controls = [c for c in controls if isinstance(c, WriteTimeControl)]
     _LOGGER.debug("Numbers: %s", [c.key for c in number_controls])
     async_add_entities(
@@ -0,0 +1,126 @@
+"""Picks when a cloud appliance is polled next.
+
+Polling publishes a force read to the shadow of the appliance, which makes
+the appliance report its whole frame. A fixed one minute interval is too
+slow while a program runs and wasted on appliances that are switched off,
+so the interval follows the decoded device state, classified like the
+sensors do:
+
+- FAST_POLL_INTERVAL while a program is under way and while commands wait
+  for the appliance to confirm them,
+- IDLE_POLL_INTERVAL while the appliance is off,
+- POLL_INTERVAL otherwise or while the state is unknown.
+
+Polls are skipped while the appliance pushes shadow updates by itself, the
+frame is current anyway. Messages arriving shortly after a poll are the
+answer to it and don't count as pushes.
+"""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .appliance_controls import ACTIVE_DEVICE_STATES, OFF_DEVICE_STATES
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+FAST_POLL_INTERVAL = timedelta(seconds=15)
+POLL_INTERVAL = timedelta(minutes=1)
+IDLE_POLL_INTERVAL = timedelta(minutes=5)
+# Let the appliance apply a command before reading it back
+COMMAND_READ_DELAY = timedelta(seconds=0.5)
+# Messages within this time after a poll are its answer
+POLL_RESPONSE_WINDOW = timedelta(seconds=5)
+
+
+class PollScheduler:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        poll: Callable[[], Awaitable[None]],
+        device_state: Callable[[], Any],
+        commands_pending: Callable[[], bool],
+    ) -> None:
+        self._hass = hass
+        self._poll = poll
+        self._device_state = device_state
+        self._commands_pending = commands_pending
+        self._cancel: CALLBACK_TYPE | None = None
+        # time.monotonic() timestamps
+        self._due: float | None = None
+        self._last_poll: float | None = None
+        self._last_push: float | None = None
+
+    def interval(self) -> timedelta:
+        if self._commands_pending():
+            return FAST_POLL_INTERVAL
+        state = self._device_state()
+        if state in ACTIVE_DEVICE_STATES:
+            return FAST_POLL_INTERVAL
+        if state in OFF_DEVICE_STATES:
+            return IDLE_POLL_INTERVAL
+        return POLL_INTERVAL
+
+    @callback
+    def async_start(self) -> None:
+        """Schedule the next poll one interval from now."""
+        now = time.monotonic()
+        self._schedule(now, self.interval().total_seconds())
+
+    @callback
+    def async_stop(self) -> None:
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+        self._due = None
+
+    @callback
+    def async_message_received(self) -> None:
+        """Note a shadow update, it may have changed the device state."""
+        now = time.monotonic()
+        if (
+            self._last_poll is None
+            or now - self._last_poll > POLL_RESPONSE_WINDOW.total_seconds()
+        ):
+            self._last_push = now
+        if self._due is None:
+            return
+        # E.g. a program started, poll faster from now on
+        delay = self.interval().total_seconds()
+        if now + delay < self._due:
+            self._schedule(now, delay)
+
+    @callback
+    def async_command_sent(self) -> None:
+        """Read the command back soon, polls stay fast until it is confirmed."""
+        now = time.monotonic()
+        self._schedule(now, COMMAND_READ_DELAY.total_seconds(), force=True)
+
+    def _schedule(self, now: float, delay: float, force: bool = False) -> None:
+        if self._cancel is not None:
+            self._cancel()
+        self._due = now + delay
+
+        async def poll(_now: Any) -> None:
+            self._cancel = None
+            await self._async_poll(force)
+
+        self._cancel = async_call_later(self._hass, delay, poll)
+
+    async def _async_poll(self, force: bool = False) -> None:
+        now = time.monotonic()
+        interval = self.interval().total_seconds()
+        last_push = self._last_push
+        if not force and last_push is not None and now - last_push < interval:
+            _LOGGER.debug("Skipping poll, the appliance pushes updates")
+            self._schedule(now, last_push + interval - now)
+            return
+        self._last_poll = now
+        # Scheduled first, the poll can take a while to time out
+        self._schedule(now, interval)
+        await self._poll()
@@ -0,0 +1,113 @@
+"""Decides when a lost connection is tried again.
+
+Retrying at a fixed interval makes every appliance retry in lockstep when
+the access point or the cloud endpoint flaps. The policy spaces attempts
+out instead:
+
+- after a failure the next attempt waits an exponentially growing delay,
+  half of it random so that appliances drift apart,
+- after FAILURE_THRESHOLD failures in a row the circuit opens and only a
+  single attempt is made every OPEN_DURATION, until one succeeds,
+- concurrent callers share the attempt in flight instead of starting one
+  each.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+BASE_DELAY = 5.0
+MAX_DELAY = 300.0
+FAILURE_THRESHOLD = 10
+OPEN_DURATION = 900.0
+
+
+class ReconnectPolicy:
+    def __init__(
+        self,
+        name: str,
+        *,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        open_duration: float = OPEN_DURATION,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._name = name
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._failure_threshold = failure_threshold
+        self._open_duration = open_duration
+        self._rng = rng or random.Random()
+        self._failures = 0
+        # time.monotonic() before which no attempt is made
+        self._retry_at = 0.0
+        self._attempt: asyncio.Task[bool] | None = None
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def is_open(self) -> bool:
+        return self._failures >= self._failure_threshold
+
+    @property
+    def delay(self) -> float:
+        """Seconds until the next attempt is allowed."""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def allow_attempt(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def record_success(self) -> None:
+        if self.is_open:
+            _LOGGER.info("%s: connected again, closing the circuit", self._name)
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def record_failure(self) -> float:
+        """Note a failed attempt, return the delay until the next one."""
+        self._failures += 1
+        if self._failures == self._failure_threshold:
+            _LOGGER.warning(
+                "%s: %d attempts failed, trying again every %.0f minutes",
+                self._name,
+                self._failures,
+                self._open_duration / 60,
+            )
+        ceiling = (
+            self._open_duration
+            if self.is_open
+            else min(self._max_delay, self._base_delay * 2 ** (self._failures - 1))
+        )
+        delay = ceiling / 2 + self._rng.uniform(0, ceiling / 2)
+        self._retry_at = time.monotonic() + delay
+        return delay
+
+    async def async_attempt(self, connect: Callable[[], Awaitable[bool]]) -> bool:
+        """Run connect, or join the attempt that is already running.
+
+        A raised exception or False counts as a failure.
+        """
+        if self._attempt is None:
+            self._attempt = asyncio.ensure_future(self._async_run(connect))
+        return await asyncio.shield(self._attempt)
+
+    async def _async_run(self, connect: Callable[[], Awaitable[bool]]) -> bool:
+        try:
+            connected = await connect()
+        except Exception:
+            self.record_failure()
+            raise
+        finally:
+            self._attempt = None
+        if connected:
+            self.record_success()
+        else:
+            self.record_failure()
+        return connected
@@ -0,0 +1,45 @@
+"""Data of a config entry, parsed once when the entry is set up.
+
+The appliance contents of an entry are 30-50 KB of configuration and
+localization. Parsing them and generating the controls used to happen once
+per platform, six times per appliance on every start. async_setup_entry
+now builds them once and attaches them to the entry for every platform.
+The controls come from the control registry, shared with the entries of
+the same appliance model.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+
+from .appliance_controls import Control
+from .config_flow import EntryData
+from .control_registry import ControlGraph, control_registry
+from .helper import build_entry_data
+
+
+@dataclass
+class HomewhizRuntimeData:
+    data: EntryData
+    graph: ControlGraph
+    # Last known value of the boolean controls, for frames too short
+    last_booleans: dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def controls(self) -> tuple[Control, ...]:
+        return self.graph.controls
+
+
+type HomewhizConfigEntry = ConfigEntry[HomewhizRuntimeData]
+
+
+def build_runtime_data(
+    entry: ConfigEntry, contents: Mapping[str, Any]
+) -> HomewhizRuntimeData:
+    data = build_entry_data(entry, contents)
+    graph = control_registry.acquire(
+        entry.entry_id, entry.data["config_fingerprint"], data.contents.config
+    )
+    return HomewhizRuntimeData(data, graph)
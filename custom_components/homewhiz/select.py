@@ -3,7 +3,6 @@ from __future__ import annotations
 import logging
 
 from homeassistant.components.select import SelectEntity
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -13,14 +12,13 @@ from .appliance_controls import (
     HobZonePredefinedProgramControl,
     WriteEnumControl,
     WriteNumericControl,
-    generate_controls_from_config,
     get_bounded_values_options,
 )
 from .config_flow import EntryData
 from .const import DOMAIN
 from .entity import HomeWhizEntity
-from .helper import build_entry_data
 from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -46,7 +44,9 @@ class HomeWhizSelectEntity(HomeWhizEntity, SelectEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._original_control = control
         self._control = (
             NumericControlAsEnum(control)
@@ -61,7 +61,7 @@ class HomeWhizSelectEntity(HomeWhizEntity, SelectEntity):
             return STATE_UNAVAILABLE
         if self.coordinator.data is None:
             return None
-        return self._control.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control)
 
     async def async_select_option(self, option: str) -> None:
         if isinstance(self._original_control, HobZoneHeaterLevelControl):
@@ -73,8 +73,7 @@ class HomeWhizSelectEntity(HomeWhizEntity, SelectEntity):
                 len(commands),
                 [(c.index, c.value) for c in commands],
             )
-            for command in commands:
-                await self.coordinator.send_command(command)
+            await self.coordinator.send_commands(commands)
         elif isinstance(self._original_control, HobZonePredefinedProgramControl):
             commands = self._original_control.set_value_multi(option)
             _LOGGER.debug(
@@ -83,18 +82,19 @@ class HomeWhizSelectEntity(HomeWhizEntity, SelectEntity):
                 len(commands),
                 [(c.index, c.value) for c in commands],
             )
-            for command in commands:
-                await self.coordinator.send_command(command)
+            await self.coordinator.send_commands(commands)
         else:
             await self.coordinator.send_command(self._control.set_value(option))
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     write_enum_controls = [
         c for c in controls if isinstance(c, (WriteEnumControl, WriteNumericControl))
     ]
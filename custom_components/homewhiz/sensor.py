@@ -13,7 +13,6 @@ from homeassistant.components.sensor import (
     SensorEntity,
     SensorStateClass,
 )
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -25,13 +24,12 @@ from .appliance_controls import (
     StateAwareRemainingTimeControl,
     SummedTimestampControl,
     TimeControl,
-    generate_controls_from_config,
 )
 from .config_flow import EntryData
 from .const import DOMAIN
 from .entity import HomeWhizEntity
-from .helper import build_entry_data
 from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -66,7 +64,9 @@ class HomeWhizSensorEntity(HomeWhizEntity, SensorEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._control = control
         if isinstance(control, (TimeControl, StateAwareRemainingTimeControl)):
             self._attr_icon = "mdi:clock-outline"
@@ -115,7 +115,7 @@ class HomeWhizSensorEntity(HomeWhizEntity, SensorEntity):
 
         if self.coordinator.data is None:
             return None
-        return self._control.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control)
 
 
 class HomeWhizEnergyEntity(HomeWhizEntity, RestoreSensor):
@@ -149,7 +149,16 @@ class HomeWhizEnergyEntity(HomeWhizEntity, RestoreSensor):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, f"{power_control.key}_total", data)
+        super().__init__(
+            coordinator,
+            device_name,
+            f"{power_control.key}_total",
+            data,
+            # Every frame advances the integration, not only the ones where
+            # the power changes: a constant power over more than
+            # MAX_INTEGRATION_GAP_HOURS would otherwise never be counted
+            None,
+        )
         # HomeWhizEntity.__init__ (called just above) unconditionally sets
         # self._attr_device_class to a homewhiz-internal placeholder value.
         # There is no class-level SensorDeviceClass.ENERGY to fall back on,
@@ -278,11 +287,13 @@ def _find_instant_consumption_controls(
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     _LOGGER.debug("Generated controls: %s", controls)
     sensor_controls = [
         c
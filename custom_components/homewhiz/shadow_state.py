@@ -0,0 +1,131 @@
+"""Device frame of a cloud appliance, kept up to date from shadow updates.
+
+AWS IoT delivers the reported wfa array of an appliance as shadow documents.
+Instead of building a new frame for every message, the store keeps a single
+frame per appliance and writes each wfa array into it at its start offset, so
+an update carrying only part of the frame leaves the rest untouched. Each
+update reports the indices whose bytes changed.
+
+Shadow messages are subscribed with QoS AT_LEAST_ONCE, so the broker may
+deliver them again or out of order. Updates with an older modifiedTime than
+the last applied one are dropped; a redelivered duplicate carries the same
+bytes and yields no changed indices.
+"""
+
+import logging
+from typing import Any, NamedTuple
+
+# orjson ships with Home Assistant, fall back for other environments
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # type: ignore[assignment]
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Bytes the wfa array of a shadow starts at when wfaStartOffset is missing
+DEFAULT_WFA_START_OFFSET = 26
+
+
+class ShadowUpdate(NamedTuple):
+    offset: int
+    wfa: list[int]
+    modified_time: int | None = None
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_shadow_update(payload: str | bytes) -> ShadowUpdate | None:
+    """Read the reported wfa array from an AWS shadow payload.
+
+    Returns None when the payload carries no reported state, or when the
+    reported state is metadata-only (e.g. a connected/modifiedTime update)
+    and has no wfa array yet.
+
+    Only state.reported.wfa, wfaStartOffset and modifiedTime are read; the
+    rest of the document (metadata, version, other reported fields) is
+    ignored.
+    """
+    message = json_loads(payload)
+    state = message.get("state") if isinstance(message, dict) else None
+    reported = state.get("reported") if isinstance(state, dict) else None
+    if not isinstance(reported, dict):
+        return None
+    wfa = reported.get("wfa")
+    if wfa is None:
+        return None
+    return ShadowUpdate(
+        int(reported.get("wfaStartOffset") or DEFAULT_WFA_START_OFFSET),
+        wfa,
+        _int_or_none(reported.get("modifiedTime")),
+    )
+
+
+def shadow_payload_to_data(payload: str | bytes) -> bytearray | None:
+    """Decode an AWS shadow payload into the raw device byte array."""
+    update = parse_shadow_update(payload)
+    if update is None:
+        return None
+    data = bytearray(update.offset + len(update.wfa))
+    data[update.offset :] = update.wfa
+    return data
+
+
+class ShadowState:
+    def __init__(self) -> None:
+        self.frame: bytearray | None = None
+        self.modified_time: int | None = None
+
+    def apply(self, update: ShadowUpdate) -> set[int] | None:
+        """Write the update into the frame and return the changed indices.
+
+        None means there was no frame before, so every index is new. An
+        empty set means nothing changed: a duplicate, or an update older
+        than the frame that got dropped.
+        """
+        if update.modified_time is not None:
+            if (
+                self.modified_time is not None
+                and update.modified_time < self.modified_time
+            ):
+                _LOGGER.debug(
+                    "Dropping shadow update from %s, frame is from %s",
+                    update.modified_time,
+                    self.modified_time,
+                )
+                return set()
+            self.modified_time = update.modified_time
+
+        offset, wfa = update.offset, update.wfa
+        end = offset + len(wfa)
+        frame = self.frame
+        if frame is None:
+            self.frame = frame = bytearray(end)
+            frame[offset:] = wfa
+            return None
+
+        changed: set[int] = set()
+        if end > len(frame):
+            changed.update(range(len(frame), end))
+            frame.extend(bytes(end - len(frame)))
+        if frame[offset:end] != bytes(wfa):
+            changed.update(
+                index
+                for index, value in enumerate(wfa, offset)
+                if frame[index] != value
+            )
+            frame[offset:end] = wfa
+        return changed
+
+    def restart_ordering(self) -> None:
+        """Accept the next update regardless of its modifiedTime.
+
+        Called after (re)subscribing, in case the appliance clock went back
+        while the connection was down.
+        """
+        self.modified_time = None
@@ -4,16 +4,15 @@ import logging
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .appliance_controls import WriteBooleanControl, generate_controls_from_config
+from .appliance_controls import WriteBooleanControl
 from .config_flow import EntryData
 from .const import DOMAIN
 from .entity import HomeWhizEntity
-from .helper import build_entry_data
 from .homewhiz import HomewhizCoordinator
+from .runtime_data import HomewhizConfigEntry
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -26,14 +25,16 @@ class HomeWhizSwitchEntity(HomeWhizEntity, SwitchEntity):
         device_name: str,
         data: EntryData,
     ):
-        super().__init__(coordinator, device_name, control.key, data)
+        super().__init__(
+            coordinator, device_name, control.key, data, control.read_indices
+        )
         self._control = control
 
     @property
     def is_on(self) -> bool | None:  # type: ignore[override]
         if self.coordinator.data is None:
             return None
-        return self._control.get_value(self.coordinator.data)
+        return self.coordinator.read(self._control)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self.coordinator.send_command(self._control.set_value(True))
@@ -43,11 +44,13 @@ class HomeWhizSwitchEntity(HomeWhizEntity, SwitchEntity):
 
 
 async def async_setup_entry(
-    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+    hass: HomeAssistant,
+    entry: HomewhizConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-    data = build_entry_data(entry)
+    data = entry.runtime_data.data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    controls = generate_controls_from_config(entry.entry_id, data.contents.config)
+    controls = entry.runtime_data.controls
     write_enum_controls = [c for c in controls if isinstance(c, WriteBooleanControl)]
     _LOGGER.debug("Switches: %s", [c.key for c in write_enum_controls])
     async_add_entities(
@@ -15,8 +15,11 @@ from custom_components.homewhiz.appliance_controls import (
     ClimateControl,
     generate_controls_from_config,
 )
+from custom_components.homewhiz.decode_plan import DecodePlan
 from custom_components.homewhiz.homewhiz import Command
 
+from .test_coordinator import _make_coordinator
+
 test_case = TestCase()
 test_case.maxDiff = None
 
@@ -129,3 +132,23 @@ def test_hvac_control(config: ApplianceConfiguration) -> None:
             HVACMode.OFF,
         ],
     )
+
+
+def test_short_frame_keeps_the_last_known_state(
+    config: ApplianceConfiguration,
+) -> None:
+    controls = generate_controls_from_config("ac_test_short_frame", config)
+    ac_control = next(control for control in controls if control.key == "ac")
+    assert isinstance(ac_control, ClimateControl)
+    coordinator = _make_coordinator()
+    coordinator.decode_plan = DecodePlan(controls)
+
+    coordinator.async_set_updated_data(data_auto)
+    assert coordinator.read(ac_control.hvac_mode) == HVACMode.AUTO
+
+    # Ends before the state index (43), the program is still in
+    coordinator.async_set_updated_data(data_auto[:40])
+    assert coordinator.read(ac_control.hvac_mode) == HVACMode.AUTO
+    assert coordinator.read(ac_control)["hvac"] == HVACMode.AUTO
+    assert coordinator.read(ac_control.preset_mode) == PRESET_NONE
+    assert coordinator.read(ac_control.swing) == SWING_OFF
@@ -0,0 +1,128 @@
+"""Tests for HomeWhizApi against a fake session returning canned responses."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, cast
+
+import aiohttp
+
+from custom_components.homewhiz.api import (
+    ContentsDescription,
+    ContentsIndexResponse,
+    HomeWhizApi,
+    gather_bounded,
+)
+from custom_components.homewhiz.contents_cache import ContentsCache
+
+
+class _Response:
+    def __init__(self, body: Any) -> None:
+        self.status = 200
+        self.ok = True
+        self._body = body
+
+    async def json(self) -> Any:
+        return self._body
+
+    async def text(self) -> str:
+        return json.dumps(self._body)
+
+
+class _FakeSession:
+    def __init__(self, responses: dict[str, Any]) -> None:
+        self._responses = responses
+        self.requests: list[tuple[str, str, dict[str, str]]] = []
+
+    @asynccontextmanager
+    async def _request(
+        self, method: str, url: str, headers: dict[str, str] | None = None, **_: Any
+    ) -> AsyncIterator[_Response]:
+        self.requests.append((method, url, headers or {}))
+        path = url.split("?", 1)[0]
+        yield _Response(self._responses[path])
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        return self._request("POST", url, **kwargs)
+
+
+def _make_api(
+    responses: dict[str, Any], cache: ContentsCache | None = None
+) -> tuple[HomeWhizApi, _FakeSession]:
+    session = _FakeSession(responses)
+    return HomeWhizApi(cast(aiohttp.ClientSession, session), cache), session
+
+
+def test_requests_share_the_session() -> None:
+    api, session = _make_api(
+        {
+            "https://api.arcelikiot.com/auth/login": {
+                "success": True,
+                "data": {
+                    "credentials": {
+                        "accessKey": "access",
+                        "secretKey": "secret",
+                        "sessionToken": "token",
+                        "expiration": 1,
+                    }
+                },
+            },
+            "https://smarthome.arcelikiot.com/my-homes": {"data": [{"id": 1}]},
+            "https://smarthome.arcelikiot.com/my-homes/1": {"data": {"appliances": []}},
+        }
+    )
+
+    async def run() -> None:
+        credentials = await api.login("user", "password")
+        assert credentials.expiration == 1
+        assert await api.fetch_appliance_infos(credentials) == []
+
+    asyncio.run(run())
+
+    assert [method for method, _, _ in session.requests] == ["POST", "GET", "GET"]
+    _, _, headers = session.requests[1]
+    assert headers["x-amz-security-token"] == "token"
+    assert headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=access/")
+
+
+def test_contents_are_served_from_the_cache(tmp_path: Path) -> None:
+    url = (
+        "https://s3-eu-west-1.amazonaws.com/procam-contents"
+        "/LOCALIZATIONS/cid/v1/cid.en-GB.json"
+    )
+    api, session = _make_api(
+        {url: {"localizations": {"KEY": "value"}}}, ContentsCache(tmp_path)
+    )
+    contents_index = ContentsIndexResponse(
+        results=[
+            ContentsDescription(cid="cid", ctype="LOCALIZATION", ver=1, lang="en-GB")
+        ]
+    )
+
+    assert asyncio.run(api.fetch_localizations(contents_index)) == {"key": "value"}
+    assert asyncio.run(api.fetch_localizations(contents_index)) == {"key": "value"}
+    assert len(session.requests) == 1
+
+
+def test_gather_bounded_keeps_order_and_limit() -> None:
+    running = 0
+    peak = 0
+
+    async def job(value: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Later jobs finish first
+        await asyncio.sleep(0.001 * (5 - value))
+        running -= 1
+        return value
+
+    results = asyncio.run(gather_bounded((job(value) for value in range(5)), 2))
+
+    assert results == [0, 1, 2, 3, 4]
+    assert peak == 2
@@ -0,0 +1,142 @@
+"""Tests for the Bluetooth write queue with a fake GATT writer."""
+
+import asyncio
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.homewhiz.ble_write_queue import BleWriteQueue
+from custom_components.homewhiz.homewhiz import Command
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.written: list[tuple[int, int]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.fail_index: int | None = None
+
+    async def __call__(self, command: Command) -> None:
+        await self.release.wait()
+        if command.index == self.fail_index:
+            raise HomeAssistantError("Write failed")
+        self.written.append((command.index, command.value))
+
+
+def test_writes_in_order() -> None:
+    async def run() -> tuple[_Writer, BleWriteQueue]:
+        writer = _Writer()
+        queue = BleWriteQueue(writer)
+        await queue.async_write([Command(1, 10), Command(2, 20), Command(3, 30)])
+        return writer, queue
+
+    writer, queue = asyncio.run(run())
+    assert writer.written == [(1, 10), (2, 20), (3, 30)]
+    assert queue.depth == 0
+    stats = queue.stats.as_dict(queue.depth)
+    assert stats["writes"] == 3
+    assert stats["max_depth"] == 3
+    assert stats["mean_latency_ms"] is not None
+
+
+def test_queued_writes_to_one_index_coalesce() -> None:
+    async def run() -> _Writer:
+        writer = _Writer()
+        writer.release.clear()
+        queue = BleWriteQueue(writer)
+        first = asyncio.ensure_future(queue.async_write([Command(1, 10)]))
+        await asyncio.sleep(0)
+        # 1:10 is being written, these wait behind it
+        burst = [
+            asyncio.ensure_future(queue.async_write([Command(2, value)]))
+            for value in (20, 21, 22)
+        ]
+        await asyncio.sleep(0)
+        assert queue.depth == 2
+        writer.release.set()
+        await asyncio.gather(first, *burst)
+        assert queue.stats.coalesced == 2
+        return writer
+
+    assert asyncio.run(run()).written == [(1, 10), (2, 22)]
+
+
+def test_coalesced_write_keeps_the_batch_order() -> None:
+    async def run() -> _Writer:
+        writer = _Writer()
+        writer.release.clear()
+        queue = BleWriteQueue(writer)
+        first = asyncio.ensure_future(queue.async_write([Command(1, 10)]))
+        await asyncio.sleep(0)
+        earlier = asyncio.ensure_future(
+            queue.async_write([Command(2, 20), Command(3, 30)])
+        )
+        await asyncio.sleep(0)
+        # Replaces both queued writes, in the opposite order
+        batch = asyncio.ensure_future(
+            queue.async_write([Command(3, 31), Command(2, 21)])
+        )
+        await asyncio.sleep(0)
+        writer.release.set()
+        await asyncio.gather(first, earlier, batch)
+        return writer
+
+    assert asyncio.run(run()).written == [(1, 10), (3, 31), (2, 21)]
+
+
+def test_full_queue_rejects_whole_batch() -> None:
+    async def run() -> _Writer:
+        writer = _Writer()
+        writer.release.clear()
+        queue = BleWriteQueue(writer, max_depth=2)
+        first = asyncio.ensure_future(queue.async_write([Command(1, 1), Command(2, 2)]))
+        await asyncio.sleep(0)
+        with pytest.raises(HomeAssistantError):
+            await queue.async_write([Command(2, 3), Command(3, 3), Command(4, 4)])
+        # Replacing a queued value fits
+        second = queue.async_enqueue([Command(2, 5)])
+        writer.release.set()
+        await asyncio.gather(first, *second)
+        assert queue.stats.rejected == 3
+        return writer
+
+    assert asyncio.run(run()).written == [(1, 1), (2, 5)]
+
+
+def test_failed_write_is_left_out_and_queue_goes_on() -> None:
+    async def run() -> _Writer:
+        writer = _Writer()
+        writer.fail_index = 1
+        queue = BleWriteQueue(writer)
+        assert await queue.async_write([Command(1, 1), Command(2, 2)]) == [
+            Command(2, 2)
+        ]
+        # Nothing of the batch was written
+        with pytest.raises(HomeAssistantError):
+            await queue.async_write([Command(1, 3)])
+        await queue.async_write([Command(3, 3)])
+        assert queue.stats.failed == 2
+        return writer
+
+    assert asyncio.run(run()).written == [(2, 2), (3, 3)]
+
+
+def test_close_fails_pending_writes() -> None:
+    async def run() -> None:
+        writer = _Writer()
+        writer.release.clear()
+        queue = BleWriteQueue(writer)
+        pending = asyncio.ensure_future(
+            queue.async_write([Command(1, 1), Command(2, 2)])
+        )
+        await asyncio.sleep(0)
+        queue.async_close()
+        with pytest.raises(HomeAssistantError):
+            await pending
+        assert queue.depth == 0
+        # Still usable afterwards
+        writer.release.set()
+        await queue.async_write([Command(3, 3)])
+        assert writer.written == [(3, 3)]
+
+    asyncio.run(run())
@@ -8,10 +8,22 @@ Setting up that state requires touching private attributes.
 # ruff: noqa: SLF001
 
 import asyncio
+import random
+import time
 from typing import Any
 from unittest.mock import Mock
 
-from custom_components.homewhiz.bluetooth import HomewhizBluetoothUpdateCoordinator
+import pytest
+from bleak.exc import BleakError
+
+from custom_components.homewhiz.bluetooth import (
+    HEADER_LENGTH,
+    NOTIFY_READY_TIMEOUT,
+    SEGMENT_INDEX,
+    ConnectionStats,
+    HomewhizBluetoothUpdateCoordinator,
+    MessageAccumulator,
+)
 
 
 class _FakeClient:
@@ -28,7 +40,9 @@ class _FakeClient:
         self._connected = False
 
 
-def _make_coordinator(scheduled: list) -> HomewhizBluetoothUpdateCoordinator:
+def _make_coordinator(
+    scheduled: list | None = None,
+) -> HomewhizBluetoothUpdateCoordinator:
     coord = object.__new__(HomewhizBluetoothUpdateCoordinator)
     coord.address = "00:11:22:33:44:55"
     coord.alive = True
@@ -36,8 +50,18 @@ def _make_coordinator(scheduled: list) -> HomewhizBluetoothUpdateCoordinator:
     coord._connection_lock = asyncio.Lock()
     coord._device = None
     coord._device_lock = asyncio.Lock()
+    coord._accumulator = MessageAccumulator()
+    coord._pending_frame = None
+    coord._advertised = asyncio.Event()
+    coord.connection_stats = ConnectionStats()
+    coord._connect_started = None
     hass = Mock()
-    hass.create_task = scheduled.append
+    if scheduled is None:
+        # Closed instead of run, a coroutine left behind warns it was never
+        # awaited
+        hass.create_task = lambda coro, *args: coro.close()
+    else:
+        hass.create_task = scheduled.append
     hass.add_job = Mock()
     coord.hass = hass
     return coord
@@ -85,3 +109,176 @@ def test_disconnect_without_client_tears_down() -> None:
 
     assert coord._connection is None
     assert live.disconnect_calls == 1
+
+
+def _segment(index: int, payload: bytes, rng: random.Random) -> bytearray:
+    header = bytearray(rng.randrange(256) for _ in range(HEADER_LENGTH))
+    header[SEGMENT_INDEX] = index
+    return header + payload
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_accumulator_reassembles_random_streams(seed: int) -> None:
+    rng = random.Random(seed)
+    segments = rng.randrange(1, 5)
+    accumulator = MessageAccumulator(segments)
+    # Last frame returned and a copy of it
+    last: tuple[bytearray, bytes] | None = None
+
+    def feed(index: int, payload: bytes) -> bytearray | None:
+        nonlocal last
+        frame = accumulator.accumulate_message(_segment(index, payload, rng))
+        # The last frame stays intact while the next one is assembled
+        if last is not None:
+            assert last[0] == last[1]
+        if frame is not None:
+            last = (frame, bytes(frame))
+        return frame
+
+    for _ in range(50):
+        payloads = [
+            bytes(rng.randrange(256) for _ in range(rng.randrange(3, 120)))
+            for _ in range(segments)
+        ]
+        # Segments of a frame that got cut off, or out of sequence
+        if rng.random() < 0.3:
+            for index in rng.sample(range(segments), rng.randrange(1, segments + 1)):
+                feed(index, b"junk")
+
+        results = [feed(index, payload) for index, payload in enumerate(payloads)]
+
+        assert results[:-1] == [None] * (segments - 1)
+        assert results[-1] == b"".join(payloads)
+
+
+def test_accumulator_reuses_its_buffers() -> None:
+    rng = random.Random(0)
+    accumulator = MessageAccumulator()
+    frames = [
+        accumulator.accumulate_message(_segment(index, bytes(100), rng))
+        for _ in range(3)
+        for index in range(2)
+    ]
+    assert frames[1] is not frames[3]
+    assert frames[1] is frames[5]
+
+
+def _frame_segments(payload: bytes) -> list[bytearray]:
+    rng = random.Random(0)
+    half = len(payload) // 2
+    return [_segment(0, payload[:half], rng), _segment(1, payload[half:], rng)]
+
+
+def _make_publishing_coordinator(
+    published: list,
+) -> HomewhizBluetoothUpdateCoordinator:
+    coord = _make_coordinator()
+    coord.hass.loop = asyncio.get_running_loop()
+    coord.data = None
+
+    def set_updated_frame(data: bytearray | None, changed: set[int] | None) -> None:
+        coord._reported = coord.data = data
+        published.append((bytes(data) if data is not None else None, changed))
+
+    coord.async_set_updated_frame = set_updated_frame  # type: ignore[method-assign]
+    return coord
+
+
+def test_notify_publishes_complete_frames_only() -> None:
+    async def run() -> list:
+        published: list = []
+        coord = _make_publishing_coordinator(published)
+        first, second = _frame_segments(bytes(range(20)))
+        coord.handle_notify(first)
+        await asyncio.sleep(0)
+        assert published == []
+        coord.handle_notify(second)
+        await asyncio.sleep(0)
+        return published
+
+    assert asyncio.run(run()) == [(bytes(range(20)), None)]
+
+
+def test_notify_coalesces_frames_of_one_loop_iteration() -> None:
+    async def run() -> list:
+        published: list = []
+        coord = _make_publishing_coordinator(published)
+        for values in ((1, 2), (3, 4), (5,)):
+            for value in values:
+                for segment in _frame_segments(bytes([value] * 20)):
+                    coord.handle_notify(segment)
+            await asyncio.sleep(0)
+        return published
+
+    assert asyncio.run(run()) == [
+        (bytes([2] * 20), None),
+        # Frame 4 reuses the buffer of frame 2, nothing to compare against
+        (bytes([4] * 20), None),
+        (bytes([5] * 20), set(range(20))),
+    ]
+
+
+def test_disconnect_drops_unpublished_frame() -> None:
+    async def run() -> list:
+        published: list = []
+        coord = _make_publishing_coordinator(published)
+        for segment in _frame_segments(bytes(20)):
+            coord.handle_notify(segment)
+        await coord.handle_disconnect()
+        await asyncio.sleep(0)
+        return published
+
+    assert asyncio.run(run()) == []
+
+
+def test_first_frame_after_connect_is_measured() -> None:
+    async def run() -> ConnectionStats:
+        coord = _make_publishing_coordinator([])
+        coord._connect_started = time.monotonic()
+        for segment in _frame_segments(bytes(20)):
+            coord.handle_notify(segment)
+        await asyncio.sleep(0)
+        assert coord._connect_started is None
+        return coord.connection_stats
+
+    assert asyncio.run(run()).last_time_to_first_frame is not None
+
+
+class _NotifyClient:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.attempts = 0
+
+    async def start_notify(self, characteristic: str, handler: Any) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise BleakError("Not ready")
+
+
+def test_start_notify_retries_until_ready() -> None:
+    coord = _make_coordinator()
+    client: Any = _NotifyClient(failures=2)
+    ready = asyncio.run(coord._async_start_notify(client))
+    assert client.attempts == 3
+    assert 0 < ready < NOTIFY_READY_TIMEOUT
+
+
+def test_start_notify_gives_up_after_timeout() -> None:
+    coord = _make_coordinator()
+    client: Any = _NotifyClient(failures=1000)
+    with pytest.raises(BleakError):
+        asyncio.run(coord._async_start_notify(client))
+    assert 1 < client.attempts < 10
+
+
+def test_advertisement_wakes_up_reconnect_wait() -> None:
+    async def run() -> float:
+        coord = _make_coordinator()
+        coord._advertised = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, coord.async_advertisement_received)
+        started = loop.time()
+        await coord._async_wait_for_advertisement(10)
+        return loop.time() - started
+
+    assert asyncio.run(run()) < 1
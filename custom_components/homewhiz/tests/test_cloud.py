@@ -1,4 +1,16 @@
-from custom_components.homewhiz.cloud import shadow_payload_to_data
+# ruff: noqa: SLF001
+import asyncio
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any
+from unittest.mock import Mock
+
+from custom_components.homewhiz.cloud import HomewhizCloudUpdateCoordinator
+from custom_components.homewhiz.config_flow import CloudConfig
+from custom_components.homewhiz.homewhiz import Command
+from custom_components.homewhiz.shadow_state import shadow_payload_to_data
 
 
 def test_real_shadow_update_decodes_wfa() -> None:
@@ -26,3 +38,135 @@ def test_metadata_only_update_is_ignored() -> None:
 def test_no_reported_state_returns_none() -> None:
     assert shadow_payload_to_data('{"state": null}') is None
     assert shadow_payload_to_data("{}") is None
+
+
+def test_full_shadow_document_as_bytes() -> None:
+    data = shadow_payload_to_data(
+        b'{"state": {"reported": {"connected": "true", "wfaStartOffset": "2",'
+        b' "wfa": [7, 8]}}, "metadata": {"reported": {"wfa": [{"timestamp": 1},'
+        b' {"timestamp": 1}]}}, "version": 12, "timestamp": 1720000000}'
+    )
+    assert data == bytearray([0, 0, 7, 8])
+
+
+class _CrtThreadConnection:
+    """Publishes complete on a single thread, like awscrt's event loop."""
+
+    def __init__(self) -> None:
+        self._pending: queue.Queue[Future | None] = queue.Queue()
+        self.peak_threads = threading.active_count()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (future := self._pending.get()) is not None:
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            future.set_result({"packet_id": 1})
+
+    def publish(self, topic: str, payload: str, qos: Any) -> tuple[Future, int]:
+        future: Future = Future()
+        self._pending.put(future)
+        return future, 1
+
+    def stop(self) -> None:
+        self._pending.put(None)
+        self._thread.join()
+
+
+def test_publishes_do_not_hold_executor_threads() -> None:
+    async def run() -> int:
+        hass = Mock()
+        hass.loop = asyncio.get_running_loop()
+        hass.data = {}
+        coordinator = HomewhizCloudUpdateCoordinator(
+            hass, "F1", CloudConfig("user", "password")
+        )
+        connection = _CrtThreadConnection()
+        coordinator._hub._connection = connection  # type: ignore[assignment]
+        coordinator._hub._is_connected = True
+        threads = threading.active_count()
+        try:
+            await asyncio.gather(*(coordinator.get_shadow() for _ in range(5000)))
+        finally:
+            connection.stop()
+        return connection.peak_threads - threads
+
+    # Waiting in the executor would grow the default pool to its maximum
+    assert asyncio.run(run()) <= 0
+
+
+def test_shadow_updates_only_wake_changed_listeners() -> None:
+    async def run() -> list[str]:
+        hass = Mock()
+        hass.loop = asyncio.get_running_loop()
+        hass.data = {}
+        coordinator = HomewhizCloudUpdateCoordinator(
+            hass, "F1", CloudConfig("user", "password")
+        )
+        calls: list[str] = []
+        coordinator.async_add_listener(lambda: calls.append("first"), frozenset({26}))
+        coordinator.async_add_listener(lambda: calls.append("second"), frozenset({27}))
+
+        full = b'{"state": {"reported": {"wfa": [1, 2], "modifiedTime": 10}}}'
+        coordinator.handle_notify(full)
+        await asyncio.sleep(0)
+        frame = coordinator.data
+        calls.clear()
+
+        coordinator.handle_notify(full)
+        coordinator.handle_notify(
+            b'{"state": {"reported": {"wfaStartOffset": 27, "wfa": [5],'
+            b' "modifiedTime": 11}}}'
+        )
+        await asyncio.sleep(0)
+        assert coordinator.data is frame
+        assert frame == bytearray([0] * 26 + [1, 5])
+        return calls
+
+    assert asyncio.run(run()) == ["second"]
+
+
+class _AckLaterConnection:
+    def __init__(self) -> None:
+        self.published: list[str] = []
+        self.acks: list[Future] = []
+
+    def publish(self, topic: str, payload: str, qos: Any) -> tuple[Future, int]:
+        self.published.append(payload)
+        future: Future = Future()
+        self.acks.append(future)
+        return future, len(self.acks)
+
+
+def test_command_batch_is_published_without_waiting_for_acks() -> None:
+    async def run() -> tuple[list[str], int]:
+        hass = Mock()
+        hass.loop = asyncio.get_running_loop()
+        hass.data = {}
+        coordinator = HomewhizCloudUpdateCoordinator(
+            hass, "F1", CloudConfig("user", "password")
+        )
+        connection = _AckLaterConnection()
+        coordinator._hub._connection = connection  # type: ignore[assignment]
+        coordinator._hub._is_connected = True
+        coordinator._poll_scheduler = Mock()
+
+        send = asyncio.ensure_future(
+            coordinator.send_commands([Command(1, 2), Command(3, 4), Command(5, 6)])
+        )
+        await asyncio.sleep(0)
+        # All three are out before the first acknowledgement
+        published = list(connection.published)
+        for ack in connection.acks:
+            ack.set_result({"packet_id": 1})
+        await send
+        return published, coordinator._poll_scheduler.async_command_sent.call_count
+
+    published, read_backs = asyncio.run(run())
+
+    assert [json.loads(payload)["prm"] for payload in published] == [
+        "[1,2]",
+        "[3,4]",
+        "[5,6]",
+    ]
+    assert read_backs == 1
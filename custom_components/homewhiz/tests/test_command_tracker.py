@@ -0,0 +1,155 @@
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from bidict import bidict
+from dacite import from_dict
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.appliance_controls import (
+    ClimateControl,
+    WriteEnumControl,
+    generate_controls_from_config,
+)
+from custom_components.homewhiz.command_tracker import (
+    CommandTracker,
+    read_index_by_write_index,
+)
+from custom_components.homewhiz.homewhiz import Command
+
+
+class _Appliance:
+    def __init__(self, echo_resent: bool = False) -> None:
+        self.sent: list[Command] = []
+        self.echo_resent = echo_resent
+        self.tracker = CommandTracker({5: 1}, self.resend)
+
+    async def resend(self, command: Command) -> bool:
+        self.sent.append(command)
+        if self.echo_resent:
+            self.tracker.async_frame_received(bytearray([0, command.value]))
+        return True
+
+
+def test_climate_controls_are_mapped() -> None:
+    file_path = Path(__file__).parent / "fixtures" / "example_ac_config.json"
+    with file_path.open() as file:
+        config = from_dict(ApplianceConfiguration, json.load(file))
+    controls = generate_controls_from_config("test_command_tracker", config)
+    climate = next(c for c in controls if isinstance(c, ClimateControl))
+
+    read_indices = read_index_by_write_index(controls)
+
+    target = climate.target_temperature
+    assert read_indices[target.write_index] == target.read_index
+    program = climate.hvac_mode.program
+    assert read_indices[program.write_index] == program.read_index
+
+
+def test_echo_confirms_the_command() -> None:
+    async def run() -> float | None:
+        appliance = _Appliance()
+        confirm = asyncio.ensure_future(
+            appliance.tracker.async_confirm(Command(5, 3), bytearray([0, 1]))
+        )
+        await asyncio.sleep(0)
+        assert appliance.tracker.pending
+        # Unrelated bytes don't matter, the value arrives with the high bit set
+        appliance.tracker.async_frame_received(bytearray([7, 1]))
+        appliance.tracker.async_frame_received(bytearray([7, 0x83]))
+        latency = await confirm
+        assert not appliance.tracker.pending
+        assert appliance.sent == []
+        return latency
+
+    latency = asyncio.run(run())
+    assert latency is not None
+    assert latency < 1
+
+
+def test_lost_command_is_sent_again() -> None:
+    async def run() -> tuple[float | None, list[Command]]:
+        # The first write got lost
+        appliance = _Appliance(echo_resent=True)
+        latency = await appliance.tracker.async_confirm(
+            Command(5, 3), bytearray([0, 1])
+        )
+        return latency, appliance.sent
+
+    with patch("custom_components.homewhiz.command_tracker.CONFIRM_TIMEOUT", 0.01):
+        latency, sent = asyncio.run(run())
+
+    assert latency is not None
+    assert sent == [Command(5, 3)]
+
+
+def test_other_value_ends_without_sending_again() -> None:
+    async def run() -> tuple[float | None, list[Command]]:
+        appliance = _Appliance()
+        confirm = asyncio.ensure_future(
+            appliance.tracker.async_confirm(Command(5, 3), bytearray([0, 1]))
+        )
+        await asyncio.sleep(0)
+        appliance.tracker.async_frame_received(bytearray([0, 2]))
+        return await confirm, appliance.sent
+
+    assert asyncio.run(run()) == (None, [])
+
+
+def test_newer_command_supersedes_the_pending_one() -> None:
+    async def run() -> list[float | None]:
+        appliance = _Appliance()
+        first = asyncio.ensure_future(
+            appliance.tracker.async_confirm(Command(5, 3), None)
+        )
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(
+            appliance.tracker.async_confirm(Command(5, 4), None)
+        )
+        await asyncio.sleep(0)
+        appliance.tracker.async_frame_received(bytearray([0, 4]))
+        return list(await asyncio.gather(first, second))
+
+    first, second = asyncio.run(run())
+    assert first is None
+    assert second is not None
+
+
+def test_unknown_write_index_is_not_awaited() -> None:
+    tracker = CommandTracker(
+        read_index_by_write_index([WriteEnumControl("a", 1, 2, bidict({1: "x"}))]),
+        _Appliance().resend,
+    )
+    assert asyncio.run(tracker.async_confirm(Command(9, 1), None)) is None
+
+
+def test_stats_count_the_outcomes() -> None:
+    async def run() -> dict:
+        appliance = _Appliance()
+        tracker = appliance.tracker
+        confirm = asyncio.ensure_future(
+            tracker.async_confirm(Command(5, 3), bytearray([0, 1]))
+        )
+        await asyncio.sleep(0)
+        tracker.async_frame_received(bytearray([0, 3]))
+        await confirm
+        # Reported without the value
+        confirm = asyncio.ensure_future(
+            tracker.async_confirm(Command(5, 4), bytearray([0, 3]))
+        )
+        await asyncio.sleep(0)
+        tracker.async_frame_received(bytearray([0, 3]))
+        await confirm
+        # Nothing came back at all
+        await tracker.async_confirm(Command(5, 5), bytearray([0, 3]))
+        return tracker.stats.as_dict()
+
+    with patch("custom_components.homewhiz.command_tracker.CONFIRM_TIMEOUT", 0.01):
+        stats = asyncio.run(run())
+
+    assert stats["confirmed"] == 1
+    assert stats["ignored"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["last_latency_ms"] == stats["mean_latency_ms"]
+    assert stats["mean_latency_ms"] is not None
@@ -13,8 +13,9 @@ from unittest.mock import Mock
 
 from homeassistant.data_entry_flow import FlowResultType
 
-from custom_components.homewhiz.api import ApplianceInfo
+from custom_components.homewhiz.api import ApplianceInfo, LoginError
 from custom_components.homewhiz.config_flow import TiltConfigFlow
+from custom_components.homewhiz.const import DATA_CREDENTIALS
 
 
 def _appliance(appliance_id: str, connectivity: str) -> ApplianceInfo:
@@ -68,3 +69,51 @@ def test_cloud_devices_are_offered() -> None:
 
     assert result["type"] == FlowResultType.FORM
     assert result["step_id"] == "select_cloud_device"
+
+
+def test_reauth_updates_the_password() -> None:
+    flow = TiltConfigFlow()
+    flow.flow_id = "test"
+    flow.handler = "homewhiz"
+    flow.hass = Mock()
+    manager = Mock()
+    flow.hass.data = {DATA_CREDENTIALS: manager}
+    entry = Mock(entry_id="entry")
+    entry.data = {"cloud_config": {"username": "user", "password": "old"}}
+    same_account = Mock(entry_id="same_account")
+    same_account.data = {"cloud_config": {"username": "user", "password": "old"}}
+    same_account.async_get_active_flows.return_value = [{"flow_id": "other"}]
+    other_account = Mock(entry_id="other_account")
+    other_account.data = {"cloud_config": {"username": "other", "password": "x"}}
+    bluetooth = Mock(entry_id="bluetooth", data={"cloud_config": None})
+    flow.hass.config_entries.async_entries.return_value = [
+        entry,
+        same_account,
+        other_account,
+        bluetooth,
+    ]
+    flow._get_reauth_entry = Mock(return_value=entry)  # type: ignore[method-assign]
+    flow.async_update_reload_and_abort = Mock()  # type: ignore[method-assign]
+
+    async def rejected(*args: Any) -> None:
+        raise LoginError("rejected")
+
+    manager.async_get.side_effect = rejected
+    result = asyncio.run(flow.async_step_reauth_confirm({"password": "wrong"}))
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+
+    async def accepted(*args: Any) -> None:
+        return None
+
+    manager.async_get.side_effect = accepted
+    asyncio.run(flow.async_step_reauth_confirm({"password": "new"}))
+    flow.async_update_reload_and_abort.assert_called_once_with(
+        entry, data_updates={"cloud_config": {"username": "user", "password": "new"}}
+    )
+    # The other entry of the account gets the password and its reauth ends
+    flow.hass.config_entries.async_update_entry.assert_called_once_with(
+        same_account,
+        data={"cloud_config": {"username": "user", "password": "new"}},
+    )
+    flow.hass.config_entries.flow.async_abort.assert_called_once_with("other")
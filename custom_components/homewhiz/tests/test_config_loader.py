@@ -0,0 +1,86 @@
+"""Tests that load_dataclass builds the same objects and errors as dacite."""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+from dacite import DaciteError, MissingValueError, WrongTypeError, from_dict
+
+from custom_components.homewhiz.api import ApplianceContents
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.config_loader import load_dataclass
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("*.json"))
+
+
+def _load_either(cls: type, data: Any) -> Any:
+    try:
+        return from_dict(cls, data)
+    except DaciteError as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda path: path.name)
+def test_fixture_loads_like_dacite(path: Path) -> None:
+    data = json.loads(path.read_text())
+    expected = _load_either(ApplianceConfiguration, data)
+    if isinstance(expected, type):
+        with pytest.raises(expected):
+            load_dataclass(ApplianceConfiguration, data)
+        return
+    assert load_dataclass(ApplianceConfiguration, data) == expected
+
+
+def test_contents_load_like_dacite() -> None:
+    data = {
+        "config": json.loads(FIXTURES[0].read_text()),
+        "localization": {"key": "Key"},
+    }
+    assert load_dataclass(ApplianceContents, data) == from_dict(ApplianceContents, data)
+
+
+@dataclass
+class _Inner:
+    number: float
+    names: list[str]
+
+
+@dataclass
+class _Outer:
+    inner: _Inner
+    inners: list[_Inner] | None
+    flag: bool = False
+    optional: int | None = 5
+
+
+def test_defaults_and_missing_optionals() -> None:
+    data = {"inner": {"number": 1, "names": ["a"]}, "unknown": "ignored"}
+    loaded = load_dataclass(_Outer, data)
+    assert loaded == from_dict(_Outer, data)
+    assert loaded == _Outer(_Inner(1, ["a"]), None)
+
+
+@pytest.mark.parametrize(
+    ("data", "error", "path"),
+    [
+        ({"inners": None}, MissingValueError, "inner"),
+        ({"inner": {"names": []}}, MissingValueError, "inner.number"),
+        ({"inner": {"number": "1", "names": []}}, WrongTypeError, "inner.number"),
+        ({"inner": {"number": 1, "names": [1]}}, WrongTypeError, "inner.names"),
+        ({"inner": [], "inners": None}, WrongTypeError, "inner"),
+        (
+            {"inner": {"number": 1, "names": []}, "inners": [{"number": 1}]},
+            MissingValueError,
+            "inners.names",
+        ),
+        ({"inner": {"number": 1, "names": []}, "flag": 1}, WrongTypeError, "flag"),
+    ],
+)
+def test_errors_match_dacite(data: dict, error: type, path: str) -> None:
+    with pytest.raises(error) as expected:
+        from_dict(_Outer, data)
+    with pytest.raises(error) as raised:
+        load_dataclass(_Outer, data)
+    assert raised.value.field_path == expected.value.field_path == path  # type: ignore[attr-defined]
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from custom_components.homewhiz.api import ContentsDescription
+from custom_components.homewhiz.contents_cache import ContentsCache
+
+CONFIG = ContentsDescription(cid="cid", ctype="CONFIGURATION", ver=3, lang="en-GB")
+LOCALIZATION = ContentsDescription(cid="cid", ctype="LOCALIZATION", ver=3, lang="en-GB")
+OTHER = ContentsDescription(cid="other", ctype="LOCALIZATION", ver=1, lang="en-GB")
+
+
+def test_round_trip_survives_reopening(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path)
+    assert cache.get(CONFIG) is None
+
+    cache.put(CONFIG, b'{"config": 1}')
+
+    assert cache.get(CONFIG) == b'{"config": 1}'
+    assert ContentsCache(tmp_path).get(CONFIG) == b'{"config": 1}'
+    # Other versions are different contents
+    newer = ContentsDescription(cid="cid", ctype="CONFIGURATION", ver=4, lang="en-GB")
+    assert cache.get(newer) is None
+
+
+def test_corrupt_contents_are_dropped(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path)
+    cache.put(CONFIG, b'{"config": 1}')
+    index = json.loads((tmp_path / "index.json").read_text())
+    digest = index["entries"]["CONFIGURATION/cid/v3/en-GB"]["digest"]
+    (tmp_path / digest).write_bytes(b'{"config": 2}')
+
+    assert cache.get(CONFIG) is None
+    assert not (tmp_path / digest).exists()
+    assert ContentsCache(tmp_path).get(CONFIG) is None
+
+
+def test_corrupt_index_starts_empty(tmp_path: Path) -> None:
+    (tmp_path / "index.json").write_text("not json")
+    cache = ContentsCache(tmp_path)
+
+    assert cache.get(CONFIG) is None
+    cache.put(CONFIG, b"{}")
+    assert cache.get(CONFIG) == b"{}"
+
+
+def test_least_recently_used_is_evicted(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path, max_size=20)
+    cache.put(CONFIG, b"a" * 8)
+    cache.put(LOCALIZATION, b"b" * 8)
+    # Reading makes CONFIG the most recently used
+    assert cache.get(CONFIG) is not None
+
+    cache.put(OTHER, b"c" * 8)
+
+    assert cache.get(LOCALIZATION) is None
+    assert cache.get(CONFIG) == b"a" * 8
+    assert cache.get(OTHER) == b"c" * 8
+    assert len([p for p in tmp_path.iterdir() if p.name != "index.json"]) == 2
+
+
+def test_identical_contents_share_a_file(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path, max_size=10)
+    cache.put(CONFIG, b"a" * 8)
+    cache.put(LOCALIZATION, b"a" * 8)
+
+    # Shared contents count once towards the size limit
+    assert cache.get(CONFIG) == b"a" * 8
+    assert cache.get(LOCALIZATION) == b"a" * 8
+
+    cache.put(OTHER, b"b" * 8)
+
+    assert cache.get(CONFIG) is None
+    assert cache.get(LOCALIZATION) is None
+    assert cache.get(OTHER) == b"b" * 8
+
+
+def test_reads_do_not_write_the_index(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path)
+    cache.put(CONFIG, b"a")
+    cache.put(LOCALIZATION, b"b")
+    index = (tmp_path / "index.json").read_bytes()
+
+    assert cache.get(CONFIG) == b"a"
+
+    assert (tmp_path / "index.json").read_bytes() == index
+    # The order read is saved with the next change
+    cache.put(OTHER, b"c")
+    entries = json.loads((tmp_path / "index.json").read_text())["entries"]
+    assert list(entries) == [
+        "LOCALIZATION/cid/v3/en-GB",
+        "CONFIGURATION/cid/v3/en-GB",
+        "LOCALIZATION/other/v1/en-GB",
+    ]
+
+
+def test_putting_the_same_contents_again_keeps_them(tmp_path: Path) -> None:
+    cache = ContentsCache(tmp_path)
+    cache.put(CONFIG, b'{"config": 1}')
+    # E.g. two setups downloading the same contents
+    cache.put(CONFIG, b'{"config": 1}')
+
+    assert cache.get(CONFIG) == b'{"config": 1}'
+    assert ContentsCache(tmp_path).get(CONFIG) == b'{"config": 1}'
@@ -0,0 +1,172 @@
+"""Tests for the contents store and the migration of the entry contents.
+
+Store is replaced by a plain JSON file per key, the rest of Home Assistant
+by mocks.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from custom_components.homewhiz import async_migrate_entry, async_remove_entry
+from custom_components.homewhiz.api import (
+    ApplianceContents,
+    ContentsDescription,
+    ContentsIndexResponse,
+)
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.config_loader import load_dataclass
+from custom_components.homewhiz.contents_store import (
+    ContentsStore,
+    async_fetch_contents,
+    async_get_contents_store,
+    fingerprint,
+)
+
+CONTENTS = {"config": {"program": {"strKey": "PROGRAM"}}, "localization": {"a": "A"}}
+
+
+class _FileStore:
+    directory: Path
+    loads = 0
+
+    def __init__(self, hass: Any, version: int, key: str) -> None:
+        self.path = str(self.directory / key)
+
+    def _read(self) -> dict | None:
+        path = Path(self.path)
+        return json.loads(path.read_text()) if path.exists() else None
+
+    async def async_save(self, data: dict) -> None:
+        self._write(data)
+
+    def _write(self, data: dict) -> None:
+        Path(self.path).write_text(json.dumps(data))
+
+    async def async_load(self) -> dict | None:
+        type(self).loads += 1
+        await asyncio.sleep(0)
+        return self._read()
+
+    async def async_remove(self) -> None:
+        self._unlink()
+
+    def _unlink(self) -> None:
+        Path(self.path).unlink()
+
+
+@pytest.fixture
+def hass(tmp_path: Path) -> Any:
+    _FileStore.directory = tmp_path
+    _FileStore.loads = 0
+    hass = Mock()
+    hass.data = {}
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda job, *args: job(*args))
+    with patch("custom_components.homewhiz.contents_store.Store", _FileStore):
+        yield hass
+
+
+def test_same_contents_are_stored_once(hass: Any, tmp_path: Path) -> None:
+    async def run() -> tuple[str, str]:
+        store = ContentsStore(hass)
+        # Key order does not matter
+        return await store.async_save(CONTENTS), await store.async_save(
+            dict(reversed(CONTENTS.items()))
+        )
+
+    first, second = asyncio.run(run())
+
+    assert first == second == fingerprint(CONTENTS)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_concurrent_loads_share_one_read(hass: Any) -> None:
+    async def run() -> list[Any]:
+        store = ContentsStore(hass)
+        ref = await store.async_save(CONTENTS)
+        return await asyncio.gather(*(store.async_load(ref) for _ in range(6)))
+
+    assert asyncio.run(run()) == [CONTENTS] * 6
+    assert _FileStore.loads == 1
+
+
+def test_missing_contents_load_as_none(hass: Any) -> None:
+    assert asyncio.run(ContentsStore(hass).async_load("missing")) is None
+
+
+def test_migration_moves_the_contents_out_of_the_entry(hass: Any) -> None:
+    entry = Mock(version=1, unique_id="test")
+    entry.data = {"contents": CONTENTS, "ids": {"appId": "test"}}
+
+    assert asyncio.run(async_migrate_entry(hass, entry))
+
+    hass.config_entries.async_update_entry.assert_called_once_with(
+        entry,
+        data={
+            "ids": {"appId": "test"},
+            "contents_ref": fingerprint(CONTENTS),
+            "config_fingerprint": fingerprint(CONTENTS["config"]),
+        },
+        version=2,
+    )
+    stored = asyncio.run(
+        async_get_contents_store(hass).async_load(fingerprint(CONTENTS))
+    )
+    assert stored == CONTENTS
+
+
+def test_future_versions_are_not_migrated(hass: Any) -> None:
+    assert not asyncio.run(async_migrate_entry(hass, Mock(version=3)))
+
+
+def test_contents_are_removed_with_their_last_entry(hass: Any, tmp_path: Path) -> None:
+    ref = asyncio.run(async_get_contents_store(hass).async_save(CONTENTS))
+    first = Mock(entry_id="first", data={"contents_ref": ref})
+    second = Mock(entry_id="second", data={"contents_ref": ref})
+
+    hass.config_entries.async_entries.return_value = [first, second]
+    asyncio.run(async_remove_entry(hass, first))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    hass.config_entries.async_entries.return_value = [second]
+    asyncio.run(async_remove_entry(hass, second))
+    assert not list(tmp_path.iterdir())
+
+
+def _download_api() -> Mock:
+    config_path = Path(__file__).parent / "fixtures/example_ac_config.json"
+    config = load_dataclass(ApplianceConfiguration, json.loads(config_path.read_text()))
+    api = Mock()
+    api.fetch_contents_index = AsyncMock(
+        return_value=ContentsIndexResponse(
+            [
+                ContentsDescription("ac", "CONFIGURATION", 3, "en-GB"),
+                ContentsDescription("ac", "LOCALIZATION", 3, "en-GB"),
+            ]
+        )
+    )
+    api.fetch_contents = AsyncMock(
+        return_value=ApplianceContents(config=config, localization={"a": "A"})
+    )
+    return api
+
+
+def test_stored_contents_are_not_downloaded_again(hass: Any) -> None:
+    api = _download_api()
+
+    async def run() -> list[tuple[str, dict[str, Any]]]:
+        return [
+            await async_fetch_contents(hass, api, Mock(), appliance_id)
+            for appliance_id in ("first", "second")
+        ]
+
+    (first_ref, first), (second_ref, second) = asyncio.run(run())
+
+    assert first_ref == second_ref
+    assert first == second
+    assert first["localization"] == {"a": "A"}
+    api.fetch_contents.assert_awaited_once()
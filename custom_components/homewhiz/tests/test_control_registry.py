@@ -0,0 +1,66 @@
+import gc
+import json
+from pathlib import Path
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.config_loader import load_dataclass
+from custom_components.homewhiz.contents_store import fingerprint
+from custom_components.homewhiz.control_registry import ControlRegistry
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _config(name: str) -> tuple[str, ApplianceConfiguration]:
+    document = json.loads((FIXTURES / name).read_text())
+    return fingerprint(document), load_dataclass(ApplianceConfiguration, document)
+
+
+def test_fingerprint_ignores_key_order() -> None:
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_identical_models_share_one_graph() -> None:
+    registry = ControlRegistry()
+    washer = _config("example_washing_machine_config.json")
+    dishwasher = _config("example_dishwasher_config.json")
+
+    washers = [registry.acquire(f"washer_{n}", *washer) for n in range(6)]
+    other = registry.acquire("dishwasher", *dishwasher)
+
+    assert all(graph is washers[0] for graph in washers)
+    assert other is not washers[0]
+    assert len(registry) == 2
+
+
+def test_graph_is_dropped_with_its_last_entry() -> None:
+    registry = ControlRegistry()
+    washer = _config("example_washing_machine_config.json")
+    first = registry.acquire("first", *washer)
+    registry.acquire("second", *washer)
+
+    registry.release("first")
+    assert len(registry) == 1
+    registry.release("second")
+    assert len(registry) == 0
+    # Reloading builds a new graph
+    assert registry.acquire("first", *washer) is not first
+
+
+def test_acquiring_again_releases_the_previous_graph() -> None:
+    registry = ControlRegistry()
+    registry.acquire("entry", *_config("example_washing_machine_config.json"))
+    registry.acquire("entry", *_config("example_dishwasher_config.json"))
+
+    assert len(registry) == 1
+
+
+def test_weak_registry_keeps_referenced_graphs_only() -> None:
+    registry = ControlRegistry(weak=True)
+    washer = _config("example_washing_machine_config.json")
+    graph = registry.acquire("first", *washer)
+
+    assert registry.acquire("second", *washer) is graph
+    del graph
+    gc.collect()
+    assert len(registry) == 0
@@ -18,6 +18,7 @@ from custom_components.homewhiz.appliance_controls import (
     get_bounded_values_options,
     to_friendly_name,
 )
+from custom_components.homewhiz.config_loader import load_dataclass
 from custom_components.homewhiz.homewhiz import Command
 
 test_case = TestCase()
@@ -142,3 +143,21 @@ def test_zero_factor_is_skipped() -> None:
 )
 def test_to_friendly_name(raw: str, expected: str) -> None:
     assert to_friendly_name(raw) == expected
+
+
+def test_same_model_shares_options_and_keys() -> None:
+    file_path = (
+        Path(__file__).parent / "fixtures" / "example_washing_machine_config.json"
+    )
+    first, second = (
+        generate_controls_from_config(
+            f"test_controls_shared_{n}",
+            load_dataclass(ApplianceConfiguration, json.loads(file_path.read_text())),
+        )
+        for n in range(2)
+    )
+    for a, b in zip(first, second, strict=True):
+        assert a.key == b.key
+        assert not hasattr(a, "__dict__")
+        if isinstance(a, EnumControl):
+            assert a.options is b.options  # type: ignore[attr-defined]
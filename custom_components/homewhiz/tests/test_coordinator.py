@@ -0,0 +1,254 @@
+"""Tests for the change-aware listener dispatch of HomewhizCoordinator.
+
+A bare Mock is enough for hass: the coordinator only needs it to schedule a
+refresh, which never happens without an update interval.
+"""
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from unittest.mock import Mock, patch
+
+from custom_components.homewhiz.appliance_controls import EnumControl
+from custom_components.homewhiz.command_tracker import CommandTracker
+from custom_components.homewhiz.decode_plan import DecodePlan
+from custom_components.homewhiz.homewhiz import (
+    Command,
+    HomewhizCoordinator,
+    changed_indices,
+)
+
+
+class _Coordinator(HomewhizCoordinator):
+    async def connect(self) -> bool:
+        return True
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    async def write_command(self, command: Command) -> bool:
+        return True
+
+
+def _make_coordinator() -> _Coordinator:
+    return _Coordinator(Mock(), logging.getLogger(__name__), name="test")
+
+
+def test_changed_indices() -> None:
+    assert changed_indices(bytearray([1, 2, 3]), bytearray([1, 5, 3])) == {1}
+    assert changed_indices(bytearray([1, 2]), bytearray([1, 2])) == set()
+    assert changed_indices(None, bytearray([1])) is None
+    assert changed_indices(bytearray([1]), None) is None
+    assert changed_indices(bytearray([1]), bytearray([1, 2])) is None
+
+
+def test_only_listeners_of_changed_indices_are_updated() -> None:
+    coordinator = _make_coordinator()
+    calls: list[str] = []
+    coordinator.async_add_listener(lambda: calls.append("first"), frozenset({1}))
+    coordinator.async_add_listener(lambda: calls.append("second"), frozenset({2, 3}))
+    coordinator.async_add_listener(lambda: calls.append("always"))
+
+    coordinator.async_set_updated_data(bytearray(4))
+    assert sorted(calls) == ["always", "first", "second"]
+
+    calls.clear()
+    coordinator.async_set_updated_data(bytearray([0, 0, 0, 1]))
+    assert sorted(calls) == ["always", "second"]
+
+    calls.clear()
+    coordinator.async_set_updated_data(bytearray([0, 0, 0, 1]))
+    assert calls == ["always"]
+
+
+def test_removed_listener_leaves_the_index_table() -> None:
+    coordinator = _make_coordinator()
+    calls: list[str] = []
+    remove_first = coordinator.async_add_listener(
+        lambda: calls.append("first"), frozenset({0})
+    )
+    coordinator.async_set_updated_data(bytearray(2))
+
+    remove_first()
+    remove_always = coordinator.async_add_listener(lambda: calls.append("always"))
+    coordinator.async_add_listener(lambda: calls.append("second"), frozenset({0}))
+    calls.clear()
+    coordinator.async_set_updated_data(bytearray([1, 0]))
+    assert calls == ["always", "second"]
+
+    remove_always()
+    calls.clear()
+    coordinator.async_set_updated_data(bytearray([2, 0]))
+    assert calls == ["second"]
+    assert set(coordinator._listeners_by_index or {}) == {0}  # noqa: SLF001
+
+
+def test_disconnect_updates_every_listener() -> None:
+    coordinator = _make_coordinator()
+    calls: list[str] = []
+    coordinator.async_add_listener(lambda: calls.append("first"), frozenset({1}))
+    coordinator.async_set_updated_data(bytearray(2))
+
+    calls.clear()
+    coordinator.async_set_updated_data(None)
+
+    assert calls == ["first"]
+
+
+def test_read_decodes_each_frame_once() -> None:
+    coordinator = _make_coordinator()
+    control = EnumControl(key="program", read_index=0, options={1: "one", 2: "two"})
+    other = EnumControl(key="other", read_index=1, options={1: "one"})
+    plan = Mock(wraps=DecodePlan([control]))
+    coordinator.decode_plan = plan
+
+    assert coordinator.read(control) is None
+
+    coordinator.async_set_updated_data(bytearray([1, 1]))
+    assert coordinator.read(control) == "one"
+    assert coordinator.read(control) == "one"
+    # Controls outside the plan are still read directly
+    assert coordinator.read(other) == "one"
+    assert plan.decode.call_count == 1
+
+    coordinator.async_set_updated_data(bytearray([2, 1]))
+    assert coordinator.read(control) == "two"
+    assert plan.decode.call_count == 2
+
+
+def test_send_command_returns_once_written() -> None:
+    async def run() -> None:
+        coordinator = _make_coordinator()
+        coordinator.command_tracker = CommandTracker({9: 1}, coordinator.write_command)
+        coordinator.async_set_updated_data(bytearray(2))
+
+        await coordinator.send_command(Command(9, 4))
+
+        # Confirmed in the background
+        assert coordinator.command_tracker.pending
+        coordinator.async_set_updated_data(bytearray([0, 4]))
+        await asyncio.sleep(0.01)
+        assert not coordinator.command_tracker.pending
+        assert coordinator.data == bytearray([0, 4])
+
+    asyncio.run(run())
+
+
+def test_pending_command_is_shown_until_confirmed() -> None:
+    async def run() -> None:
+        coordinator = _make_coordinator()
+        control = EnumControl(key="mode", read_index=1, options={0: "a", 4: "b"})
+        coordinator.decode_plan = DecodePlan([control])
+        coordinator.command_tracker = CommandTracker({9: 1}, coordinator.write_command)
+        calls: list[str] = []
+        coordinator.async_add_listener(lambda: calls.append("mode"), frozenset({1}))
+        coordinator.async_set_updated_data(bytearray(2))
+
+        send = asyncio.ensure_future(coordinator.send_command(Command(9, 4)))
+        await asyncio.sleep(0)
+        assert coordinator.read(control) == "b"
+        # A frame from before the command doesn't undo it
+        coordinator.async_set_updated_data(bytearray([1, 0]))
+        assert coordinator.read(control) == "b"
+
+        coordinator.async_set_updated_data(bytearray([1, 4]))
+        await send
+        assert coordinator.read(control) == "b"
+        assert coordinator.data == bytearray([1, 4])
+        assert calls
+
+    asyncio.run(run())
+
+
+def test_unconfirmed_command_rolls_back() -> None:
+    async def run() -> list[Command]:
+        coordinator = _make_coordinator()
+        written: list[Command] = []
+
+        async def write(command: Command) -> bool:
+            written.append(command)
+            return True
+
+        coordinator.write_command = write  # type: ignore[method-assign]
+        coordinator.command_tracker = CommandTracker({9: 1}, write)
+        coordinator.async_set_updated_data(bytearray(2))
+
+        await coordinator.send_command(Command(9, 4))
+        assert coordinator.data == bytearray([0, 4])
+        await asyncio.sleep(0.1)
+        assert coordinator.data == bytearray(2)
+        return written
+
+    with patch("custom_components.homewhiz.command_tracker.CONFIRM_TIMEOUT", 0.01):
+        # Nothing came back, the command was sent again
+        assert asyncio.run(run()) == [Command(9, 4), Command(9, 4)]
+
+
+def test_ignored_command_rolls_back_without_sending_again() -> None:
+    async def run() -> list[Command]:
+        coordinator = _make_coordinator()
+        written: list[Command] = []
+
+        async def write(command: Command) -> bool:
+            written.append(command)
+            return True
+
+        coordinator.write_command = write  # type: ignore[method-assign]
+        coordinator.command_tracker = CommandTracker({9: 1}, write)
+        coordinator.async_set_updated_data(bytearray(2))
+
+        await coordinator.send_command(Command(9, 4))
+        # The appliance keeps reporting, without the new value
+        coordinator.async_set_updated_data(bytearray([1, 0]))
+        await asyncio.sleep(0.1)
+        assert coordinator.data == bytearray([1, 0])
+        return written
+
+    with patch("custom_components.homewhiz.command_tracker.CONFIRM_TIMEOUT", 0.01):
+        assert asyncio.run(run()) == [Command(9, 4)]
+
+
+def test_frames_are_copied_only_while_commands_are_pending() -> None:
+    async def run() -> None:
+        coordinator = _make_coordinator()
+        coordinator.command_tracker = CommandTracker({9: 1}, coordinator.write_command)
+        buffer = bytearray([1, 0])
+        coordinator.async_set_updated_frame(buffer, None)
+        assert coordinator.data is buffer
+
+        await coordinator.send_command(Command(9, 4))
+        # The connection assembles the next frames in the same buffer
+        buffer[:] = b"\xff\x00"
+        assert coordinator.data == bytearray([1, 4])
+        coordinator.async_set_updated_frame(buffer, None)
+        buffer[:] = b"\xee\xee"
+        coordinator._async_update_overlay()  # noqa: SLF001
+        assert coordinator.data == bytearray([0xFF, 4])
+        coordinator.async_cancel_confirmations()
+
+    asyncio.run(run())
+
+
+def test_only_the_failed_command_of_a_batch_rolls_back() -> None:
+    async def run() -> None:
+        coordinator = _make_coordinator()
+
+        async def write_commands(commands: Sequence[Command]) -> list[Command]:
+            # The first write failed, the queue sent the second one anyway
+            return list(commands[1:])
+
+        coordinator.write_commands = write_commands  # type: ignore[method-assign]
+        coordinator.command_tracker = CommandTracker(
+            {8: 0, 9: 1}, coordinator.write_command
+        )
+        coordinator.async_set_updated_data(bytearray(2))
+
+        await coordinator.send_commands([Command(8, 3), Command(9, 4)])
+        # 8:3 rolled back, 9:4 is shown until the appliance confirms it
+        assert coordinator.data == bytearray([0, 4])
+        coordinator.async_set_updated_data(bytearray([0, 4]))
+        await asyncio.sleep(0.01)
+        assert not coordinator.command_tracker.pending
+
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import cast
+
+import pytest
+
+from custom_components.homewhiz.api import HomeWhizApi, LoginError, LoginResponse
+from custom_components.homewhiz.credentials import REFRESH_AHEAD, CredentialManager
+
+
+class _FakeApi:
+    def __init__(self, lifetime: float = 3600) -> None:
+        self.logins: list[tuple[str, str]] = []
+        self.lifetime = lifetime
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def login(self, username: str, password: str) -> LoginResponse:
+        self.logins.append((username, password))
+        await self.release.wait()
+        if password == "wrong":
+            raise LoginError
+        return LoginResponse(
+            accessKey=f"key{len(self.logins)}",
+            secretKey="secret",
+            sessionToken="token",
+            expiration=int((time.time() + self.lifetime) * 1000),
+        )
+
+
+def _make_manager(api: _FakeApi) -> CredentialManager:
+    return CredentialManager(cast(HomeWhizApi, api))
+
+
+def test_concurrent_requests_share_one_login() -> None:
+    api = _FakeApi()
+    manager = _make_manager(api)
+
+    async def run() -> list[LoginResponse]:
+        api.release.clear()
+        waiting = [
+            asyncio.ensure_future(manager.async_get("user", "password"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        api.release.set()
+        results = await asyncio.gather(*waiting)
+        results.append(await manager.async_get("user", "password"))
+        return results
+
+    results = asyncio.run(run())
+
+    assert api.logins == [("user", "password")]
+    assert all(result is results[0] for result in results)
+
+
+def test_accounts_are_kept_apart() -> None:
+    api = _FakeApi()
+    manager = _make_manager(api)
+
+    async def run() -> None:
+        await manager.async_get("first", "password")
+        await manager.async_get("second", "password")
+        await manager.async_get("first", "password")
+        # A new password logs in again
+        await manager.async_get("first", "changed")
+
+    asyncio.run(run())
+
+    assert api.logins == [
+        ("first", "password"),
+        ("second", "password"),
+        ("first", "changed"),
+    ]
+
+
+def test_credentials_are_refreshed_ahead_of_expiration() -> None:
+    api = _FakeApi(lifetime=REFRESH_AHEAD.total_seconds() - 1)
+    manager = _make_manager(api)
+
+    async def run() -> tuple[LoginResponse, LoginResponse]:
+        return (
+            await manager.async_get("user", "password"),
+            await manager.async_get("user", "password"),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert len(api.logins) == 2
+    assert first.accessKey != second.accessKey
+
+
+def test_failed_login_is_not_cached() -> None:
+    api = _FakeApi()
+    manager = _make_manager(api)
+
+    async def run() -> None:
+        with pytest.raises(LoginError):
+            await manager.async_get("user", "wrong")
+        await manager.async_get("user", "password")
+        manager.invalidate("user")
+        await manager.async_get("user", "password")
+
+    asyncio.run(run())
+
+    assert len(api.logins) == 3
+
+
+def test_invalidate_during_a_login_does_not_fail_it() -> None:
+    api = _FakeApi()
+    manager = _make_manager(api)
+
+    async def run() -> LoginResponse:
+        api.release.clear()
+        waiting = asyncio.ensure_future(manager.async_get("user", "password"))
+        await asyncio.sleep(0)
+        # Runs after the login stored the credentials, before the caller resumes
+        manager._logins["user"].add_done_callback(  # noqa: SLF001
+            lambda _: manager.invalidate("user")
+        )
+        api.release.set()
+        return await waiting
+
+    assert asyncio.run(run()).accessKey == "key1"
@@ -0,0 +1,95 @@
+import json
+import random
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from bidict import bidict
+from dacite import from_dict
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.appliance_controls import (
+    DEVICE_STATE_OFF,
+    BooleanBitmaskControl,
+    BooleanControl,
+    EnumControl,
+    WriteEnumControl,
+    generate_controls_from_config,
+)
+from custom_components.homewhiz.decode_plan import DecodePlan
+
+from .test_config import file_names
+
+
+@pytest.mark.parametrize("file_name", file_names)
+def test_plan_matches_get_value(file_name: str) -> None:
+    file_path = Path(__file__).parent / "fixtures" / file_name
+    with file_path.open() as file:
+        config = from_dict(ApplianceConfiguration, json.load(file))
+    controls = generate_controls_from_config(f"test_decode_plan_{file_name}", config)
+    plan = DecodePlan(controls)
+    rng = random.Random(file_name)
+    with patch("custom_components.homewhiz.appliance_controls.datetime") as clock:
+        clock.now.return_value = datetime(2026, 1, 1, 12, 30, 15, tzinfo=UTC)
+        frames = [
+            bytearray(rng.randrange(256) for _ in range(size))
+            # Frames too short for some of the indices included
+            for size in (256, 256, 40, 0)
+        ]
+        state = next((c for c in controls if c.key == "state"), None)
+        if isinstance(state, EnumControl):
+            device_off = bytearray(frames[0])
+            off_bytes = [
+                b for b, name in state.options.items() if name == DEVICE_STATE_OFF
+            ]
+            device_off[state.read_index] = off_bytes[0] if off_bytes else 0
+            frames.append(device_off)
+        # Out of range booleans fall back to what the plan saw last
+        last_known: dict[str, bool] = {}
+        for data in frames:
+            snapshot = plan.decode(data)
+            for control in controls:
+                if not plan.covers(control):
+                    continue
+                if isinstance(control, BooleanControl):
+                    expected = control.get_value(data, last_known)
+                else:
+                    expected = control.get_value(data)
+                assert snapshot[control.key] == expected, control.key
+
+
+def test_out_of_range_boolean_keeps_last_known_value() -> None:
+    control = BooleanBitmaskControl(key="warning", read_index=2, bit=1)
+    plan = DecodePlan([control])
+
+    assert plan.decode(bytearray([0, 0, 2]))["warning"] is True
+    assert plan.decode(bytearray([0]))["warning"] is True
+
+
+def test_last_known_booleans_are_per_plan() -> None:
+    control = BooleanBitmaskControl(key="warning", read_index=2, bit=1)
+    first_booleans: dict[str, bool] = {}
+    first = DecodePlan([control], first_booleans)
+    second = DecodePlan([control])
+
+    first.decode(bytearray([0, 0, 2]))
+
+    assert first_booleans == {"warning": True}
+    assert first.read(control, bytearray([0])) is True
+    assert second.decode(bytearray([0]))["warning"] is False
+    assert control.get_value(bytearray([0])) is False
+
+
+def test_duplicate_and_foreign_controls_are_not_covered() -> None:
+    first = EnumControl(key="program", read_index=0, options={1: "first"})
+    duplicate = EnumControl(key="program", read_index=1, options={1: "second"})
+    foreign = WriteEnumControl(
+        key="other", read_index=0, write_index=0, options=bidict({1: "one"})
+    )
+    plan = DecodePlan([first, duplicate])
+
+    assert plan.covers(first)
+    assert not plan.covers(duplicate)
+    assert not plan.covers(foreign)
+    assert plan.decode(bytearray([1, 1])) == {"program": "first"}
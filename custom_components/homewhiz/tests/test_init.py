@@ -1,17 +1,23 @@
-"""Tests for the entry setup guard in async_setup_entry.
+"""Tests for the entry setup guard in async_setup_entry and its runtime data.
 
-Only the very first branch is driven here: it raises before touching hass
-or any coordinator, so a bare Mock standing in for the config entry is
-enough.
+Only the very first branch of async_setup_entry is driven here: it raises
+before touching hass or any coordinator, so a bare Mock standing in for the
+config entry is enough.
 """
 
 import asyncio
-from unittest.mock import Mock
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from homeassistant.exceptions import HomeAssistantError
 
-from custom_components.homewhiz import async_setup_entry
+from custom_components.homewhiz import async_setup_entry, async_unload_entry
+from custom_components.homewhiz.const import DOMAIN
+from custom_components.homewhiz.contents_store import fingerprint
+from custom_components.homewhiz.control_registry import control_registry
+from custom_components.homewhiz.runtime_data import build_runtime_data
 
 
 def test_missing_ids_raises_home_assistant_error() -> None:
@@ -21,3 +27,45 @@ def test_missing_ids_raises_home_assistant_error() -> None:
 
     with pytest.raises(HomeAssistantError):
         asyncio.run(async_setup_entry(Mock(), entry))
+
+
+def _entry(entry_id: str) -> tuple[Mock, dict]:
+    config = json.loads(
+        (Path(__file__).parent / "fixtures" / "example_ac_config.json").read_text()
+    )
+    contents = {"config": config, "localization": {"key": "Key"}}
+    entry = Mock()
+    entry.entry_id = entry_id
+    entry.data = {
+        "contents_ref": fingerprint(contents),
+        "config_fingerprint": fingerprint(config),
+        "appliance_info": None,
+        "ids": {"appId": "test"},
+    }
+    return entry, contents
+
+
+def test_runtime_data_holds_parsed_contents_and_controls() -> None:
+    entry, contents = _entry("test_runtime_data")
+
+    runtime_data = build_runtime_data(entry, contents)
+
+    assert runtime_data.data.ids.appId == "test"
+    assert runtime_data.data.contents.localization == {"key": "Key"}
+    assert runtime_data.controls
+    control_registry.release(entry.entry_id)
+
+
+def test_unload_releases_the_controls() -> None:
+    entry, contents = _entry("test_unload")
+    graph = build_runtime_data(entry, contents).graph
+    hass = Mock()
+    hass.data = {DOMAIN: {entry.entry_id: Mock(kill=AsyncMock())}}
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+
+    assert asyncio.run(async_unload_entry(hass, entry))
+
+    assert entry.entry_id not in hass.data[DOMAIN]
+    # Nothing holds the graph anymore, the next setup builds it again
+    assert build_runtime_data(entry, contents).graph is not graph
+    control_registry.release(entry.entry_id)
@@ -0,0 +1,259 @@
+"""Tests for AccountMqttHub with a fake awscrt connection.
+
+The connection builder and the credential manager are replaced, everything
+else runs on a real event loop with a Mock hass.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+from unittest.mock import Mock, patch
+
+from custom_components.homewhiz.api import LoginError, LoginResponse
+from custom_components.homewhiz.config_flow import CloudConfig
+from custom_components.homewhiz.const import DATA_CREDENTIALS, DATA_MQTT_HUBS
+from custom_components.homewhiz.mqtt_hub import async_get_mqtt_hub
+
+
+def _done(result: Any = None) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.subscriptions: dict[str, Callable[..., None]] = {}
+        self.resubscribes = 0
+        self.disconnected = False
+
+    def connect(self) -> Future:
+        return _done()
+
+    def disconnect(self) -> Future:
+        self.disconnected = True
+        return _done()
+
+    def subscribe(
+        self, topic: str, qos: Any, callback: Callable[..., None]
+    ) -> tuple[Future, int]:
+        self.subscriptions[topic] = callback
+        return _done(), 1
+
+    def unsubscribe(self, topic: str) -> tuple[Future, int]:
+        del self.subscriptions[topic]
+        return _done(), 1
+
+    def resubscribe_existing_topics(self) -> tuple[Future, int]:
+        self.resubscribes += 1
+        return _done(), 1
+
+    def deliver(self, topic: str, payload: bytes) -> None:
+        self.subscriptions[topic](
+            topic=topic, payload=payload, dup=False, qos=1, retain=False
+        )
+
+
+class _Appliance:
+    def __init__(self) -> None:
+        self.messages: list[bytes] = []
+        self.subscribed = 0
+
+    def on_message(self, payload: bytes) -> None:
+        self.messages.append(payload)
+
+    async def on_subscribed(self) -> None:
+        self.subscribed += 1
+
+
+def _credential_manager() -> Mock:
+    async def login(*args: Any) -> LoginResponse:
+        return LoginResponse(
+            accessKey="key",
+            secretKey="secret",
+            sessionToken="token",
+            expiration=int((time.time() + 3600) * 1000),
+        )
+
+    manager = Mock()
+    manager.async_get.side_effect = login
+    return manager
+
+
+def _run_with_hub(test: Callable[..., Any]) -> list[_FakeConnection]:
+    connections: list[_FakeConnection] = []
+
+    def build(**kwargs: Any) -> _FakeConnection:
+        connection = _FakeConnection()
+        connection.on_resumed = kwargs["on_connection_resumed"]  # type: ignore[attr-defined]
+        connections.append(connection)
+        return connection
+
+    async def run() -> None:
+        hass = Mock()
+        hass.loop = asyncio.get_running_loop()
+        hass.data = {DATA_CREDENTIALS: _credential_manager()}
+        hass.async_create_task = hass.loop.create_task
+        hub = async_get_mqtt_hub(hass, CloudConfig("user", "password"))
+        await test(hass, hub, connections)
+
+    with (
+        patch(
+            "awsiot.mqtt_connection_builder.websockets_with_default_aws_signing",
+            side_effect=build,
+        ),
+        patch("custom_components.homewhiz.mqtt_hub.async_track_point_in_utc_time"),
+    ):
+        asyncio.run(run())
+    return connections
+
+
+def test_appliances_share_one_connection() -> None:
+    first, second = _Appliance(), _Appliance()
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        assert await hub.async_add_appliance("A", first.on_message, first.on_subscribed)
+        assert await hub.async_add_appliance(
+            "B", second.on_message, second.on_subscribed
+        )
+        assert async_get_mqtt_hub(hass, CloudConfig("user", "password")) is hub
+
+        connection = connections[0]
+        connection.deliver("$aws/things/A/shadow/update/accepted", b"a")
+        connection.deliver("$aws/things/B/shadow/get/accepted", b"b")
+
+    connections = _run_with_hub(test)
+
+    assert len(connections) == 1
+    assert first.messages == [b"a"]
+    assert second.messages == [b"b"]
+    assert first.subscribed == second.subscribed == 1
+
+
+def test_resume_resubscribes_every_appliance_at_once() -> None:
+    first, second = _Appliance(), _Appliance()
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        await hub.async_add_appliance("A", first.on_message, first.on_subscribed)
+        await hub.async_add_appliance("B", second.on_message, second.on_subscribed)
+
+        connections[0].on_resumed(return_code=0, session_present=False)  # type: ignore[attr-defined]
+        await asyncio.sleep(0.01)
+
+    connections = _run_with_hub(test)
+
+    assert connections[0].resubscribes == 1
+    assert first.subscribed == second.subscribed == 2
+
+
+def test_last_appliance_closes_the_connection() -> None:
+    first, second = _Appliance(), _Appliance()
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        await hub.async_add_appliance("A", first.on_message, first.on_subscribed)
+        await hub.async_add_appliance("B", second.on_message, second.on_subscribed)
+
+        await hub.async_remove_appliance("A")
+        assert not connections[0].disconnected
+        assert set(connections[0].subscriptions) == {
+            "$aws/things/B/shadow/update/accepted",
+            "$aws/things/B/shadow/get/accepted",
+        }
+
+        await hub.async_remove_appliance("B")
+        assert connections[0].disconnected
+        assert hass.data[DATA_MQTT_HUBS] == {}
+
+    _run_with_hub(test)
+
+
+def test_rejected_login_asks_for_the_new_password() -> None:
+    appliance, other = _Appliance(), _Appliance()
+    account_entry, other_entry = Mock(), Mock()
+    account_entry.data = {"cloud_config": {"username": "user", "password": "old"}}
+    other_entry.data = {"cloud_config": None}
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        manager = hass.data[DATA_CREDENTIALS]
+        manager.async_get.side_effect = LoginError("rejected")
+        hass.config_entries.async_entries.return_value = [account_entry, other_entry]
+
+        assert not await hub.async_add_appliance(
+            "A", appliance.on_message, appliance.on_subscribed
+        )
+        assert not await hub.async_add_appliance(
+            "B", other.on_message, other.on_subscribed
+        )
+        manager.invalidate.assert_called_with("user")
+        account_entry.async_start_reauth.assert_called_with(hass)
+        other_entry.async_start_reauth.assert_not_called()
+
+        # The reloaded entry brings the new password, connecting is not
+        # held back by a scheduled retry
+        manager.async_get.side_effect = _credential_manager().async_get.side_effect
+        assert async_get_mqtt_hub(hass, CloudConfig("user", "new")) is hub
+        assert await hub.async_add_appliance(
+            "A", appliance.on_message, appliance.on_subscribed
+        )
+        manager.async_get.assert_called_with("user", "new")
+        # The appliance of the entry that was not reloaded is subscribed too
+        assert set(connections[0].subscriptions) == {
+            f"$aws/things/{appliance_id}/shadow/{action}/accepted"
+            for appliance_id in ("A", "B")
+            for action in ("update", "get")
+        }
+
+    connections = _run_with_hub(test)
+
+    assert len(connections) == 1
+    assert appliance.subscribed == other.subscribed == 1
+
+
+def test_unsubscribe_does_not_wait_forever() -> None:
+    first, second = _Appliance(), _Appliance()
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        await hub.async_add_appliance("A", first.on_message, first.on_subscribed)
+        await hub.async_add_appliance("B", second.on_message, second.on_subscribed)
+        acks: list[Future] = []
+
+        def unsubscribe(topic: str) -> tuple[Future, int]:
+            acks.append(Future())
+            return acks[-1], 1
+
+        connections[0].unsubscribe = unsubscribe  # type: ignore[method-assign]
+
+        await hub.async_remove_appliance("A")
+        assert hub.is_connected
+        # The acknowledgements come in late, awscrt can still resolve them
+        for ack in acks:
+            ack.set_result(None)
+        await asyncio.sleep(0)
+
+    with patch("custom_components.homewhiz.mqtt_hub.UNSUBSCRIBE_TIMEOUT", 0.01):
+        _run_with_hub(test)
+
+
+def test_failed_connect_logs_in_again() -> None:
+    from awscrt.exceptions import AwsCrtError  # noqa: PLC0415
+
+    appliance = _Appliance()
+
+    def refused(self: _FakeConnection) -> Future:
+        future: Future = Future()
+        future.set_exception(AwsCrtError(1, "AWS_ERROR", "refused"))
+        return future
+
+    async def test(hass: Mock, hub: Any, connections: list[_FakeConnection]) -> None:
+        assert not await hub.async_add_appliance(
+            "A", appliance.on_message, appliance.on_subscribed
+        )
+        hass.data[DATA_CREDENTIALS].invalidate.assert_called_once_with("user")
+
+    with (
+        patch.object(_FakeConnection, "connect", refused),
+        patch("custom_components.homewhiz.mqtt_hub.async_track_point_in_time"),
+    ):
+        _run_with_hub(test)
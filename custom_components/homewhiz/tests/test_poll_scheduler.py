@@ -0,0 +1,144 @@
+"""Tests for PollScheduler with a fake clock and timer."""
+
+import asyncio
+from typing import Any
+from unittest.mock import Mock, patch
+
+from custom_components.homewhiz.appliance_controls import DEVICE_STATE_OFF
+from custom_components.homewhiz.poll_scheduler import (
+    COMMAND_READ_DELAY,
+    FAST_POLL_INTERVAL,
+    IDLE_POLL_INTERVAL,
+    POLL_INTERVAL,
+    PollScheduler,
+)
+
+
+class _Harness:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.state: Any = None
+        self.commands_pending = False
+        self.polls = 0
+        self.timer: tuple[float, Any] | None = None
+        self.due = 0.0
+        self.scheduler = PollScheduler(
+            Mock(), self._poll, lambda: self.state, lambda: self.commands_pending
+        )
+
+    async def _poll(self) -> None:
+        self.polls += 1
+
+    def call_later(self, hass: Any, delay: float, action: Any) -> Mock:
+        self.timer = (delay, action)
+        self.due = self.now + delay
+        return Mock()
+
+    def fire(self) -> None:
+        assert self.timer is not None
+        self.now = self.due
+        asyncio.run(self.timer[1](None))
+
+
+def _run(test: Any) -> None:
+    harness = _Harness()
+    with (
+        patch(
+            "custom_components.homewhiz.poll_scheduler.async_call_later",
+            side_effect=harness.call_later,
+        ),
+        patch(
+            "custom_components.homewhiz.poll_scheduler.time.monotonic",
+            side_effect=lambda: harness.now,
+        ),
+    ):
+        test(harness)
+
+
+def test_interval_follows_device_state() -> None:
+    def test(harness: _Harness) -> None:
+        scheduler = harness.scheduler
+        assert scheduler.interval() == POLL_INTERVAL
+        harness.state = "device_state_running"
+        assert scheduler.interval() == FAST_POLL_INTERVAL
+        harness.state = "device_state_cooking_notification"
+        assert scheduler.interval() == FAST_POLL_INTERVAL
+        harness.state = DEVICE_STATE_OFF
+        assert scheduler.interval() == IDLE_POLL_INTERVAL
+        harness.state = "device_state_off_notification"
+        assert scheduler.interval() == IDLE_POLL_INTERVAL
+
+    _run(test)
+
+
+def test_polls_stay_fast_until_commands_are_confirmed() -> None:
+    def test(harness: _Harness) -> None:
+        harness.state = DEVICE_STATE_OFF
+        harness.commands_pending = True
+        harness.scheduler.async_command_sent()
+        harness.fire()
+        assert harness.timer is not None
+        assert harness.timer[0] == FAST_POLL_INTERVAL.total_seconds()
+        # Still waiting for the appliance, however long that takes
+        harness.fire()
+        assert harness.timer[0] == FAST_POLL_INTERVAL.total_seconds()
+
+        harness.commands_pending = False
+        harness.fire()
+        assert harness.timer[0] == IDLE_POLL_INTERVAL.total_seconds()
+        assert harness.polls == 3
+
+    _run(test)
+
+
+def test_polls_are_skipped_while_pushes_flow() -> None:
+    def test(harness: _Harness) -> None:
+        harness.scheduler.async_start()
+        harness.fire()
+        assert harness.polls == 1
+
+        # Unsolicited update half an interval later
+        harness.now += POLL_INTERVAL.total_seconds() / 2
+        harness.scheduler.async_message_received()
+        harness.fire()
+        assert harness.polls == 1
+        assert harness.timer is not None
+        assert harness.timer[0] == POLL_INTERVAL.total_seconds() / 2
+
+        # No more pushes, polling resumes
+        harness.fire()
+        assert harness.polls == 2
+
+    _run(test)
+
+
+def test_poll_answers_are_not_pushes() -> None:
+    def test(harness: _Harness) -> None:
+        harness.scheduler.async_start()
+        harness.fire()
+        harness.now += 1
+        harness.scheduler.async_message_received()
+        harness.fire()
+        assert harness.polls == 2
+
+    _run(test)
+
+
+def test_command_is_read_back_and_running_program_polls_sooner() -> None:
+    def test(harness: _Harness) -> None:
+        harness.state = DEVICE_STATE_OFF
+        harness.scheduler.async_start()
+        assert harness.timer is not None
+        assert harness.timer[0] == IDLE_POLL_INTERVAL.total_seconds()
+
+        harness.state = "device_state_running"
+        harness.scheduler.async_message_received()
+        assert harness.timer[0] == FAST_POLL_INTERVAL.total_seconds()
+
+        # Read back even though the push above was just now
+        harness.scheduler.async_command_sent()
+        assert harness.timer[0] == COMMAND_READ_DELAY.total_seconds()
+        harness.fire()
+        assert harness.polls == 1
+
+    _run(test)
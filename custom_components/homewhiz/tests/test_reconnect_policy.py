@@ -0,0 +1,94 @@
+"""Tests for ReconnectPolicy backoff, circuit breaker and single flight."""
+
+import asyncio
+import random
+
+import pytest
+
+from custom_components.homewhiz.reconnect_policy import ReconnectPolicy
+
+
+def _policy(**kwargs: float) -> ReconnectPolicy:
+    return ReconnectPolicy("test", rng=random.Random(0), **kwargs)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_delays_grow_exponentially_with_jitter(seed: int) -> None:
+    policy = ReconnectPolicy(
+        "test",
+        base_delay=5,
+        max_delay=300,
+        failure_threshold=100,
+        rng=random.Random(seed),
+    )
+    for failure in range(1, 20):
+        ceiling = min(300, 5 * 2 ** (failure - 1))
+        delay = policy.record_failure()
+        assert ceiling / 2 <= delay <= ceiling
+        assert not policy.allow_attempt()
+
+
+def test_jitter_spreads_appliances_apart() -> None:
+    delays = {
+        ReconnectPolicy("test", rng=random.Random(seed)).record_failure()
+        for seed in range(10)
+    }
+    assert len(delays) == 10
+
+
+def test_circuit_opens_after_repeated_failures() -> None:
+    policy = _policy(failure_threshold=3, open_duration=900)
+    for _ in range(2):
+        policy.record_failure()
+    assert not policy.is_open
+    delay = policy.record_failure()
+    assert policy.is_open
+    assert 450 <= delay <= 900
+    # Still open after another failed attempt
+    assert 450 <= policy.record_failure() <= 900
+
+    policy.record_success()
+    assert not policy.is_open
+    assert policy.failures == 0
+    assert policy.allow_attempt()
+
+
+def test_concurrent_callers_share_one_attempt() -> None:
+    async def run() -> tuple[list[bool], int]:
+        policy = _policy()
+        attempts = 0
+
+        async def connect() -> bool:
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.01)
+            return True
+
+        results = await asyncio.gather(
+            *(policy.async_attempt(connect) for _ in range(5))
+        )
+        return results, attempts
+
+    assert asyncio.run(run()) == ([True] * 5, 1)
+
+
+def test_failed_attempt_backs_off() -> None:
+    async def run() -> ReconnectPolicy:
+        policy = _policy()
+
+        async def connect() -> bool:
+            raise RuntimeError("Can't connect")
+
+        with pytest.raises(RuntimeError):
+            await policy.async_attempt(connect)
+        assert not await policy.async_attempt(_disconnected)
+        return policy
+
+    policy = asyncio.run(run())
+    assert policy.failures == 2
+    assert not policy.allow_attempt()
+    assert policy.delay > 0
+
+
+async def _disconnected() -> bool:
+    return False
@@ -10,6 +10,7 @@ and monkeypatched RestoreSensor hooks rather than a real hass instance.
 import asyncio
 import math
 from datetime import UTC, datetime
+from typing import Any
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -34,6 +35,8 @@ from custom_components.homewhiz.sensor import (
     _find_instant_consumption_controls,
 )
 
+from .test_coordinator import _make_coordinator
+
 
 def _entry_data() -> EntryData:
     return EntryData(
@@ -149,7 +152,7 @@ def _power_control(read_index: int = 45) -> NumericControl:
     )
 
 
-def _energy_entity(coordinator: Mock | None = None) -> HomeWhizEnergyEntity:
+def _energy_entity(coordinator: Any = None) -> HomeWhizEnergyEntity:
     if coordinator is None:
         coordinator = Mock()
         coordinator.data = bytearray(60)
@@ -320,6 +323,32 @@ def test_handle_coordinator_update_calls_advance_integration() -> None:
     assert isinstance(called_now, datetime)
 
 
+def test_constant_power_for_longer_than_the_gap_is_integrated() -> None:
+    """The power byte never changes, yet every frame must reach the entity."""
+    coordinator = _make_coordinator()
+    entity = _energy_entity(coordinator)
+    assert entity.coordinator_context is None
+    coordinator.async_add_listener(
+        entity._handle_coordinator_update, entity.coordinator_context
+    )
+    frame = bytearray(60)
+    frame[45] = 4  # 4 * 0.1 = 0.4 kW
+
+    with (
+        patch("custom_components.homewhiz.sensor.datetime") as clock,
+        patch.object(CoordinatorEntity, "_handle_coordinator_update"),
+    ):
+        # A frame every 10 minutes for 2 hours
+        for minutes in range(0, 121, 10):
+            clock.now.return_value = datetime(
+                2026, 1, 1, 12 + minutes // 60, minutes % 60, tzinfo=UTC
+            )
+            coordinator.async_set_updated_data(bytearray(frame))
+
+    # 0.4 kW for 2 hours, longer than MAX_INTEGRATION_GAP_HOURS
+    assert entity.native_value == pytest.approx(0.8)
+
+
 def test_async_added_to_hass_restores_previous_total() -> None:
     entity = _energy_entity()
     entity.async_get_last_sensor_data = AsyncMock(  # type: ignore[method-assign]
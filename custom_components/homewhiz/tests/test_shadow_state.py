@@ -0,0 +1,57 @@
+from custom_components.homewhiz.shadow_state import (
+    ShadowState,
+    ShadowUpdate,
+    parse_shadow_update,
+)
+
+
+def test_parse_reads_offset_and_modified_time() -> None:
+    update = parse_shadow_update(
+        '{"state": {"reported": {"wfaStartOffset": "4", "wfa": [1, 2],'
+        ' "modifiedTime": 1720000000}}}'
+    )
+    assert update == ShadowUpdate(4, [1, 2], 1720000000)
+    assert parse_shadow_update('{"state": {"reported": {"wfa": [1]}}}') == (
+        ShadowUpdate(26, [1], None)
+    )
+
+
+def test_first_update_creates_the_frame() -> None:
+    state = ShadowState()
+    assert state.apply(ShadowUpdate(2, [5, 6])) is None
+    assert state.frame == bytearray([0, 0, 5, 6])
+
+
+def test_partial_update_is_written_in_place() -> None:
+    state = ShadowState()
+    state.apply(ShadowUpdate(0, [1, 2, 3, 4]))
+    frame = state.frame
+
+    assert state.apply(ShadowUpdate(2, [3, 9])) == {3}
+    assert state.frame is frame
+    assert frame == bytearray([1, 2, 3, 9])
+
+
+def test_longer_update_extends_the_frame() -> None:
+    state = ShadowState()
+    state.apply(ShadowUpdate(0, [1, 2]))
+
+    assert state.apply(ShadowUpdate(1, [2, 0, 7])) == {2, 3}
+    assert state.frame == bytearray([1, 2, 0, 7])
+
+
+def test_duplicates_and_older_updates_change_nothing() -> None:
+    state = ShadowState()
+    state.apply(ShadowUpdate(0, [1, 2], 100))
+
+    # Redelivered by the broker
+    assert state.apply(ShadowUpdate(0, [1, 2], 100)) == set()
+    # Overtaken by the update from 100
+    assert state.apply(ShadowUpdate(0, [0, 0], 99)) == set()
+    assert state.frame == bytearray([1, 2])
+    # Same second, different bytes
+    assert state.apply(ShadowUpdate(0, [1, 3], 100)) == {1}
+
+    state.restart_ordering()
+    assert state.apply(ShadowUpdate(0, [4, 3], 5)) == {0}
+    assert state.modified_time == 5
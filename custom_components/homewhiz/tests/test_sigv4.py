@@ -0,0 +1,105 @@
+"""Tests for SigV4Signer, using vectors from the AWS SigV4 test suite."""
+
+import datetime as dt
+import hashlib
+import hmac
+from unittest.mock import patch
+
+from custom_components.homewhiz import sigv4
+from custom_components.homewhiz.sigv4 import (
+    SignedRequest,
+    SigV4Signer,
+    get_signature_key,
+)
+
+ACCESS_KEY = "AKIDEXAMPLE"
+SECRET_KEY = "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+NOW = dt.datetime(2015, 8, 30, 12, 36, tzinfo=dt.UTC)
+HOST = "example.amazonaws.com"
+SCOPE = "AKIDEXAMPLE/20150830/us-east-1/service/aws4_request"
+
+
+def _authorization(signature: str) -> str:
+    return (
+        f"AWS4-HMAC-SHA256 Credential={SCOPE}, "
+        f"SignedHeaders=host;x-amz-date, Signature={signature}"
+    )
+
+
+def test_signing_key_derivation() -> None:
+    key = get_signature_key(SECRET_KEY, "20120215", "us-east-1", "iam")
+
+    assert key.hex() == (
+        "f4780e2d9f65fa895f9c67b32ce1baf0b0d8a43505a000a1a9e090d414db404d"
+    )
+
+
+def test_aws_test_suite_vectors() -> None:
+    signer = SigV4Signer("us-east-1", "service")
+    vectors = {
+        # get-vanilla
+        SignedRequest(HOST, "/"): (
+            "5fa00fa31553b73ebf1942676e86291e8372ff2a2260956d9b8aae1d763fbf31"
+        ),
+        # get-vanilla-query-order-key-case
+        SignedRequest(HOST, "/", "Param2=value2&Param1=value1"): (
+            "b97d918cfa904a5beff61c982a1b6f458b799221646efd99d3219ec94cdf2500"
+        ),
+        # post-vanilla
+        SignedRequest(HOST, "/", method="POST"): (
+            "5da7c1a2acd57cee7505fc6676e4e544621c30862966e37dddb68e92efbe5d6b"
+        ),
+    }
+
+    signed = signer.sign_many(vectors, ACCESS_KEY, SECRET_KEY, now=NOW)
+
+    for headers, signature in zip(signed, vectors.values(), strict=True):
+        assert headers == {
+            "x-amz-date": "20150830T123600Z",
+            "Authorization": _authorization(signature),
+        }
+
+
+def test_session_token_is_signed() -> None:
+    signer = SigV4Signer()
+    headers = signer.sign(
+        SignedRequest("api.arcelikiot.com", "/my-homes"),
+        "access",
+        "secret",
+        "token",
+        now=NOW,
+    )
+
+    canonical_request = (
+        "GET\n/my-homes\n\nhost:api.arcelikiot.com\n"
+        "x-amz-date:20150830T123600Z\nx-amz-security-token:token\n\n"
+        "host;x-amz-date;x-amz-security-token\n"
+        f"{hashlib.sha256(b'').hexdigest()}"
+    )
+    string_to_sign = (
+        "AWS4-HMAC-SHA256\n20150830T123600Z\n"
+        "20150830/eu-west-1/execute-api/aws4_request\n"
+        f"{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+    )
+    key = get_signature_key("secret", "20150830", "eu-west-1", "execute-api")
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    assert headers["x-amz-security-token"] == "token"
+    assert headers["Authorization"].endswith(f"Signature={signature}")
+
+
+def test_signing_keys_are_cached() -> None:
+    signer = SigV4Signer()
+    with patch.object(
+        sigv4, "get_signature_key", wraps=sigv4.get_signature_key
+    ) as derive:
+        for _ in range(3):
+            signer.sign(SignedRequest(HOST, "/"), ACCESS_KEY, SECRET_KEY, now=NOW)
+        signer.sign(
+            SignedRequest(HOST, "/"),
+            ACCESS_KEY,
+            SECRET_KEY,
+            now=NOW + dt.timedelta(days=1),
+        )
+        signer.sign(SignedRequest(HOST, "/"), ACCESS_KEY, "other", now=NOW)
+
+    assert derive.call_count == 3
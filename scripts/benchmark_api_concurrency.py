@@ -0,0 +1,150 @@
+"""Compares the config flow requests run serially and concurrently
+
+Serves the HomeWhiz API endpoints from a local aiohttp stub server that
+answers every request after a fixed latency, then runs the requests of a
+Bluetooth config flow once one after the other, like before requests were
+gathered, and once the way the config flow does now.
+Run from the repository root: python -m scripts.benchmark_api_concurrency
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from custom_components.homewhiz.api import (
+    MAX_CONCURRENT_REQUESTS,
+    HomeWhizApi,
+    create_session,
+)
+
+FIXTURE = (
+    Path(__file__).parent.parent
+    / "custom_components/homewhiz/tests/fixtures/example_washing_machine_config.json"
+)
+LATENCY = 0.05
+LOCALIZATIONS = 4
+HOMES = 3
+APP_ID = "F999935286050711425369"
+ROUNDS = 5
+
+
+def create_app() -> web.Application:
+    config = json.loads(FIXTURE.read_text())
+    contents_index = {
+        "data": {
+            "results": [
+                {"cid": "config", "ctype": "CONFIGURATION", "ver": 1, "lang": "en-GB"}
+            ]
+            + [
+                {"cid": f"loc{i}", "ctype": "LOCALIZATION", "ver": 1, "lang": "en-GB"}
+                for i in range(LOCALIZATIONS)
+            ]
+        }
+    }
+    credentials = {
+        "accessKey": "access",
+        "secretKey": "secret",
+        "sessionToken": "token",
+        "expiration": 0,
+    }
+
+    def respond(body: Any) -> Any:
+        async def handler(request: web.Request) -> web.Response:
+            await asyncio.sleep(LATENCY)
+            return web.json_response(body)
+
+        return handler
+
+    async def contents(request: web.Request) -> web.Response:
+        await asyncio.sleep(LATENCY)
+        if request.match_info["ctype"] == "CONFIGURATIONS":
+            return web.json_response(config)
+        return web.json_response({"localizations": {"KEY": "value"}})
+
+    async def home(request: web.Request) -> web.Response:
+        await asyncio.sleep(LATENCY)
+        return web.json_response({"data": {"appliances": []}})
+
+    app = web.Application()
+    app.router.add_post(
+        "/auth/login",
+        respond({"success": True, "data": {"credentials": credentials}}),
+    )
+    app.router.add_get("/GetApplianceId", respond({"appId": APP_ID}))
+    app.router.add_get("/procam/contents", respond(contents_index))
+    app.router.add_get(
+        "/my-homes", respond({"data": [{"id": i} for i in range(HOMES)]})
+    )
+    app.router.add_get("/my-homes/{id}", home)
+    app.router.add_get("/procam-contents/{ctype}/{tail:.*}", contents)
+    return app
+
+
+class StubSession:
+    """Sends the requests of HomeWhizApi to the stub server instead."""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str) -> None:
+        self._session = session
+        self._base_url = base_url
+
+    def _rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self._base_url}{parts.path}{query}"
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._session.get(self._rewrite(url), **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        return self._session.post(self._rewrite(url), **kwargs)
+
+
+async def serial_flow(api: HomeWhizApi) -> None:
+    credentials = await api.login("user", "password")
+    await api.make_id_exchange_request("HwZ_hsmid")
+    contents_index = await api.fetch_contents_index(credentials, APP_ID)
+    for description in contents_index.results:
+        await api.make_get_contents_request(description)
+    await api.fetch_appliance_infos(credentials)
+
+
+async def concurrent_flow(api: HomeWhizApi) -> None:
+    credentials = await api.login("user", "password")
+    id_response = await api.make_id_exchange_request("HwZ_hsmid")
+    await asyncio.gather(
+        api.fetch_appliance_contents(credentials, id_response.appId),
+        api.fetch_appliance_infos(credentials),
+    )
+
+
+async def main() -> None:
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        async with create_session() as session:
+            stub = StubSession(session, f"http://127.0.0.1:{port}")
+            for name, flow, limit in (
+                ("serial", serial_flow, 1),
+                ("concurrent", concurrent_flow, MAX_CONCURRENT_REQUESTS),
+            ):
+                api = HomeWhizApi(stub, max_concurrent_requests=limit)  # type: ignore[arg-type]
+                start = time.perf_counter()
+                for _ in range(ROUNDS):
+                    await flow(api)
+                elapsed = (time.perf_counter() - start) / ROUNDS
+                print(f"{name:12} {elapsed * 1000:8.1f}ms per config flow")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
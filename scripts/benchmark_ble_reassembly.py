@@ -0,0 +1,87 @@
+"""Compares MessageAccumulator with the previous slicing implementation
+
+Replays a stream of BLE notifications through both accumulators. The stream
+is generated, there are no recordings in the repository: frames of the size
+washing machines send over Bluetooth, each split into two notifications
+with a 7 byte header.
+Run from the repository root: python -m scripts.benchmark_ble_reassembly
+"""
+
+import logging
+import random
+import timeit
+
+from custom_components.homewhiz.bluetooth import MessageAccumulator
+
+_LOGGER = logging.getLogger("custom_components.homewhiz")
+
+FRAMES = 1000
+FRAME_SIZE = 76
+ROUNDS = 20
+
+
+class SlicingAccumulator:
+    def __init__(self) -> None:
+        self._expected_index = 0
+        self._accumulated: bytearray = bytearray()
+
+    def accumulate_message(self, message: bytearray) -> bytearray | None:
+        message_index = message[4]
+        _LOGGER.debug("Message index: %d", message_index)
+        if message_index == 0:
+            self._accumulated = message[7:]
+            self._expected_index = 1
+        elif message_index == 1 and self._expected_index == 1:
+            full_message = self._accumulated + message[7:]
+            self._expected_index = 0
+            return full_message
+        else:
+            self._expected_index = 0
+            self._accumulated = bytearray()
+        return None
+
+
+def notification_stream(rng: random.Random) -> list[bytearray]:
+    stream = []
+    half = FRAME_SIZE // 2
+    for _ in range(FRAMES):
+        frame = bytes(rng.randrange(256) for _ in range(FRAME_SIZE))
+        for index, payload in enumerate((frame[:half], frame[half:])):
+            stream.append(bytearray([2, 4, 0, 0, index, 0, 0]) + payload)
+    return stream
+
+
+def replay(
+    accumulator: MessageAccumulator | SlicingAccumulator, stream: list[bytearray]
+) -> list[bytes]:
+    """Frames of the stream, copied since MessageAccumulator reuses them."""
+    frames = []
+    for message in stream:
+        frame = accumulator.accumulate_message(message)
+        if frame is not None:
+            frames.append(bytes(frame))
+    return frames
+
+
+def main() -> None:
+    stream = notification_stream(random.Random(0))
+    assert replay(SlicingAccumulator(), stream) == replay(MessageAccumulator(), stream)
+
+    def run(accumulator: MessageAccumulator | SlicingAccumulator) -> None:
+        accumulate = accumulator.accumulate_message
+        for message in stream:
+            accumulate(message)
+
+    previous = timeit.timeit(lambda: run(SlicingAccumulator()), number=ROUNDS)
+    current = timeit.timeit(lambda: run(MessageAccumulator()), number=ROUNDS)
+    per_frame = ROUNDS * FRAMES / 1e9
+    print(f"frames           {FRAMES * ROUNDS:8d} of {FRAME_SIZE} bytes")
+    print(f"slicing          {previous / per_frame:8.0f}ns per frame")
+    print(
+        f"reused buffers   {current / per_frame:8.0f}ns per frame "
+        f"({previous / current:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compares load_dataclass with dacite.from_dict on the appliance configurations
+
+Loads every JSON in the test fixtures as an ApplianceConfiguration with both.
+Fixtures that dacite rejects are timed up to the error.
+Run from the repository root: python -m scripts.benchmark_config_loader
+"""
+
+import json
+import timeit
+from pathlib import Path
+from typing import Any
+
+from dacite import DaciteError, from_dict
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.config_loader import load_dataclass
+
+FIXTURES = Path(__file__).parent.parent / "custom_components/homewhiz/tests/fixtures"
+ROUNDS = 20
+
+
+def _suppress(load: Any, data: Any) -> None:
+    try:
+        load(ApplianceConfiguration, data)
+    except DaciteError:
+        pass
+
+
+def main() -> None:
+    total_dacite = 0.0
+    total_loader = 0.0
+    print(f"{'fixture':48} {'dacite':>10} {'loader':>10}")
+    for path in sorted(FIXTURES.glob("*.json")):
+        data = json.loads(path.read_text())
+        dacite = timeit.timeit(lambda: _suppress(from_dict, data), number=ROUNDS)  # noqa: B023
+        loader = timeit.timeit(
+            lambda: _suppress(load_dataclass, data),  # noqa: B023
+            number=ROUNDS,
+        )
+        total_dacite += dacite
+        total_loader += loader
+        print(
+            f"{path.name:48} "
+            f"{dacite / ROUNDS * 1000:8.2f}ms {loader / ROUNDS * 1000:8.2f}ms"
+        )
+    print(
+        f"{'total':48} "
+        f"{total_dacite / ROUNDS * 1000:8.2f}ms {total_loader / ROUNDS * 1000:8.2f}ms "
+        f"({total_dacite / total_loader:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compares decoding a frame through DecodePlan with Control.get_value
+
+Decodes random frames for every appliance configuration in the test fixtures,
+once per control through get_value and once through the compiled plan.
+Run from the repository root: python -m scripts.benchmark_decode_plan
+"""
+
+import json
+import random
+import timeit
+from pathlib import Path
+
+from dacite import DaciteError, from_dict
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.appliance_controls import (
+    generate_controls_from_config,
+)
+from custom_components.homewhiz.decode_plan import DecodePlan
+
+FIXTURES = Path(__file__).parent.parent / "custom_components/homewhiz/tests/fixtures"
+ROUNDS = 2000
+
+
+def main() -> None:
+    rng = random.Random(0)
+    total_controls = 0
+    total_per_control = 0.0
+    total_plan = 0.0
+    print(f"{'fixture':48} {'controls':>8} {'get_value':>10} {'plan':>10}")
+    for path in sorted(FIXTURES.glob("*.json")):
+        try:
+            config = from_dict(ApplianceConfiguration, json.loads(path.read_text()))
+        except DaciteError:
+            continue
+        controls = generate_controls_from_config(path.name, config)
+        plan = DecodePlan(controls)
+        frame = bytearray(rng.randrange(256) for _ in range(256))
+
+        per_control = timeit.timeit(
+            lambda: {c.key: c.get_value(frame) for c in controls},  # noqa: B023
+            number=ROUNDS,
+        )
+        planned = timeit.timeit(lambda: plan.decode(frame), number=ROUNDS)  # noqa: B023
+        total_controls += len(controls)
+        total_per_control += per_control
+        total_plan += planned
+        print(
+            f"{path.name:48} {len(controls):8d} "
+            f"{per_control / ROUNDS * 1e6:8.1f}us {planned / ROUNDS * 1e6:8.1f}us"
+        )
+    print(
+        f"{'total':48} {total_controls:8d} "
+        f"{total_per_control / ROUNDS * 1e6:8.1f}us "
+        f"{total_plan / ROUNDS * 1e6:8.1f}us "
+        f"({total_per_control / total_plan:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compares setting up the platforms of a 10-appliance install
+
+Every platform used to parse the entry contents and generate the controls
+on its own, now async_setup_entry builds them once as the entry's runtime
+data. Uses the first ten appliance configurations in the test fixtures.
+Run from the repository root: python -m scripts.benchmark_entry_setup
+"""
+
+import json
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from dacite import DaciteError, from_dict
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.appliance_controls import (
+    generate_controls_from_config,
+)
+from custom_components.homewhiz.const import PLATFORMS
+from custom_components.homewhiz.contents_store import fingerprint
+from custom_components.homewhiz.helper import build_entry_data
+from custom_components.homewhiz.runtime_data import build_runtime_data
+
+FIXTURES = Path(__file__).parent.parent / "custom_components/homewhiz/tests/fixtures"
+APPLIANCES = 10
+ROUNDS = 20
+
+
+def _entries() -> list[tuple[Any, dict[str, Any]]]:
+    entries = []
+    for path in sorted(FIXTURES.glob("*.json")):
+        config = json.loads(path.read_text())
+        try:
+            from_dict(ApplianceConfiguration, config)
+        except DaciteError:
+            continue
+        entry = SimpleNamespace(
+            entry_id=path.stem,
+            data={
+                "config_fingerprint": fingerprint(config),
+                "appliance_info": None,
+                "ids": {"appId": path.stem},
+            },
+        )
+        entries.append((entry, {"config": config, "localization": {}}))
+    return entries[:APPLIANCES]
+
+
+def _per_platform(entries: list[tuple[Any, dict[str, Any]]]) -> None:
+    for entry, contents in entries:
+        for _ in PLATFORMS:
+            data = build_entry_data(entry, contents)
+            generate_controls_from_config(entry.entry_id, data.contents.config)
+
+
+def _once(entries: list[tuple[Any, dict[str, Any]]]) -> None:
+    for entry, contents in entries:
+        build_runtime_data(entry, contents)
+
+
+def main() -> None:
+    entries = _entries()
+    per_platform = timeit.timeit(lambda: _per_platform(entries), number=ROUNDS)
+    once = timeit.timeit(lambda: _once(entries), number=ROUNDS)
+    print(f"{len(entries)} appliances, {len(PLATFORMS)} platforms")
+    print(f"parsed per platform: {per_platform / ROUNDS * 1000:8.1f} ms")
+    print(
+        f"parsed once:         {once / ROUNDS * 1000:8.1f} ms "
+        f"({per_platform / once:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measures the memory an appliance's configuration and controls keep alive
+
+Parses every JSON in the test fixtures into an ApplianceConfiguration and
+generates its controls, tracing the allocations with tracemalloc. Reports
+what stays allocated per appliance once both are built and the parsed JSON
+document is gone.
+Run from the repository root: python -m scripts.benchmark_memory
+"""
+
+import gc
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from dacite import DaciteError
+
+from custom_components.homewhiz.appliance_config import ApplianceConfiguration
+from custom_components.homewhiz.appliance_controls import (
+    generate_controls_from_config,
+)
+from custom_components.homewhiz.config_loader import load_dataclass
+
+FIXTURES = Path(__file__).parent.parent / "custom_components/homewhiz/tests/fixtures"
+
+
+def _traced(build: Any) -> tuple[Any, int]:
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main() -> None:
+    documents = [
+        (path.name, path.read_text()) for path in sorted(FIXTURES.glob("*.json"))
+    ]
+    # Caches filled on first use are not part of an appliance
+    load_dataclass(ApplianceConfiguration, json.loads(documents[0][1]))
+    tracemalloc.start()
+    kept: list[Any] = []
+    total_config = 0
+    total_controls = 0
+    appliances = 0
+    print(f"{'fixture':48} {'config':>10} {'controls':>10}")
+    for name, document in documents:
+        try:
+            config, config_size = _traced(
+                lambda: load_dataclass(
+                    ApplianceConfiguration,
+                    json.loads(document),  # noqa: B023
+                )
+            )
+        except DaciteError:
+            continue
+        controls, controls_size = _traced(
+            lambda: generate_controls_from_config(name, config)  # noqa: B023
+        )
+        # Keep everything alive, like a running install does
+        kept.append((config, controls))
+        appliances += 1
+        total_config += config_size
+        total_controls += controls_size
+        print(f"{name:48} {config_size / 1024:8.1f}KB {controls_size / 1024:8.1f}KB")
+    tracemalloc.stop()
+    print(
+        f"{'per appliance':48} {total_config / appliances / 1024:8.1f}KB "
+        f"{total_controls / appliances / 1024:8.1f}KB"
+    )
+
+
+if __name__ == "__main__":
+    main()
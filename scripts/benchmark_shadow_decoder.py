@@ -0,0 +1,101 @@
+"""Compares shadow_payload_to_data with the previous dacite based decoder
+
+Decodes shadow update documents shaped like the ones AWS IoT delivers: the
+reported wfa array plus per element metadata timestamps.
+Run from the repository root: python -m scripts.benchmark_shadow_decoder
+"""
+
+import json
+import random
+import timeit
+from dataclasses import dataclass
+
+from dacite import from_dict
+
+from custom_components.homewhiz.shadow_state import shadow_payload_to_data
+
+ROUNDS = 5000
+WFA_SIZE = 230
+
+
+@dataclass
+class Reported:
+    connected: bool | str | None = None
+    brand: str | int | None = None
+    applianceType: str | int | None = None
+    model: str | None = None
+    applianceId: str | None = None
+    macAddr: str | None = None
+    wfa: list[int] | None = None
+    modifiedTime: int | None = None
+    wfaSizeModifiedTime: int | None = None
+    wfaSize: str | int | None = None
+    wfaStartOffset: str | int = 26
+
+
+@dataclass
+class State:
+    reported: Reported | None = None
+
+
+@dataclass
+class MqttPayload:
+    state: State | None = None
+
+
+def dacite_payload_to_data(payload: str | bytes) -> bytearray | None:
+    message = from_dict(MqttPayload, json.loads(payload))
+    if message.state and message.state.reported:
+        reported = message.state.reported
+        if reported.wfa is None:
+            return None
+        offset = int(reported.wfaStartOffset or 26)
+        wfa = reported.wfa
+        padding = [0 for _ in range(offset)]
+        return bytearray(padding + wfa)
+    return None
+
+
+def shadow_document(rng: random.Random) -> bytes:
+    timestamp = 1720000000
+    return json.dumps(
+        {
+            "state": {
+                "reported": {
+                    "connected": "true",
+                    "brand": 1,
+                    "applianceType": 1,
+                    "model": "7127441700",
+                    "applianceId": "F999935286050711425369",
+                    "macAddr": "00:11:22:33:44:55",
+                    "wfa": [rng.randrange(256) for _ in range(WFA_SIZE)],
+                    "modifiedTime": timestamp,
+                    "wfaSizeModifiedTime": timestamp,
+                    "wfaSize": WFA_SIZE,
+                    "wfaStartOffset": 26,
+                }
+            },
+            "metadata": {
+                "reported": {
+                    "wfa": [{"timestamp": timestamp} for _ in range(WFA_SIZE)],
+                    "modifiedTime": {"timestamp": timestamp},
+                }
+            },
+            "version": 4211,
+            "timestamp": timestamp,
+        }
+    ).encode()
+
+
+def main() -> None:
+    document = shadow_document(random.Random(0))
+    assert shadow_payload_to_data(document) == dacite_payload_to_data(document)
+    previous = timeit.timeit(lambda: dacite_payload_to_data(document), number=ROUNDS)
+    current = timeit.timeit(lambda: shadow_payload_to_data(document), number=ROUNDS)
+    print(f"document size  {len(document):8d} bytes")
+    print(f"dacite         {previous / ROUNDS * 1e6:8.1f}us")
+    print(f"fast path      {current / ROUNDS * 1e6:8.1f}us ({previous / current:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import asyncio
 import json
 import os
 from collections.abc import Mapping, MutableMapping
+from pathlib import Path
 from typing import Any
 
 import aiohttp
@@ -15,11 +16,9 @@ from mergedeep import Strategy, mergedeep  # type: ignore[import]
 from translate import Translator  # type: ignore[import]
 
 from custom_components.homewhiz.api import (
+    HomeWhizApi,
     LoginResponse,
-    fetch_appliance_contents,
-    fetch_base_contents_index,
-    fetch_localizations,
-    login,
+    create_session,
 )
 from custom_components.homewhiz.appliance_controls import (
     BooleanControl,
@@ -37,6 +36,10 @@ from custom_components.homewhiz.appliance_controls import (
     WriteNumericControl,
     generate_controls_from_config,
 )
+from custom_components.homewhiz.contents_cache import ContentsCache
+
+# Contents never change for a given version, keep them between runs
+contents_cache = ContentsCache(Path(__file__).parent / ".contents_cache")
 
 
 async def get_file(url: str) -> Any:
@@ -99,10 +102,12 @@ async def write_translations_file(language_code: str, translations: dict) -> Non
     print(f"{file_path} Updated")
 
 
-async def generate_translations(credentials: LoginResponse, short_code: str) -> None:
+async def generate_translations(
+    api: HomeWhizApi, credentials: LoginResponse, short_code: str
+) -> None:
     language = API_LANGUAGES[short_code]
-    base_contents_index = await fetch_base_contents_index(credentials, language)
-    base_localizations = await fetch_localizations(base_contents_index)
+    base_contents_index = await api.fetch_base_contents_index(credentials, language)
+    base_localizations = await api.fetch_localizations(base_contents_index)
     select_translations: MutableMapping[str, Mapping[str, str]] = {}
     sensor_translations: MutableMapping[str, Mapping[str, str]] = {}
     binary_sensor_translations: MutableMapping[str, Mapping[str, str]] = {}
@@ -135,7 +140,9 @@ async def generate_translations(credentials: LoginResponse, short_code: str) ->
 
     # Iterate through known appliance ids and gather all translations
     for appliance_id in KNOWN_APPLIANCE_IDS:
-        contents = await fetch_appliance_contents(credentials, appliance_id, language)
+        contents = await api.fetch_appliance_contents(
+            credentials, appliance_id, language
+        )
         appliance_localizations = contents.localization
         appliance_config = contents.config
         print(
@@ -355,14 +362,16 @@ async def generate_translations(credentials: LoginResponse, short_code: str) ->
 async def start_generate() -> None:
     username = input("Username: ")
     password = input("Password: ")
-    credentials = await login(username, password)
-
-    await asyncio.gather(
-        *[
-            generate_translations(credentials, short_code)
-            for short_code in API_LANGUAGES
-        ]
-    )
+    async with create_session() as session:
+        api = HomeWhizApi(session, contents_cache)
+        credentials = await api.login(username, password)
+
+        await asyncio.gather(
+            *[
+                generate_translations(api, credentials, short_code)
+                for short_code in API_LANGUAGES
+            ]
+        )
 
 
 if __name__ == "__main__":